@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Benchmark for ConnectionManager.close_connection with many open cursors
+
+Opens a large number of cursors spread over many connections, then measures
+how long it takes to close a connection that owns only a few of them. Cursors
+are never executed, so no Trino server is needed.
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import importlib.util
+
+DRIVER_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "trino-odbc-driver.py")
+
+def load_driver():
+    """Import trino-odbc-driver.py as a module"""
+    spec = importlib.util.spec_from_file_location("trino_odbc_driver", DRIVER_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    logging.getLogger("trino-odbc-driver").setLevel(logging.WARNING)
+    return module
+
+def run(driver, total_cursors: int, cursors_per_connection: int, samples: int) -> dict:
+    """Measure close_connection latency with total_cursors cursors open"""
+    pool = driver.TrinoConnectionPool(max_size=total_cursors)
+    manager = driver.ConnectionManager(pool)
+    params = {"host": "localhost", "port": 1, "user": "bench"}
+
+    connection_ids = []
+    for _ in range(total_cursors // cursors_per_connection):
+        connection_id = manager.create_connection(params)
+        for _ in range(cursors_per_connection):
+            manager.create_cursor(connection_id)
+        connection_ids.append(connection_id)
+
+    timings = []
+    for connection_id in connection_ids[:samples]:
+        start = time.perf_counter()
+        manager.close_connection(connection_id)
+        timings.append(time.perf_counter() - start)
+
+    timings.sort()
+    return {
+        "total_cursors": total_cursors,
+        "cursors_per_connection": cursors_per_connection,
+        "samples": len(timings),
+        "close_p50_us": round(timings[len(timings) // 2] * 1e6, 1),
+        "close_max_us": round(timings[-1] * 1e6, 1)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="close_connection scaling benchmark")
+    parser.add_argument('--totals', type=int, nargs='+', default=[1000, 10000, 100000],
+                        help='Total open cursor counts to measure (default: 1000 10000 100000)')
+    parser.add_argument('--cursors-per-connection', type=int, default=10,
+                        help='Cursors owned by each connection (default: 10)')
+    parser.add_argument('--samples', type=int, default=100,
+                        help='Connections closed per measurement (default: 100)')
+    args = parser.parse_args()
+
+    driver = load_driver()
+    for total in args.totals:
+        print(json.dumps(run(driver, total, args.cursors_per_connection, args.samples)))
+        sys.stdout.flush()
+
+if __name__ == "__main__":
+    main()
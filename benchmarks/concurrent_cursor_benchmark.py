@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Stress benchmark of ConnectionManager with many cursors in use at once
+
+Runs a number of worker threads, each repeatedly executing a query on its own
+cursor and fetching the whole result, and reports the throughput for each
+worker count. Every result page costs the fake coordinator a fixed latency,
+so throughput only grows with the number of workers if operations on
+independent cursors proceed in parallel rather than behind a shared lock.
+The coordinator is benchmarks/fake_trino.py.
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import threading
+import importlib.util
+
+from fake_trino import FakeTrino
+
+DRIVER_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "trino-odbc-driver.py")
+
+def load_driver():
+    """Import trino-odbc-driver.py as a module"""
+    spec = importlib.util.spec_from_file_location("trino_odbc_driver", DRIVER_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    logging.getLogger("trino-odbc-driver").setLevel(logging.WARNING)
+    logging.getLogger("trino").setLevel(logging.ERROR)
+    logging.getLogger("urllib3").setLevel(logging.ERROR)
+    return module
+
+def run(driver, port: int, workers: int, seconds: float, rows: int, page_rows: int,
+        shared_connection: bool) -> dict:
+    """Measure query and row throughput with the given number of workers"""
+    manager = driver.ConnectionManager(driver.TrinoConnectionPool(max_size=workers))
+    params = {"host": "127.0.0.1", "port": port, "user": "bench"}
+    query = f"/* fake: rows={rows} page_rows={page_rows} */ SELECT * FROM orders"
+
+    connection_ids = [manager.create_connection(params) for _ in range(1 if shared_connection else workers)]
+    cursor_ids = [manager.create_cursor(connection_ids[i % len(connection_ids)]) for i in range(workers)]
+
+    deadline = time.perf_counter() + seconds
+    counts = [[0, 0] for _ in range(workers)]
+    errors = []
+
+    def work(index: int):
+        cursor_id = cursor_ids[index]
+        try:
+            while time.perf_counter() < deadline:
+                manager.execute_query(cursor_id, query, use_cache=False)
+                has_more = True
+                while has_more:
+                    page = manager.fetch_results(cursor_id, page_rows)
+                    counts[index][1] += len(page["rows"])
+                    has_more = page["has_more"]
+                counts[index][0] += 1
+        except Exception as e:
+            errors.append(str(e))
+
+    threads = [threading.Thread(target=work, args=(i,)) for i in range(workers)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    for connection_id in connection_ids:
+        manager.close_connection(connection_id)
+
+    queries = sum(count[0] for count in counts)
+    return {
+        "workers": workers,
+        "shared_connection": shared_connection,
+        "seconds": round(elapsed, 2),
+        "queries": queries,
+        "queries_per_sec": round(queries / elapsed, 1),
+        "rows_per_sec": round(sum(count[1] for count in counts) / elapsed),
+        "errors": len(errors)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent cursor throughput benchmark")
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8, 16, 32],
+                        help='Worker thread counts to measure (default: 1 2 4 8 16 32)')
+    parser.add_argument('--seconds', type=float, default=5.0,
+                        help='Duration of each measurement (default: 5)')
+    parser.add_argument('--rows', type=int, default=1000,
+                        help='Rows returned by each query (default: 1000)')
+    parser.add_argument('--page-rows', type=int, default=250,
+                        help='Rows per coordinator page and per fetch (default: 250)')
+    parser.add_argument('--page-latency-ms', type=float, default=10.0,
+                        help='Milliseconds the fake coordinator spends on each page (default: 10)')
+    parser.add_argument('--shared-connection', action='store_true',
+                        help='Open every cursor on one connection instead of one connection per worker')
+    args = parser.parse_args()
+
+    driver = load_driver()
+    with FakeTrino(page_latency=args.page_latency_ms / 1e3) as coordinator:
+        for workers in args.workers:
+            print(json.dumps(run(driver, coordinator.port, workers, args.seconds, args.rows, args.page_rows,
+                                 args.shared_connection)))
+            sys.stdout.flush()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,440 @@
+#!/usr/bin/env python3
+"""
+End-to-end benchmark of the driver service through its REST endpoints
+
+Starts benchmarks/fake_trino.py and, for each scenario, a fresh driver
+service pointed at it, then drives the service over HTTP the way clients
+do: connections, cursors, execute, fetch and stream. Each scenario reports
+throughput, request latency, the service's peak resident memory and the CPU
+time it spent per row served, as one JSON object per line. Results can be
+written to a file and compared against an earlier run, failing when a
+scenario got slower or heavier by more than a tolerance.
+
+Scenarios:
+- small_queries: clients repeatedly open a cursor, execute a 10-row query,
+  fetch it and close the cursor
+- huge_scan: one client pages through a 1M-row result with fetch
+- huge_scan_stream: one client drains the same result through stream
+- wide_rows: one client fetches 200-column rows of every type in pages
+  sized by max_bytes
+- high_concurrency: 64 clients each run a 2000-row query and fetch the rest
+  of it in 500-row pages
+
+CPU and memory are read from /proc, so those figures need Linux.
+"""
+
+import os
+import sys
+import json
+import time
+import socket
+import argparse
+import platform
+import threading
+import subprocess
+import http.client
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+DRIVER_PATH = os.path.join(BENCHMARKS_DIR, "..", "trino-odbc-driver.py")
+FAKE_TRINO_PATH = os.path.join(BENCHMARKS_DIR, "fake_trino.py")
+
+CLOCK_TICKS = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+# Result shapes are chosen per statement through fake_trino.py's option comment
+SMALL_QUERY = "/* fake: rows=10 columns=4 */ SELECT * FROM small"
+HUGE_QUERY = "/* fake: rows={rows} columns=8 mix=basic page_rows=10000 */ SELECT * FROM huge"
+WIDE_QUERY = "/* fake: rows={rows} columns=200 mix=full page_rows=1000 */ SELECT * FROM wide"
+CONCURRENT_QUERY = "/* fake: rows=2000 columns=8 mix=basic */ SELECT * FROM concurrent"
+
+class ServiceClient:
+    """A keep-alive HTTP client of the driver service that times every request"""
+
+    def __init__(self, port: int, latencies: list):
+        self.port = port
+        self.latencies = latencies
+        self.conn = http.client.HTTPConnection("127.0.0.1", port, timeout=300)
+
+    def request(self, method: str, path: str, body=None) -> dict:
+        payload = json.dumps(body).encode("utf-8") if body is not None else None
+        start = time.perf_counter()
+        try:
+            self.conn.request(method, path, body=payload, headers={"Content-Type": "application/json"})
+            response = self.conn.getresponse()
+            result = json.loads(response.read())
+        except Exception:
+            self.reconnect()
+            raise
+        self.latencies.append(time.perf_counter() - start)
+        if not result.get("success", False):
+            raise RuntimeError(result.get("error"))
+        return result
+
+    def stream(self, path: str) -> int:
+        """Drain an NDJSON stream and return its row count"""
+        start = time.perf_counter()
+        try:
+            self.conn.request("GET", path)
+            response = self.conn.getresponse()
+            last = b""
+            for line in response:
+                if line.strip():
+                    last = line
+        except Exception:
+            self.reconnect()
+            raise
+        self.latencies.append(time.perf_counter() - start)
+        message = json.loads(last)
+        if "error" in message:
+            raise RuntimeError(message["error"])
+        return message["row_count"]
+
+    def fetch_all(self, cursor_id: str, query: str) -> int:
+        """Fetch the remaining pages of a cursor and return their row count"""
+        rows = 0
+        while True:
+            result = self.request("GET", f"/cursors/{cursor_id}/fetch?{query}")
+            rows += len(result["rows"])
+            if not result["has_more"]:
+                return rows
+
+    def reconnect(self) -> None:
+        self.conn.close()
+        self.conn = http.client.HTTPConnection("127.0.0.1", self.port, timeout=300)
+
+    def close(self) -> None:
+        self.conn.close()
+
+def small_queries(client: ServiceClient, connection_id: str, deadline: float) -> int:
+    rows = 0
+    while time.monotonic() < deadline:
+        cursor_id = client.request("POST", f"/connections/{connection_id}/cursors")["cursor_id"]
+        try:
+            client.request("POST", f"/cursors/{cursor_id}/execute", {"query": SMALL_QUERY, "cache": False})
+            rows += client.fetch_all(cursor_id, "max_rows=1000")
+        finally:
+            client.request("DELETE", f"/cursors/{cursor_id}")
+    return rows
+
+def huge_scan(client: ServiceClient, connection_id: str, rows: int) -> int:
+    cursor_id = client.request("POST", f"/connections/{connection_id}/cursors")["cursor_id"]
+    try:
+        client.request("POST", f"/cursors/{cursor_id}/execute",
+                       {"query": HUGE_QUERY.format(rows=rows), "cache": False})
+        return client.fetch_all(cursor_id, "max_rows=10000")
+    finally:
+        client.request("DELETE", f"/cursors/{cursor_id}")
+
+def huge_scan_stream(client: ServiceClient, connection_id: str, rows: int) -> int:
+    cursor_id = client.request("POST", f"/connections/{connection_id}/cursors")["cursor_id"]
+    try:
+        client.request("POST", f"/cursors/{cursor_id}/execute",
+                       {"query": HUGE_QUERY.format(rows=rows), "cache": False})
+        return client.stream(f"/cursors/{cursor_id}/stream?page_size=10000")
+    finally:
+        client.request("DELETE", f"/cursors/{cursor_id}")
+
+def wide_rows(client: ServiceClient, connection_id: str, rows: int) -> int:
+    cursor_id = client.request("POST", f"/connections/{connection_id}/cursors")["cursor_id"]
+    try:
+        client.request("POST", f"/cursors/{cursor_id}/execute",
+                       {"query": WIDE_QUERY.format(rows=rows), "cache": False})
+        return client.fetch_all(cursor_id, f"max_bytes={1024 * 1024}")
+    finally:
+        client.request("DELETE", f"/cursors/{cursor_id}")
+
+def high_concurrency(client: ServiceClient, connection_id: str, deadline: float) -> int:
+    rows = 0
+    while time.monotonic() < deadline:
+        result = client.request("POST", f"/connections/{connection_id}/query",
+                                {"query": CONCURRENT_QUERY, "max_rows": 500, "cache": False})
+        rows += len(result["rows"])
+        if result["cursor_id"]:
+            try:
+                rows += client.fetch_all(result["cursor_id"], "max_rows=500")
+            finally:
+                client.request("DELETE", f"/cursors/{result['cursor_id']}")
+    return rows
+
+# Scenario name: (workload, concurrent clients, whether the workload runs until a deadline)
+SCENARIOS = {
+    "small_queries": (small_queries, 8, True),
+    "huge_scan": (huge_scan, 1, False),
+    "huge_scan_stream": (huge_scan_stream, 1, False),
+    "wide_rows": (wide_rows, 1, False),
+    "high_concurrency": (high_concurrency, 64, True)
+}
+
+# Default row counts of the fixed-size scenarios
+SCENARIO_ROWS = {
+    "huge_scan": 1000000,
+    "huge_scan_stream": 1000000,
+    "wide_rows": 20000
+}
+
+# Metrics compared against a baseline, and whether higher values are better
+COMPARED_METRICS = {
+    "rows_per_sec": True,
+    "p99_ms": False,
+    "peak_rss_mb": False,
+    "cpu_us_per_row": False
+}
+
+def process_tree(pid: int) -> list:
+    """The process and its descendants, such as gunicorn workers"""
+    parents = {}
+    for entry in os.listdir("/proc"):
+        if entry.isdigit():
+            try:
+                with open(f"/proc/{entry}/stat") as f:
+                    parents[int(entry)] = int(f.read().rsplit(")", 1)[1].split()[1])
+            except (OSError, IndexError, ValueError):
+                continue
+    tree, pending = [], [pid]
+    while pending:
+        current = pending.pop()
+        tree.append(current)
+        pending.extend(child for child, parent in parents.items() if parent == current)
+    return tree
+
+def cpu_seconds(pids: list) -> float:
+    """User plus system CPU time of processes"""
+    total = 0
+    for pid in pids:
+        try:
+            with open(f"/proc/{pid}/stat") as f:
+                fields = f.read().rsplit(")", 1)[1].split()
+            total += int(fields[11]) + int(fields[12])
+        except (OSError, IndexError, ValueError):
+            continue
+    return total / CLOCK_TICKS
+
+def rss_bytes(pids: list) -> int:
+    """Resident memory of processes"""
+    total = 0
+    for pid in pids:
+        try:
+            with open(f"/proc/{pid}/statm") as f:
+                total += int(f.read().split()[1]) * PAGE_SIZE
+        except (OSError, IndexError, ValueError):
+            continue
+    return total
+
+class ResourceSampler:
+    """Samples the resident memory of a process tree on a background thread and keeps the peak"""
+
+    def __init__(self, pids: list, interval: float = 0.1):
+        self.pids = pids
+        self.interval = interval
+        self.peak = rss_bytes(pids)
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+
+    def run(self) -> None:
+        while not self.stopped.wait(self.interval):
+            self.peak = max(self.peak, rss_bytes(self.pids))
+
+    def __enter__(self) -> "ResourceSampler":
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.stopped.set()
+        self.thread.join()
+        self.peak = max(self.peak, rss_bytes(self.pids))
+
+def wait_for_port(port: int, process: subprocess.Popen, timeout: float = 30.0) -> None:
+    """Wait until a started process accepts connections"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Process listening on port {port} exited with status {process.returncode}")
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"Nothing listening on port {port} after {timeout} seconds")
+
+def percentile(sorted_values: list, fraction: float):
+    if not sorted_values:
+        return None
+    return round(sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))] * 1e3, 2)
+
+def run(scenario: str, args, coordinator: subprocess.Popen) -> dict:
+    """Measure one scenario against a freshly started service"""
+    workload, clients, timed = SCENARIOS[scenario]
+    clients = args.clients or clients
+    rows_arg = int(SCENARIO_ROWS.get(scenario, 0) * args.scale)
+
+    # Every open connection leases a pooled Trino connection, so the pool must fit all clients
+    service_args = ["--host", "127.0.0.1", "--port", str(args.port), "--server", args.server,
+                    "--pool-max-size", str(max(clients, 20))]
+    if args.server == "gunicorn":
+        service_args += ["--workers", str(args.workers), "--threads", str(args.threads)]
+    service = subprocess.Popen([sys.executable, DRIVER_PATH] + service_args + args.service_args,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_for_port(args.port, service)
+        # Workers are forked once the listener is up; give them a moment to appear
+        time.sleep(0.5)
+        pids = process_tree(service.pid)
+
+        latencies, errors, row_counts = [], [], []
+        setup = ServiceClient(args.port, [])
+        params = {"host": "127.0.0.1", "port": args.coordinator_port, "user": "bench"}
+        connection_ids = [setup.request("POST", "/connections", params)["connection_id"] for _ in range(clients)]
+
+        def client_thread(connection_id: str) -> None:
+            client = ServiceClient(args.port, latencies)
+            try:
+                if timed:
+                    row_counts.append(workload(client, connection_id, time.monotonic() + args.duration))
+                else:
+                    row_counts.append(workload(client, connection_id, rows_arg))
+            except Exception as e:
+                errors.append(str(e))
+            finally:
+                client.close()
+
+        threads = [threading.Thread(target=client_thread, args=(connection_id,)) for connection_id in connection_ids]
+        service_cpu = cpu_seconds(pids)
+        coordinator_cpu = cpu_seconds([coordinator.pid])
+        with ResourceSampler(pids) as sampler:
+            start = time.perf_counter()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            elapsed = time.perf_counter() - start
+        service_cpu = cpu_seconds(pids) - service_cpu
+        coordinator_cpu = cpu_seconds([coordinator.pid]) - coordinator_cpu
+
+        # The service drops idle keep-alive connections, so tear down on a new one
+        setup.reconnect()
+        for connection_id in connection_ids:
+            setup.request("DELETE", f"/connections/{connection_id}")
+        setup.close()
+    finally:
+        service.terminate()
+        service.wait()
+
+    latencies.sort()
+    rows = sum(row_counts)
+    return {
+        "scenario": scenario,
+        "server": args.server,
+        "clients": clients,
+        "seconds": round(elapsed, 3),
+        "requests": len(latencies),
+        "errors": len(errors),
+        "first_error": errors[0] if errors else None,
+        "rows": rows,
+        "requests_per_sec": round(len(latencies) / elapsed, 1),
+        "rows_per_sec": round(rows / elapsed),
+        "p50_ms": percentile(latencies, 0.5),
+        "p99_ms": percentile(latencies, 0.99),
+        "peak_rss_mb": round(sampler.peak / (1024 * 1024), 1),
+        "cpu_seconds": round(service_cpu, 2),
+        "cpu_us_per_row": round(service_cpu / rows * 1e6, 2) if rows else None,
+        "coordinator_cpu_seconds": round(coordinator_cpu, 2)
+    }
+
+def compare(results: list, baseline: dict, tolerance: float) -> list:
+    """List the metrics of results that are worse than the baseline by more than the tolerance"""
+    previous = {result["scenario"]: result for result in baseline["results"]}
+    regressions = []
+    for result in results:
+        before = previous.get(result["scenario"])
+        if before is None:
+            continue
+        for metric, higher_is_better in COMPARED_METRICS.items():
+            old, new = before.get(metric), result.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            if (-change if higher_is_better else change) > tolerance:
+                regressions.append({"scenario": result["scenario"], "metric": metric,
+                                    "baseline": old, "current": new, "change": round(change, 3)})
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="End-to-end benchmark of the driver service against a fake Trino coordinator",
+        epilog="Arguments after -- are passed to the driver service, e.g. -- --prefetch-depth 4")
+    parser.add_argument('--scenarios', nargs='+', choices=list(SCENARIOS), default=list(SCENARIOS),
+                        help='Scenarios to run (default: all)')
+    parser.add_argument('--server', choices=["gunicorn", "asyncio", "dev"], default="gunicorn",
+                        help='Serving mode of the driver service (default: gunicorn)')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='gunicorn worker processes (default: 1)')
+    parser.add_argument('--threads', type=int, default=16,
+                        help='gunicorn threads per worker (default: 16)')
+    parser.add_argument('--clients', type=int, default=0,
+                        help='Concurrent clients, overriding the per-scenario default')
+    parser.add_argument('--duration', type=float, default=10.0,
+                        help='Seconds the small_queries and high_concurrency scenarios run (default: 10)')
+    parser.add_argument('--scale', type=float, default=1.0,
+                        help='Factor applied to the row counts of the scan scenarios (default: 1)')
+    parser.add_argument('--page-latency', type=float, default=0.0,
+                        help='Seconds the fake coordinator spends on each result page (default: 0)')
+    parser.add_argument('--port', type=int, default=18992,
+                        help='Port to run the driver service on (default: 18992)')
+    parser.add_argument('--coordinator-port', type=int, default=18093,
+                        help='Port to run the fake coordinator on (default: 18093)')
+    parser.add_argument('--output',
+                        help='Write the results, with a description of the environment, to this JSON file')
+    parser.add_argument('--baseline',
+                        help='JSON file of an earlier --output to compare against; exits with status 1 on regressions')
+    parser.add_argument('--tolerance', type=float, default=0.15,
+                        help='Relative change of a compared metric counted as a regression (default: 0.15)')
+    argv = sys.argv[1:]
+    service_args = argv[argv.index("--") + 1:] if "--" in argv else []
+    args = parser.parse_args(argv[:argv.index("--")] if "--" in argv else argv)
+    args.service_args = service_args
+
+    coordinator = subprocess.Popen(
+        [sys.executable, FAKE_TRINO_PATH, "--port", str(args.coordinator_port),
+         "--page-latency", str(args.page_latency)],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    results = []
+    try:
+        wait_for_port(args.coordinator_port, coordinator)
+        for scenario in args.scenarios:
+            result = run(scenario, args, coordinator)
+            results.append(result)
+            print(json.dumps(result))
+            sys.stdout.flush()
+    finally:
+        coordinator.terminate()
+        coordinator.wait()
+
+    if args.output:
+        document = {
+            "environment": {
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "cpus": os.cpu_count(),
+                "server": args.server,
+                "workers": args.workers,
+                "threads": args.threads,
+                "service_args": args.service_args,
+                "duration": args.duration,
+                "scale": args.scale,
+                "page_latency": args.page_latency
+            },
+            "results": results
+        }
+        with open(args.output, "w") as f:
+            json.dump(document, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(json.dumps({"regression": regression}))
+        if regressions:
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,464 @@
+#!/usr/bin/env python3
+"""
+Fake Trino coordinator for benchmarks
+
+Speaks enough of the /v1/statement protocol for the Trino Python client and
+the driver's asyncio mode: a statement is QUEUED by POST /v1/statement and
+its results are then fetched by following nextUri, one page per request,
+until the final page has no nextUri. DELETE on a nextUri cancels the query.
+
+SELECT statements with a FROM clause return a synthetic result set whose
+row count, column count, type mix, page size and per-page latency are set on
+the server and can be overridden per statement with a comment such as
+/* fake: rows=100000 columns=40 mix=full page_rows=5000 page_latency=0.01 */.
+Statements without FROM (such as the connection pool's SELECT 1) return one
+bigint row, and INSERT, UPDATE, DELETE and DDL statements report an update
+count. PREPARE, EXECUTE and DEALLOCATE PREPARE are tracked through the
+prepared statement headers the way Trino tracks them, and EXECUTE IMMEDIATE
+can be turned off to mimic coordinators older than Trino 418. USE, SET
+SESSION, RESET SESSION, START TRANSACTION, COMMIT and ROLLBACK answer with
+the X-Trino-Set-*, X-Trino-Clear-* and transaction headers that tell the
+client to update its session, and the session headers of the latest
+statement are kept in last_session.
+
+The server runs in-process on a background thread:
+
+    with FakeTrino(rows=100000, columns=20) as coordinator:
+        connection_id = manager.create_connection(
+            {"host": "127.0.0.1", "port": coordinator.port, "user": "bench"})
+
+or standalone with python benchmarks/fake_trino.py --port 18080.
+"""
+
+import re
+import json
+import time
+import base64
+import argparse
+import datetime
+import itertools
+import threading
+from collections import Counter
+from typing import Dict, Optional, Tuple
+from urllib.parse import quote, unquote_plus
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+# Column types in the order columns cycle through them, with their Trino
+# type signature and a function producing the wire value for a row number
+def _long(value: int) -> Dict:
+    return {"kind": "LONG", "value": value}
+
+def _signature(raw_type: str, *arguments: Dict) -> Dict:
+    return {"rawType": raw_type, "arguments": list(arguments)}
+
+def _type_argument(signature: Dict) -> Dict:
+    return {"kind": "TYPE", "value": signature}
+
+def _field(name: str, signature: Dict) -> Dict:
+    return {"kind": "NAMED_TYPE", "value": {"fieldName": {"name": name}, "typeSignature": signature}}
+
+EPOCH_DAY = datetime.date(2024, 1, 1)
+
+BASIC_TYPES = [
+    ("bigint", _signature("bigint"), lambda i: i),
+    ("decimal(12,2)", _signature("decimal", _long(12), _long(2)), lambda i: f"{i % 100000 // 100}.{i % 100:02d}"),
+    ("double", _signature("double"), lambda i: i / 8),
+    ("varchar", _signature("varchar", _long(2147483647)), lambda i: f"name-{i}"),
+    ("boolean", _signature("boolean"), lambda i: i % 2 == 0),
+    ("date", _signature("date"), lambda i: (EPOCH_DAY + datetime.timedelta(days=i % 3650)).isoformat()),
+    ("timestamp(3)", _signature("timestamp", _long(3)),
+     lambda i: f"2024-01-01 {i // 3600 % 24:02d}:{i // 60 % 60:02d}:{i % 60:02d}.{i % 1000:03d}")
+]
+
+FULL_TYPES = BASIC_TYPES + [
+    ("varbinary", _signature("varbinary"), lambda i: base64.b64encode(i.to_bytes(8, "big")).decode("ascii")),
+    ("time(3)", _signature("time", _long(3)), lambda i: f"{i % 24:02d}:{i % 60:02d}:{i % 60:02d}.000"),
+    ("array(varchar)", _signature("array", _type_argument(_signature("varchar", _long(2147483647)))),
+     lambda i: ["a", "b", f"t{i % 10}"]),
+    ("map(varchar, double)", _signature("map", _type_argument(_signature("varchar", _long(2147483647))),
+                                        _type_argument(_signature("double"))),
+     lambda i: {"weight": i / 2, "score": float(i % 3)}),
+    ("row(x double, y double)", _signature("row", _field("x", _signature("double")), _field("y", _signature("double"))),
+     lambda i: [i / 4, i * 0.75])
+]
+
+TYPE_MIXES = {
+    "bigint": BASIC_TYPES[:1],
+    "varchar": BASIC_TYPES[3:4],
+    "basic": BASIC_TYPES,
+    "full": FULL_TYPES
+}
+
+DEFAULT_ROWS = 10000
+DEFAULT_COLUMNS = 8
+DEFAULT_MIX = "basic"
+DEFAULT_PAGE_ROWS = 1000
+
+# Encoded pages kept per result shape, so that repeated scans cost the fake
+# coordinator next to no CPU; pages beyond the budget are encoded per request
+PAGE_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+OPTIONS_PATTERN = re.compile(r"/\*\s*fake:([^*]*)\*/")
+UPDATE_KEYWORDS = {"INSERT", "UPDATE", "DELETE", "MERGE", "CREATE", "DROP", "ALTER", "COMMENT", "GRANT", "REVOKE"}
+
+class ResultShape:
+    """The synthetic result set of a statement, with its JSON columns and pages"""
+
+    def __init__(self, rows: int, columns: int, mix: str, page_rows: int, page_latency: float):
+        if mix not in TYPE_MIXES:
+            raise ValueError(f"Unknown type mix {mix}; expected one of {', '.join(TYPE_MIXES)}")
+        self.rows = rows
+        self.page_rows = max(1, page_rows)
+        self.page_latency = page_latency
+        types = TYPE_MIXES[mix]
+        self.types = [types[i % len(types)] for i in range(max(1, columns))]
+        self.columns_json = json.dumps([
+            {"name": f"c{i}_{type_name.split('(')[0]}", "type": type_name, "typeSignature": signature}
+            for i, (type_name, signature, _) in enumerate(self.types)
+        ])
+        self.page_cache: Dict[int, str] = {}
+        self.page_cache_bytes = 0
+
+    @property
+    def pages(self) -> int:
+        return (self.rows + self.page_rows - 1) // self.page_rows
+
+    def page_json(self, page: int) -> str:
+        """Encode the rows of a zero-based page as a JSON array"""
+        encoded = self.page_cache.get(page)
+        if encoded is None:
+            start = page * self.page_rows
+            end = min(start + self.page_rows, self.rows)
+            values = [value for _, _, value in self.types]
+            encoded = json.dumps([[value(i) for value in values] for i in range(start, end)])
+            if self.page_cache_bytes + len(encoded) <= PAGE_CACHE_MAX_BYTES:
+                self.page_cache[page] = encoded
+                self.page_cache_bytes += len(encoded)
+        return encoded
+
+class FakeQuery:
+    """A statement submitted to the fake coordinator"""
+
+    def __init__(self, query_id: str, sql: str, shape: Optional[ResultShape], update_count: Optional[int],
+                 error: Optional[str], headers: Dict[str, str]):
+        self.query_id = query_id
+        self.sql = sql
+        self.shape = shape
+        self.update_count = update_count
+        self.error = error
+        # Response headers sent with the final page, such as X-Trino-Added-Prepare
+        self.headers = headers
+        self.cancelled = False
+
+class FakeTrino(ThreadingHTTPServer):
+    """
+    In-process fake Trino coordinator serving synthetic result sets
+
+    Args:
+        host: Interface to listen on
+        port: Port to listen on, 0 for any free port
+        rows: Rows returned by each SELECT ... FROM statement
+        columns: Columns of each result, cycling through the types of the mix
+        mix: "bigint", "varchar", "basic" (bigint, decimal, double, varchar,
+            boolean, date and timestamp) or "full" (basic plus varbinary,
+            time, array, map and row)
+        page_rows: Rows per result page
+        page_latency: Seconds spent before answering each result page
+        statement_latency: Seconds spent before answering the first page of
+            every statement, standing in for planning
+        execute_immediate: Whether EXECUTE IMMEDIATE is accepted
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, rows: int = DEFAULT_ROWS,
+                 columns: int = DEFAULT_COLUMNS, mix: str = DEFAULT_MIX, page_rows: int = DEFAULT_PAGE_ROWS,
+                 page_latency: float = 0.0, statement_latency: float = 0.0, execute_immediate: bool = True):
+        self.defaults = {"rows": rows, "columns": columns, "mix": mix, "page_rows": page_rows,
+                         "page_latency": page_latency}
+        ResultShape(**self.defaults)
+        self.statement_latency = statement_latency
+        self.execute_immediate = execute_immediate
+        # Statements received by kind (SELECT, PREPARE, EXECUTE, ...) and pages served
+        self.statements = Counter()
+        self.pages_served = 0
+        # X-Trino-* request headers of the latest statement, such as X-Trino-Schema
+        self.last_session: Dict[str, str] = {}
+        self.queries: Dict[str, FakeQuery] = {}
+        self.query_ids = itertools.count()
+        self.shapes: Dict[Tuple, ResultShape] = {}
+        self.lock = threading.Lock()
+        self.thread = None
+        super().__init__((host, port), FakeTrinoHandler)
+
+    @property
+    def port(self) -> int:
+        return self.server_address[1]
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.server_address[0]}:{self.port}"
+
+    def start(self) -> "FakeTrino":
+        """Serve requests on a background thread"""
+        self.thread = threading.Thread(target=self.serve_forever, name="fake-trino", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop serving and close the listening socket"""
+        if self.thread is not None:
+            self.shutdown()
+            self.thread.join()
+            self.thread = None
+        self.server_close()
+
+    def __enter__(self) -> "FakeTrino":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def reset_counters(self) -> None:
+        """Forget the statements and pages counted so far"""
+        with self.lock:
+            self.statements.clear()
+            self.pages_served = 0
+
+    def shape_for(self, sql: str) -> ResultShape:
+        """Return the result shape of a statement, from its fake: options or the server defaults"""
+        options = dict(self.defaults)
+        match = OPTIONS_PATTERN.search(sql)
+        if match:
+            for item in match.group(1).split():
+                key, _, value = item.partition("=")
+                if key not in options:
+                    raise ValueError(f"Unknown fake option {key}")
+                options[key] = type(options[key])(value) if key != "mix" else value
+        key = tuple(sorted(options.items()))
+        with self.lock:
+            shape = self.shapes.get(key)
+            if shape is None:
+                shape = self.shapes[key] = ResultShape(**options)
+        return shape
+
+    def submit(self, sql: str, prepared: Dict[str, str]) -> FakeQuery:
+        """Register a statement and work out what it returns"""
+        query_id = f"fake_{next(self.query_ids)}"
+        body = OPTIONS_PATTERN.sub("", sql).strip().rstrip(";")
+        words = body.split(None, 2)
+        kind = words[0].upper() if words else ""
+        if kind in ("EXECUTE", "DEALLOCATE") and len(words) > 1 and words[1].upper() in ("IMMEDIATE", "PREPARE"):
+            kind = f"{kind} {words[1].upper()}"
+        elif kind in ("SET", "RESET", "START") and len(words) > 1 and words[1].upper() in ("SESSION", "TRANSACTION"):
+            kind = f"{kind} {words[1].upper()}"
+        with self.lock:
+            self.statements[kind] += 1
+
+        shape, update_count, error, headers = None, None, None, {}
+        try:
+            if kind == "PREPARE":
+                match = re.match(r"PREPARE\s+(\w+)\s+FROM\s+(.*)", sql.strip().rstrip(";"), re.S | re.I)
+                headers["X-Trino-Added-Prepare"] = f"{match.group(1)}={quote(match.group(2))}"
+            elif kind == "DEALLOCATE PREPARE":
+                name = words[2].split()[0]
+                if name not in prepared:
+                    error = f"Prepared statement not found: {name}"
+                headers["X-Trino-Deallocated-Prepare"] = name
+            elif kind == "EXECUTE IMMEDIATE":
+                if not self.execute_immediate:
+                    error = "line 1:9: mismatched input 'IMMEDIATE'"
+                else:
+                    statement = re.match(r"EXECUTE\s+IMMEDIATE\s+'((?:[^']|'')*)'", sql.strip(), re.S | re.I)
+                    shape = self.result_of(statement.group(1).replace("''", "'"))
+            elif kind == "EXECUTE":
+                name = words[1] if len(words) > 1 else ""
+                if name not in prepared:
+                    error = f"Prepared statement not found: {name}"
+                else:
+                    shape = self.result_of(prepared[name])
+            elif kind == "USE":
+                target = words[1].split(".")
+                if len(target) > 1:
+                    headers["X-Trino-Set-Catalog"] = target[0]
+                headers["X-Trino-Set-Schema"] = target[-1]
+            elif kind == "SET SESSION":
+                name, _, value = words[2].partition("=")
+                value = value.strip().strip("'")
+                headers["X-Trino-Set-Session"] = f"{name.strip()}={quote(value)}"
+            elif kind == "RESET SESSION":
+                headers["X-Trino-Clear-Session"] = words[2].strip()
+            elif kind == "START TRANSACTION":
+                headers["X-Trino-Started-Transaction-Id"] = f"fake_transaction_{query_id}"
+            elif kind in ("COMMIT", "ROLLBACK"):
+                headers["X-Trino-Clear-Transaction-Id"] = "true"
+            elif kind in UPDATE_KEYWORDS:
+                values = re.split(r"\bVALUES\b", body, 1, re.I)
+                update_count = values[1].count("(") if kind == "INSERT" and len(values) > 1 else 0
+            else:
+                shape = self.result_of(sql)
+        except (ValueError, AttributeError) as e:
+            error = str(e)
+
+        query = FakeQuery(query_id, sql, shape, update_count, error, headers)
+        with self.lock:
+            self.queries[query_id] = query
+        return query
+
+    def result_of(self, sql: str) -> ResultShape:
+        """The result of a query: synthetic rows if it reads FROM a table, else a single row"""
+        if re.search(r"\bFROM\b", OPTIONS_PATTERN.sub("", sql), re.I):
+            return self.shape_for(sql)
+        return self.shape_for("/* fake: rows=1 columns=1 mix=bigint */")
+
+class FakeTrinoHandler(BaseHTTPRequestHandler):
+    """Serves the /v1/statement protocol for FakeTrino"""
+
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes on kept-alive connections
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_body(self, status: int, body: bytes, headers: Optional[Dict[str, str]] = None) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def query_json(self, query: FakeQuery, state: str, next_page: Optional[int], extra: str = "") -> bytes:
+        """Render a statement response; extra holds pre-encoded "key": value members"""
+        base = self.server.url
+        document = {
+            "id": query.query_id,
+            "infoUri": f"{base}/ui/query.html?{query.query_id}",
+            "stats": {
+                "state": state,
+                "queued": state == "QUEUED",
+                "scheduled": state != "QUEUED",
+                "totalSplits": query.shape.pages if query.shape else 1,
+                "completedSplits": next_page - 1 if next_page else (query.shape.pages if query.shape else 1)
+            }
+        }
+        if next_page is not None:
+            document["nextUri"] = f"{base}/v1/statement/executing/{query.query_id}/{next_page}"
+        encoded = json.dumps(document)
+        if extra:
+            encoded = f"{encoded[:-1]}, {extra}}}"
+        return encoded.encode("utf-8")
+
+    def do_POST(self):
+        if self.path.split("?")[0] != "/v1/statement":
+            self.send_body(404, b'{"error": "not found"}')
+            return
+        sql = self.rfile.read(int(self.headers.get("Content-Length", 0))).decode("utf-8")
+        prepared = {}
+        for item in self.headers.get("X-Trino-Prepared-Statement", "").split(","):
+            name, _, statement = item.strip().partition("=")
+            if name:
+                prepared[name] = unquote_plus(statement)
+        with self.server.lock:
+            self.server.last_session = {name: value for name, value in self.headers.items()
+                                        if name.lower().startswith("x-trino-")}
+        query = self.server.submit(sql, prepared)
+        self.send_body(200, self.query_json(query, "QUEUED", 1))
+
+    def do_GET(self):
+        parts = self.path.split("?")[0].strip("/").split("/")
+        if len(parts) != 5 or parts[:3] != ["v1", "statement", "executing"]:
+            self.send_body(404, b'{"error": "not found"}')
+            return
+        query = self.server.queries.get(parts[3])
+        if query is None:
+            self.send_body(404, b'{"error": "query not found"}')
+            return
+        page = int(parts[4])
+
+        if page == 1 and self.server.statement_latency:
+            time.sleep(self.server.statement_latency)
+        if query.cancelled:
+            self.finish_query(query)
+            self.send_body(200, self.query_json(query, "FAILED", None, json.dumps(
+                {"error": {"message": "Query was canceled", "errorName": "USER_CANCELED",
+                           "errorType": "USER_ERROR", "errorCode": 3}})[1:-1]))
+            return
+        if query.error:
+            self.finish_query(query)
+            self.send_body(200, self.query_json(query, "FAILED", None, json.dumps(
+                {"error": {"message": query.error, "errorName": "SYNTAX_ERROR",
+                           "errorType": "USER_ERROR", "errorCode": 1}})[1:-1]))
+            return
+        if query.shape is None:
+            self.finish_query(query)
+            extra = json.dumps({"updateType": query.sql.split(None, 1)[0].upper(),
+                                "updateCount": query.update_count})[1:-1] if query.update_count is not None else ""
+            self.send_body(200, self.query_json(query, "FINISHED", None, extra), query.headers)
+            return
+
+        shape = query.shape
+        if shape.page_latency:
+            time.sleep(shape.page_latency)
+        last = page >= shape.pages
+        extra = f'"columns": {shape.columns_json}'
+        if shape.rows:
+            extra += f', "data": {shape.page_json(page - 1)}'
+        with self.server.lock:
+            self.server.pages_served += 1
+        if last:
+            self.finish_query(query)
+        self.send_body(200, self.query_json(query, "FINISHED" if last else "RUNNING",
+                                            None if last else page + 1, extra),
+                       query.headers if last else None)
+
+    def do_DELETE(self):
+        parts = self.path.split("?")[0].strip("/").split("/")
+        query = self.server.queries.get(parts[3]) if len(parts) == 5 else None
+        if query is not None:
+            query.cancelled = True
+        self.send_response(204)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def finish_query(self, query: FakeQuery) -> None:
+        with self.server.lock:
+            self.server.queries.pop(query.query_id, None)
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake Trino coordinator serving synthetic result sets")
+    parser.add_argument('--host', default="127.0.0.1",
+                        help='Interface to listen on (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=18080,
+                        help='Port to listen on (default: 18080)')
+    parser.add_argument('--rows', type=int, default=DEFAULT_ROWS,
+                        help=f'Rows returned by each SELECT ... FROM statement (default: {DEFAULT_ROWS})')
+    parser.add_argument('--columns', type=int, default=DEFAULT_COLUMNS,
+                        help=f'Columns of each result (default: {DEFAULT_COLUMNS})')
+    parser.add_argument('--mix', choices=list(TYPE_MIXES), default=DEFAULT_MIX,
+                        help=f'Column types the columns cycle through (default: {DEFAULT_MIX})')
+    parser.add_argument('--page-rows', type=int, default=DEFAULT_PAGE_ROWS,
+                        help=f'Rows per result page (default: {DEFAULT_PAGE_ROWS})')
+    parser.add_argument('--page-latency', type=float, default=0.0,
+                        help='Seconds spent before answering each result page (default: 0)')
+    parser.add_argument('--statement-latency', type=float, default=0.0,
+                        help='Seconds spent before answering the first page of every statement (default: 0)')
+    parser.add_argument('--no-execute-immediate', action='store_true',
+                        help='Reject EXECUTE IMMEDIATE, as coordinators before Trino 418 do')
+    args = parser.parse_args()
+
+    coordinator = FakeTrino(args.host, args.port, args.rows, args.columns, args.mix, args.page_rows,
+                            args.page_latency, args.statement_latency, not args.no_execute_immediate)
+    print(f"Fake Trino coordinator listening on {coordinator.url}")
+    try:
+        coordinator.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        coordinator.server_close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Benchmark of the prepared statement cache for parameterized executions
+
+Runs the same parameterized query repeatedly through ConnectionManager, once
+with the prepared statement cache disabled, so that the Trino client sends
+PREPARE, EXECUTE and DEALLOCATE for every call (or a single EXECUTE
+IMMEDIATE where the coordinator supports it), once with the cache disabled
+but the query registered with prepare_statement, as /prepare does, and once
+with the cache enabled. The coordinator is benchmarks/fake_trino.py, charging a fixed
+analysis time for every statement it is sent.
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import importlib.util
+
+from fake_trino import FakeTrino
+
+DRIVER_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "trino-odbc-driver.py")
+
+QUERY = "/* fake: rows=1 columns=2 */ SELECT * FROM orders WHERE id = ?"
+
+def load_driver():
+    """Import trino-odbc-driver.py as a module"""
+    spec = importlib.util.spec_from_file_location("trino_odbc_driver", DRIVER_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    logging.getLogger("trino-odbc-driver").setLevel(logging.WARNING)
+    logging.getLogger("trino").setLevel(logging.ERROR)
+    return module
+
+def run(driver, cache_size: int, prepare: bool, executions: int, analysis_seconds: float,
+        execute_immediate: bool) -> dict:
+    """Time executions of QUERY on one cursor with the given prepared statement cache size"""
+    coordinator = FakeTrino(statement_latency=analysis_seconds, execute_immediate=execute_immediate).start()
+
+    manager = driver.ConnectionManager()
+    manager.prepared_statement_cache_size = cache_size
+    try:
+        connection_id = manager.create_connection({"host": "127.0.0.1", "port": coordinator.port, "user": "bench"})
+        cursor_id = manager.create_cursor(connection_id)
+        if prepare:
+            manager.prepare_statement(connection_id, QUERY)
+        # The first execution discovers EXECUTE IMMEDIATE support or prepares the statement
+        manager.execute_query(cursor_id, QUERY, [0], use_cache=False)
+        coordinator.reset_counters()
+
+        start = time.perf_counter()
+        for i in range(executions):
+            manager.execute_query(cursor_id, QUERY, [i], use_cache=False)
+            manager.fetch_results(cursor_id)
+        elapsed = time.perf_counter() - start
+        manager.close_connection(connection_id)
+    finally:
+        coordinator.stop()
+
+    return {
+        "cache_size": cache_size,
+        "prepared": prepare,
+        "execute_immediate": execute_immediate,
+        "executions": executions,
+        "seconds": round(elapsed, 3),
+        "executions_per_sec": round(executions / elapsed, 1),
+        "ms_per_execution": round(elapsed / executions * 1e3, 2),
+        "statements_per_execution": {kind: round(count / executions, 2)
+                                     for kind, count in sorted(coordinator.statements.items())}
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Prepared statement cache benchmark")
+    parser.add_argument('--executions', type=int, default=200,
+                        help='Executions of the query per measurement (default: 200)')
+    parser.add_argument('--analysis-ms', type=float, default=5.0,
+                        help='Milliseconds the fake coordinator spends on each statement (default: 5)')
+    parser.add_argument('--execute-immediate', action='store_true',
+                        help='Let the fake coordinator accept EXECUTE IMMEDIATE, as Trino 418 and later do')
+    parser.add_argument('--cache-size', type=int, default=16,
+                        help='Prepared statement cache size of the cached measurement (default: 16)')
+    args = parser.parse_args()
+
+    driver = load_driver()
+    for cache_size, prepare in ((0, False), (0, True), (args.cache_size, False)):
+        print(json.dumps(run(driver, cache_size, prepare, args.executions, args.analysis_ms / 1e3,
+                             args.execute_immediate)))
+        sys.stdout.flush()
+
+if __name__ == "__main__":
+    main()
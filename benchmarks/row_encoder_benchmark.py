@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Benchmark of JSON row encoding for fetch_results
+
+Encodes a synthetic mixed-type result page by page, once the way the
+service did before row encoders (dict rows handed to Flask's JSON provider)
+and once through a RowEncoder built from the result's description. Rows are
+generated in memory, so no Trino server is needed.
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import datetime
+import importlib.util
+from decimal import Decimal
+
+DRIVER_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "trino-odbc-driver.py")
+
+# Types the generic path can serialize, if not always faithfully
+BASIC_COLUMNS = [
+    ("id", "bigint"),
+    ("price", "decimal(12,2)"),
+    ("ratio", "double"),
+    ("name", "varchar"),
+    ("active", "boolean"),
+    ("day", "date"),
+    ("created", "timestamp(3)")
+]
+
+# Adds types the generic path cannot serialize at all
+FULL_COLUMNS = BASIC_COLUMNS + [
+    ("payload", "varbinary"),
+    ("at", "time(3)"),
+    ("tags", "array(varchar)"),
+    ("attributes", "map(varchar, double)"),
+    ("point", "row(x double, y double, seen date)")
+]
+
+def load_driver():
+    """Import trino-odbc-driver.py as a module"""
+    spec = importlib.util.spec_from_file_location("trino_odbc_driver", DRIVER_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    logging.getLogger("trino-odbc-driver").setLevel(logging.WARNING)
+    return module
+
+def make_row(i: int, columns: list) -> tuple:
+    """Build one row of the given columns the way the Trino client returns it"""
+    day = datetime.date(2024, 1, 1) + datetime.timedelta(days=i % 365)
+    values = {
+        "id": i,
+        "price": Decimal(i % 100000) / 100,
+        "ratio": i / 7,
+        "name": f"name-{i}",
+        "active": i % 2 == 0,
+        "day": day,
+        "created": datetime.datetime(2024, 1, 1, 12, 30) + datetime.timedelta(seconds=i),
+        "payload": i.to_bytes(8, "big"),
+        "at": datetime.time(i % 24, i % 60, i % 60),
+        "tags": ["a", "b", f"t{i % 10}"],
+        "attributes": {"weight": i * 0.5, "score": float(i % 3)},
+        "point": (i * 0.25, i * 0.75, day)
+    }
+    return tuple(values[name] for name, _ in columns)
+
+def encode_generic(driver, encoder, page: list) -> bytes:
+    """The pre-encoder path: dict rows serialized by Flask's JSON provider"""
+    column_names = encoder.column_names
+    result_rows = [dict(zip(column_names, row)) for row in page]
+    return driver.app.json.dumps({"success": True, "rows": result_rows}).encode("utf-8")
+
+def encode_typed(driver, encoder, page: list) -> bytes:
+    """The current path: a RowEncoder built once per result"""
+    column_names = encoder.column_names
+    result_rows = [dict(zip(column_names, row)) for row in encoder.encode_rows(page)]
+    return driver.app.json.dumps({"success": True, "rows": result_rows}).encode("utf-8")
+
+def run(driver, mix: str, path: str, total_rows: int, page_size: int) -> dict:
+    """Encode total_rows rows in pages of page_size rows"""
+    columns = FULL_COLUMNS if mix == "full" else BASIC_COLUMNS
+    description = [(name, type_code, None, None, None, None, None) for name, type_code in columns]
+    pages = [[make_row(start + i, columns) for i in range(page_size)]
+             for start in range(0, total_rows, page_size)]
+
+    encode = encode_generic if path == "generic" else encode_typed
+    result = {"mix": mix, "path": path, "rows": total_rows, "page_size": page_size}
+    byte_count = 0
+    start = time.perf_counter()
+    try:
+        # Built inside the timed region, as fetch_results builds it on the first page
+        encoder = driver.RowEncoder(description)
+        for page in pages:
+            byte_count += len(encode(driver, encoder, page))
+    except (TypeError, ValueError) as e:
+        result["error"] = str(e)
+        return result
+    elapsed = time.perf_counter() - start
+
+    result.update({
+        "seconds": round(elapsed, 3),
+        "rows_per_sec": round(total_rows / elapsed),
+        "bytes": byte_count
+    })
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description="JSON row encoding benchmark")
+    parser.add_argument('--rows', type=int, default=1000000,
+                        help='Rows to encode per measurement (default: 1000000)')
+    parser.add_argument('--page-size', type=int, default=1000,
+                        help='Rows per fetch page (default: 1000)')
+    parser.add_argument('--mixes', nargs='+', choices=["basic", "full"], default=["basic", "full"],
+                        help='Column type mixes to measure (default: basic full)')
+    args = parser.parse_args()
+
+    driver = load_driver()
+    for mix in args.mixes:
+        for path in ("generic", "typed"):
+            print(json.dumps(run(driver, mix, path, args.rows, args.page_size)))
+            sys.stdout.flush()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Benchmark of the driver service's serving modes
+
+Starts the service once per mode and drives it with concurrent clients that
+open a connection, read its info, open and close a cursor and close the
+connection again. Connections are created lazily by the Trino client, so no
+Trino server is needed; the numbers measure the HTTP serving layer.
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+import subprocess
+import http.client
+
+DRIVER_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "trino-odbc-driver.py")
+
+MODES = {
+    "dev": ["--server", "dev"],
+    "gunicorn-1x16": ["--server", "gunicorn", "--workers", "1", "--threads", "16"],
+    "gunicorn-4x16": ["--server", "gunicorn", "--workers", "4", "--threads", "16"],
+    "asyncio": ["--server", "asyncio"]
+}
+
+INFO_REQUESTS_PER_CONNECTION = 8
+
+def request(conn: http.client.HTTPConnection, method: str, path: str, body=None) -> dict:
+    """Send one JSON request on a keep-alive connection"""
+    payload = json.dumps(body).encode("utf-8") if body is not None else None
+    conn.request(method, path, body=payload, headers={"Content-Type": "application/json"})
+    response = conn.getresponse()
+    result = json.loads(response.read())
+    if not result.get("success", False):
+        raise RuntimeError(result.get("error"))
+    return result
+
+def client(port: int, deadline: float, latencies: list, errors: list) -> None:
+    """Run connection lifecycles until the deadline, recording per-request latency"""
+    conn = http.client.HTTPConnection("127.0.0.1", port)
+
+    def timed(method, path, body=None):
+        start = time.perf_counter()
+        result = request(conn, method, path, body)
+        latencies.append(time.perf_counter() - start)
+        return result
+
+    while time.monotonic() < deadline:
+        try:
+            connection_id = timed("POST", "/connections", {"host": "localhost", "user": "bench"})["connection_id"]
+            for _ in range(INFO_REQUESTS_PER_CONNECTION):
+                timed("GET", f"/connections/{connection_id}/info")
+            cursor_id = timed("POST", f"/connections/{connection_id}/cursors")["cursor_id"]
+            timed("DELETE", f"/cursors/{cursor_id}")
+            timed("DELETE", f"/connections/{connection_id}")
+        except Exception as e:
+            errors.append(str(e))
+            conn.close()
+            conn = http.client.HTTPConnection("127.0.0.1", port)
+    conn.close()
+
+def wait_until_ready(port: int, timeout: float = 30.0) -> None:
+    """Poll /status until the service answers"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            conn.request("GET", "/status")
+            if conn.getresponse().status == 200:
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"Service on port {port} did not start")
+
+def run(mode: str, port: int, clients: int, duration: float) -> dict:
+    """Measure one serving mode"""
+    service = subprocess.Popen(
+        [sys.executable, DRIVER_PATH, "--host", "127.0.0.1", "--port", str(port)] + MODES[mode],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_until_ready(port)
+
+        latencies, errors = [], []
+        deadline = time.monotonic() + duration
+        threads = [threading.Thread(target=client, args=(port, deadline, latencies, errors))
+                   for _ in range(clients)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+    finally:
+        service.terminate()
+        service.wait()
+
+    latencies.sort()
+    return {
+        "mode": mode,
+        "clients": clients,
+        "requests": len(latencies),
+        "errors": len(errors),
+        "requests_per_sec": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(latencies[len(latencies) // 2] * 1e3, 2) if latencies else None,
+        "p99_ms": round(latencies[int(len(latencies) * 0.99)] * 1e3, 2) if latencies else None
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Serving mode benchmark")
+    parser.add_argument('--modes', nargs='+', choices=list(MODES), default=list(MODES),
+                        help='Serving modes to measure (default: all)')
+    parser.add_argument('--clients', type=int, default=32,
+                        help='Concurrent client threads (default: 32)')
+    parser.add_argument('--duration', type=float, default=10.0,
+                        help='Seconds to drive each mode (default: 10)')
+    parser.add_argument('--port', type=int, default=18991,
+                        help='Port to run the service on (default: 18991)')
+    args = parser.parse_args()
+
+    for mode in args.modes:
+        print(json.dumps(run(mode, args.port, args.clients, args.duration)))
+        sys.stdout.flush()
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,22 @@
 using System;
+using System.Buffers;
+using System.Buffers.Binary;
 using System.Collections.Generic;
 using System.Data;
 using System.Data.Common;
+using System.IO;
+using System.Linq;
+using System.Net;
 using System.Net.Http;
+using System.Net.Http.Headers;
+using System.Numerics;
 using System.Text;
 using System.Text.Json;
 using System.Threading.Tasks;
+using Apache.Arrow;
+using Apache.Arrow.Ipc;
+using Apache.Arrow.Types;
+using MessagePack;
 
 namespace TrinoODBC
 {
@@ -26,7 +37,11 @@ namespace TrinoODBC
         /// </summary>
         public TrinoConnection()
         {
-            _httpClient = new HttpClient();
+            // Result pages are compressed by the driver service when the client accepts gzip
+            _httpClient = new HttpClient(new HttpClientHandler
+            {
+                AutomaticDecompression = DecompressionMethods.GZip | DecompressionMethods.Deflate
+            });
             _state = ConnectionState.Closed;
             _connectionParams = new Dictionary<string, string>();
         }
@@ -85,6 +100,20 @@ namespace TrinoODBC
             ? int.Parse(_connectionParams["timeout"]) 
             : 30;
 
+        /// <summary>
+        /// Gets the result transfer format: json (paged, default), arrow (paged Arrow IPC), msgpack (paged MessagePack) or ndjson (single streamed response)
+        /// </summary>
+        internal string ResultFormat => _connectionParams.ContainsKey("resultformat")
+            ? _connectionParams["resultformat"].ToLowerInvariant()
+            : "json";
+
+        /// <summary>
+        /// Gets the encoded-size budget for result pages in bytes, or 0 for fixed pages of 1000 rows
+        /// </summary>
+        internal int FetchMaxBytes => _connectionParams.ContainsKey("fetchmaxbytes")
+            ? int.Parse(_connectionParams["fetchmaxbytes"])
+            : 0;
+
         /// <summary>
         /// Begins a database transaction
         /// </summary>
@@ -160,7 +189,7 @@ namespace TrinoODBC
                 // Copy connection parameters
                 foreach (var param in _connectionParams)
                 {
-                    if (param.Key != "driver" && param.Key != "port" && param.Key != "server")
+                    if (param.Key != "driver" && param.Key != "port" && param.Key != "server" && param.Key != "resultformat" && param.Key != "fetchmaxbytes")
                     {
                         parameters[param.Key] = param.Value;
                     }
@@ -223,7 +252,7 @@ namespace TrinoODBC
                 // Copy connection parameters
                 foreach (var param in _connectionParams)
                 {
-                    if (param.Key != "driver" && param.Key != "port" && param.Key != "server")
+                    if (param.Key != "driver" && param.Key != "port" && param.Key != "server" && param.Key != "resultformat" && param.Key != "fetchmaxbytes")
                     {
                         parameters[param.Key] = param.Value;
                     }
@@ -272,6 +301,87 @@ namespace TrinoODBC
             return new TrinoCommand(this, _httpClient, _serverUrl);
         }
 
+        /// <summary>
+        /// Returns schema information for the data source
+        /// </summary>
+        /// <param name="collectionName">Schemas, Tables or Columns</param>
+        /// <returns>A table with one row per object found</returns>
+        public override DataTable GetSchema(string collectionName)
+        {
+            return GetSchema(collectionName, null);
+        }
+
+        /// <summary>
+        /// Returns schema information for the data source, filtered by restrictions
+        /// </summary>
+        /// <param name="collectionName">Schemas, Tables or Columns</param>
+        /// <param name="restrictionValues">Catalog, then LIKE patterns for the schema, table and column names; null entries are ignored</param>
+        /// <returns>A table with one row per object found</returns>
+        public override DataTable GetSchema(string collectionName, string[] restrictionValues)
+        {
+            if (_state != ConnectionState.Open)
+            {
+                throw new InvalidOperationException("Connection is not open");
+            }
+
+            var kind = collectionName?.ToLowerInvariant();
+            if (kind != "schemas" && kind != "tables" && kind != "columns")
+            {
+                throw new NotSupportedException($"Schema collection {collectionName} is not supported by the Trino ODBC driver");
+            }
+
+            var query = new List<string>();
+            var restrictionNames = new[] { "catalog", "schema", "table", "column" };
+            for (int i = 0; restrictionValues != null && i < restrictionValues.Length && i < restrictionNames.Length; i++)
+            {
+                if (restrictionValues[i] != null)
+                {
+                    query.Add($"{restrictionNames[i]}={Uri.EscapeDataString(restrictionValues[i])}");
+                }
+            }
+
+            try
+            {
+                var url = $"{_serverUrl}/connections/{_connectionId}/metadata/{kind}";
+                if (query.Count > 0)
+                {
+                    url += "?" + string.Join("&", query);
+                }
+
+                var response = _httpClient.GetAsync(url).Result;
+                var jsonResponse = JsonDocument.Parse(response.Content.ReadAsStringAsync().Result);
+                var success = jsonResponse.RootElement.GetProperty("success").GetBoolean();
+
+                if (!success)
+                {
+                    var error = jsonResponse.RootElement.GetProperty("error").GetString();
+                    throw new DbException($"Failed to get schema {collectionName}: {error}");
+                }
+
+                var table = new DataTable(collectionName);
+                foreach (var column in jsonResponse.RootElement.GetProperty("columns").EnumerateArray())
+                {
+                    table.Columns.Add(column.GetString(), typeof(object));
+                }
+
+                foreach (var row in jsonResponse.RootElement.GetProperty("rows").EnumerateArray())
+                {
+                    var dataRow = table.NewRow();
+                    foreach (var property in row.EnumerateObject())
+                    {
+                        dataRow[property.Name] = TrinoDataReader.GetJsonValue(property.Value) ?? DBNull.Value;
+                    }
+                    table.Rows.Add(dataRow);
+                }
+
+                return table;
+            }
+            catch (Exception ex)
+            {
+                throw new DbException($"Error getting schema {collectionName}: {ex.Message}", ex);
+            }
+        }
+
         /// <summary>
         /// Parse the connection string into individual parameters
         /// </summary>
@@ -321,6 +431,7 @@ namespace TrinoODBC
         private UpdateRowSource _updateRowSource;
         private List<TrinoParameter> _parameters;
         private string _cursorId;
+        private System.Threading.CancellationTokenSource _executeCancellation = new System.Threading.CancellationTokenSource();
 
         /// <summary>
         /// Creates a new Trino command
@@ -438,7 +549,24 @@ namespace TrinoODBC
         /// </summary>
         public override void Cancel()
         {
-            throw new NotSupportedException("Cancel is not supported by the Trino ODBC driver");
+            // Abandon a request that has not returned yet; the combined /query
+            // call does not hand out its cursor ID until the first page is ready
+            _executeCancellation.Cancel();
+
+            var cursorId = _cursorId;
+            if (string.IsNullOrEmpty(cursorId))
+            {
+                return;
+            }
+
+            try
+            {
+                _httpClient.PostAsync($"{_serverUrl}/cursors/{cursorId}/cancel", null).Wait();
+            }
+            catch
+            {
+                // Cancel must not throw if there is nothing left to cancel
+            }
         }
 
         /// <summary>
@@ -462,6 +590,100 @@ namespace TrinoODBC
             }
         }
 
+        /// <summary>
+        /// Executes the command once for each row of parameter values
+        /// </summary>
+        /// <remarks>
+        /// The rows are sent to the driver service in one request. A single-row
+        /// INSERT ... VALUES command is run as multi-row INSERT statements; any
+        /// other command runs once per row. Parameters added to the command are ignored.
+        /// </remarks>
+        /// <param name="rows">The parameter values of each row, in placeholder order</param>
+        /// <param name="concurrency">Maximum number of statements running at once, or 0 for the service default</param>
+        /// <returns>The number of rows affected by each statement run</returns>
+        public int[] ExecuteBatch(IEnumerable<object[]> rows, int concurrency = 0)
+        {
+            if (_connection == null)
+            {
+                throw new InvalidOperationException("Connection is not set");
+            }
+
+            if (_connection.State != ConnectionState.Open)
+            {
+                throw new InvalidOperationException("Connection is not open");
+            }
+
+            if (string.IsNullOrEmpty(_commandText))
+            {
+                throw new InvalidOperationException("Command text is not set");
+            }
+
+            DisposeCurrentCursor();
+
+            try
+            {
+                // Send the parameters column by column, which is more compact than one array per row
+                var rowList = rows.ToList();
+                var columnCount = rowList.Count > 0 ? rowList[0].Length : 0;
+                var columns = Enumerable.Range(0, columnCount)
+                    .Select(i => rowList.Select(row => row[i]).ToList())
+                    .ToList();
+
+                var parameters = new Dictionary<string, object>
+                {
+                    ["query"] = _commandText,
+                    ["columns"] = columns
+                };
+                if (concurrency > 0)
+                {
+                    parameters["concurrency"] = concurrency;
+                }
+
+                var connectionId = (_connection as TrinoConnection)._connectionId;
+
+                var cursorResponse = _httpClient.PostAsync(
+                    $"{_serverUrl}/connections/{connectionId}/cursors",
+                    null).Result;
+
+                var cursorJson = JsonDocument.Parse(cursorResponse.Content.ReadAsStringAsync().Result);
+                if (!cursorJson.RootElement.GetProperty("success").GetBoolean())
+                {
+                    var error = cursorJson.RootElement.GetProperty("error").GetString();
+                    throw new DbException($"Failed to create cursor: {error}");
+                }
+
+                _cursorId = cursorJson.RootElement.GetProperty("cursor_id").GetString();
+
+                var content = new StringContent(
+                    JsonSerializer.Serialize(parameters),
+                    Encoding.UTF8,
+                    "application/json");
+
+                var response = _httpClient.PostAsync(
+                    $"{_serverUrl}/cursors/{_cursorId}/executemany",
+                    content).Result;
+
+                var json = JsonDocument.Parse(response.Content.ReadAsStringAsync().Result);
+                if (!json.RootElement.GetProperty("success").GetBoolean())
+                {
+                    var error = json.RootElement.GetProperty("error").GetString();
+                    throw new DbException($"Failed to execute batch: {error}");
+                }
+
+                return json.RootElement.GetProperty("batches").EnumerateArray()
+                    .Select(batch => batch.GetProperty("rowcount").GetInt32())
+                    .ToArray();
+            }
+            catch (Exception ex)
+            {
+                throw new DbException($"Error executing batch: {ex.Message}", ex);
+            }
+            finally
+            {
+                DisposeCurrentCursor();
+            }
+        }
+
         /// <summary>
         /// Executes the query and returns the first column of the first row
         /// </summary>
@@ -502,11 +724,80 @@ namespace TrinoODBC
 
             try
             {
-                // Create a cursor
+                // Build the request body
+                var parameters = new Dictionary<string, object>
+                {
+                    ["query"] = _commandText
+                };
+
+                // Add parameters if any
+                if (_parameters.Count > 0)
+                {
+                    var paramValues = new List<object>();
+                    foreach (TrinoParameter param in _parameters)
+                    {
+                        paramValues.Add(param.Value);
+                    }
+                    parameters["parameters"] = paramValues;
+                }
+
                 var connectionId = (_connection as TrinoConnection)._connectionId;
+
+                if (_executeCancellation.IsCancellationRequested)
+                {
+                    _executeCancellation.Dispose();
+                    _executeCancellation = new System.Threading.CancellationTokenSource();
+                }
+                var cancellationToken = _executeCancellation.Token;
+
+                // Paged JSON results can execute and fetch the first page in a single round trip
+                if (_connection.ResultFormat == "json")
+                {
+                    if (_connection.FetchMaxBytes > 0)
+                    {
+                        parameters["max_bytes"] = _connection.FetchMaxBytes;
+                    }
+                    else
+                    {
+                        parameters["max_rows"] = 1000;
+                    }
+
+                    var queryContent = new StringContent(
+                        JsonSerializer.Serialize(parameters),
+                        Encoding.UTF8,
+                        "application/json");
+
+                    var queryResponse = _httpClient.PostAsync(
+                        $"{_serverUrl}/connections/{connectionId}/query",
+                        queryContent,
+                        cancellationToken).Result;
+
+                    if (!queryResponse.IsSuccessStatusCode)
+                    {
+                        throw new DbException($"Failed to execute query: {queryResponse.ReasonPhrase}");
+                    }
+
+                    var queryJson = JsonDocument.Parse(queryResponse.Content.ReadAsStringAsync().Result);
+                    var querySuccess = queryJson.RootElement.GetProperty("success").GetBoolean();
+
+                    if (!querySuccess)
+                    {
+                        var error = queryJson.RootElement.GetProperty("error").GetString();
+                        throw new DbException($"Failed to execute query: {error}");
+                    }
+
+                    // The service closes the cursor itself when the first page holds the whole result
+                    var cursorIdElement = queryJson.RootElement.GetProperty("cursor_id");
+                    _cursorId = cursorIdElement.ValueKind == JsonValueKind.Null ? null : cursorIdElement.GetString();
+
+                    return new TrinoDataReader(_httpClient, _serverUrl, _cursorId, behavior, queryJson.RootElement, _connection.FetchMaxBytes);
+                }
+
+                // Create a cursor
                 var cursorResponse = _httpClient.PostAsync(
                     $"{_serverUrl}/connections/{connectionId}/cursors",
-                    null).Result;
+                    null,
+                    cancellationToken).Result;
 
                 if (!cursorResponse.IsSuccessStatusCode)
                 {
@@ -524,23 +815,6 @@ namespace TrinoODBC
 
                 _cursorId = cursorJson.RootElement.GetProperty("cursor_id").GetString();
 
-                // Execute the query
-                var parameters = new Dictionary<string, object>
-                {
-                    ["query"] = _commandText
-                };
-
-                // Add parameters if any
-                if (_parameters.Count > 0)
-                {
-                    var paramValues = new List<object>();
-                    foreach (TrinoParameter param in _parameters)
-                    {
-                        paramValues.Add(param.Value);
-                    }
-                    parameters["parameters"] = paramValues;
-                }
-
                 var executeContent = new StringContent(
                     JsonSerializer.Serialize(parameters),
                     Encoding.UTF8,
@@ -548,7 +822,8 @@ namespace TrinoODBC
 
                 var executeResponse = _httpClient.PostAsync(
                     $"{_serverUrl}/cursors/{_cursorId}/execute",
-                    executeContent).Result;
+                    executeContent,
+                    cancellationToken).Result;
 
                 if (!executeResponse.IsSuccessStatusCode)
                 {
@@ -565,7 +840,7 @@ namespace TrinoODBC
                 }
 
                 // Return a data reader
-                return new TrinoDataReader(_httpClient, _serverUrl, _cursorId, behavior);
+                return new TrinoDataReader(_httpClient, _serverUrl, _cursorId, behavior, _connection.ResultFormat, _connection.FetchMaxBytes);
             }
             catch (Exception ex)
             {
@@ -574,12 +849,50 @@ namespace TrinoODBC
         }
 
         /// <summary>
-        /// Prepares the command
+        /// Prepares the command as a Trino prepared statement on the connection,
+        /// which later executions of the same command text then reuse
         /// </summary>
         public override void Prepare()
         {
-            // Trino doesn't support prepared statements in the same way as other databases
-            // This method is a no-op
+            if (_connection == null)
+            {
+                throw new InvalidOperationException("Connection is not set");
+            }
+
+            if (_connection.State != ConnectionState.Open)
+            {
+                throw new InvalidOperationException("Connection is not open");
+            }
+
+            if (string.IsNullOrEmpty(_commandText))
+            {
+                throw new InvalidOperationException("Command text is not set");
+            }
+
+            try
+            {
+                var connectionId = (_connection as TrinoConnection)._connectionId;
+
+                var content = new StringContent(
+                    JsonSerializer.Serialize(new Dictionary<string, object> { ["query"] = _commandText }),
+                    Encoding.UTF8,
+                    "application/json");
+
+                var response = _httpClient.PostAsync(
+                    $"{_serverUrl}/connections/{connectionId}/prepare",
+                    content).Result;
+
+                var json = JsonDocument.Parse(response.Content.ReadAsStringAsync().Result);
+                if (!json.RootElement.GetProperty("success").GetBoolean())
+                {
+                    var error = json.RootElement.GetProperty("error").GetString();
+                    throw new DbException($"Failed to prepare command: {error}");
+                }
+            }
+            catch (Exception ex)
+            {
+                throw new DbException($"Error preparing command: {ex.Message}", ex);
+            }
         }
 
         /// <summary>
@@ -613,6 +926,7 @@ namespace TrinoODBC
             if (disposing)
             {
                 DisposeCurrentCursor();
+                _executeCancellation.Dispose();
             }
             base.Dispose(disposing);
         }
@@ -1010,10 +1324,25 @@ namespace TrinoODBC
     /// </summary>
     public class TrinoDataReader : DbDataReader
     {
+        private const string ArrowStreamMediaType = "application/vnd.apache.arrow.stream";
+        private const string MessagePackMediaType = "application/msgpack";
+
+        // Extension type codes the driver service uses for MessagePack values
+        private const sbyte MessagePackDecimal = 1;
+        private const sbyte MessagePackDate = 2;
+        private const sbyte MessagePackTimestamp = 3;
+        private const sbyte MessagePackTimestampWithTimeZone = 4;
+        private const sbyte MessagePackTime = 5;
+
+        private static readonly DateTime UnixEpoch = new DateTime(1970, 1, 1);
+        private static readonly BigInteger DecimalMagnitudeLimit = BigInteger.One << 96;
+
         private readonly HttpClient _httpClient;
         private readonly string _serverUrl;
         private readonly string _cursorId;
         private readonly CommandBehavior _behavior;
+        private readonly string _resultFormat;
+        private readonly int _fetchMaxBytes;
         private List<Dictionary<string, object>> _currentBatch;
         private int _currentRowIndex;
         private bool _hasMoreRows;
@@ -1021,6 +1350,8 @@ namespace TrinoODBC
         private List<string> _columnNames;
         private Dictionary<string, int> _columnNameToIndex;
         private int _recordsAffected;
+        private HttpResponseMessage _streamResponse;
+        private StreamReader _streamReader;
 
         /// <summary>
         /// Creates a new Trino data reader
@@ -1029,12 +1360,45 @@ namespace TrinoODBC
         /// <param name="serverUrl">The server URL</param>
         /// <param name="cursorId">The cursor ID</param>
         /// <param name="behavior">The command behavior</param>
-        public TrinoDataReader(HttpClient httpClient, string serverUrl, string cursorId, CommandBehavior behavior)
+        /// <param name="resultFormat">The result transfer format: json, arrow, msgpack or ndjson</param>
+        /// <param name="fetchMaxBytes">Encoded-size budget for each fetched page, or 0 for fixed pages of 1000 rows</param>
+        public TrinoDataReader(HttpClient httpClient, string serverUrl, string cursorId, CommandBehavior behavior, string resultFormat = "json", int fetchMaxBytes = 0)
+            : this(httpClient, serverUrl, cursorId, behavior, resultFormat, fetchMaxBytes, true)
+        {
+        }
+
+        /// <summary>
+        /// Creates a new Trino data reader over the first page returned by the combined query endpoint
+        /// </summary>
+        /// <param name="httpClient">The HTTP client</param>
+        /// <param name="serverUrl">The server URL</param>
+        /// <param name="cursorId">The cursor ID, or null if the service already closed the cursor</param>
+        /// <param name="behavior">The command behavior</param>
+        /// <param name="firstPage">The query response holding the column metadata and first page</param>
+        /// <param name="fetchMaxBytes">Encoded-size budget for each fetched page, or 0 for fixed pages of 1000 rows</param>
+        internal TrinoDataReader(HttpClient httpClient, string serverUrl, string cursorId, CommandBehavior behavior, JsonElement firstPage, int fetchMaxBytes = 0)
+            : this(httpClient, serverUrl, cursorId, behavior, "json", fetchMaxBytes, false)
+        {
+            if (firstPage.TryGetProperty("columns", out var columnsElement))
+            {
+                _columnNames = columnsElement.EnumerateArray().Select(column => column.GetProperty("name").GetString()).ToList();
+                for (int i = 0; i < _columnNames.Count; i++)
+                {
+                    _columnNameToIndex[_columnNames[i]] = i;
+                }
+            }
+
+            LoadJsonBatch(firstPage);
+        }
+
+        private TrinoDataReader(HttpClient httpClient, string serverUrl, string cursorId, CommandBehavior behavior, string resultFormat, int fetchMaxBytes, bool fetchFirstBatch)
         {
             _httpClient = httpClient;
             _serverUrl = serverUrl;
             _cursorId = cursorId;
             _behavior = behavior;
+            _resultFormat = resultFormat;
+            _fetchMaxBytes = fetchMaxBytes;
             _currentBatch = new List<Dictionary<string, object>>();
             _currentRowIndex = -1;
             _hasMoreRows = true;
@@ -1044,7 +1408,10 @@ namespace TrinoODBC
             _recordsAffected = -1;
 
             // Fetch the first batch
-            FetchNextBatch();
+            if (fetchFirstBatch)
+            {
+                FetchNextBatch();
+            }
         }
 
         /// <summary>
@@ -1095,7 +1462,11 @@ namespace TrinoODBC
             {
                 try
                 {
-                    _httpClient.DeleteAsync($"{_serverUrl}/cursors/{_cursorId}").Wait();
+                    DisposeStream();
+                    if (!string.IsNullOrEmpty(_cursorId))
+                    {
+                        _httpClient.DeleteAsync($"{_serverUrl}/cursors/{_cursorId}").Wait();
+                    }
                 }
                 catch
                 {
@@ -1268,15 +1639,37 @@ namespace TrinoODBC
             return false;
         }
 
+        /// <summary>
+        /// Gets the fetch query string sizing the next page: a byte budget the service converts to rows, or 1000 rows
+        /// </summary>
+        private string PageSizeQuery => _fetchMaxBytes > 0 ? $"max_bytes={_fetchMaxBytes}" : "max_rows=1000";
+
         /// <summary>
         /// Fetches the next batch of records
         /// </summary>
         private void FetchNextBatch()
         {
+            if (_resultFormat == "arrow")
+            {
+                FetchNextArrowBatch();
+                return;
+            }
+
+            if (_resultFormat == "msgpack")
+            {
+                FetchNextMessagePackBatch();
+                return;
+            }
+
+            if (_resultFormat == "ndjson")
+            {
+                FetchNextStreamBatch();
+                return;
+            }
+
             try
             {
-                var max_rows = 1000;
-                var response = _httpClient.GetAsync($"{_serverUrl}/cursors/{_cursorId}/fetch?max_rows={max_rows}").Result;
+                var response = _httpClient.GetAsync($"{_serverUrl}/cursors/{_cursorId}/fetch?{PageSizeQuery}").Result;
 
                 if (!response.IsSuccessStatusCode)
                 {
@@ -1292,46 +1685,324 @@ namespace TrinoODBC
                     throw new DbException($"Failed to fetch results: {error}");
                 }
 
-                _hasMoreRows = jsonResponse.RootElement.GetProperty("has_more").GetBoolean();
-                
-                // Get the rows
+                LoadJsonBatch(jsonResponse.RootElement);
+            }
+            catch (Exception ex)
+            {
+                throw new DbException($"Error fetching results: {ex.Message}", ex);
+            }
+        }
+
+        /// <summary>
+        /// Loads a page of row objects from a fetch or query response
+        /// </summary>
+        /// <param name="page">The response holding "rows" and "has_more"</param>
+        private void LoadJsonBatch(JsonElement page)
+        {
+            _hasMoreRows = page.GetProperty("has_more").GetBoolean();
+            
+            // Get the rows
+            var rows = new List<Dictionary<string, object>>();
+            var rowsElement = page.GetProperty("rows");
+            
+            foreach (var rowElement in rowsElement.EnumerateArray())
+            {
+                var row = new Dictionary<string, object>();
+                foreach (var property in rowElement.EnumerateObject())
+                {
+                    row[property.Name] = GetJsonValue(property.Value);
+                }
+                rows.Add(row);
+            }
+
+            _currentBatch = rows;
+
+            // Initialize column names if this is the first batch
+            if (_columnNames.Count == 0 && _currentBatch.Count > 0)
+            {
+                _columnNames = new List<string>(_currentBatch[0].Keys);
+                for (int i = 0; i < _columnNames.Count; i++)
+                {
+                    _columnNameToIndex[_columnNames[i]] = i;
+                }
+            }
+        }
+
+        /// <summary>
+        /// Converts a JSON value from a result row to a CLR value
+        /// </summary>
+        /// <param name="element">The JSON value</param>
+        /// <returns>The value, or null for JSON null</returns>
+        internal static object GetJsonValue(JsonElement element)
+        {
+            switch (element.ValueKind)
+            {
+                case JsonValueKind.Null:
+                    return null;
+                case JsonValueKind.String:
+                    return element.GetString();
+                case JsonValueKind.Number:
+                    if (element.TryGetInt64(out var intValue))
+                    {
+                        return intValue;
+                    }
+                    return element.GetDouble();
+                case JsonValueKind.True:
+                case JsonValueKind.False:
+                    return element.GetBoolean();
+                default:
+                    return element.GetRawText();
+            }
+        }
+
+        /// <summary>
+        /// Reads the next batch of records from the NDJSON stream, opening it on first use
+        /// </summary>
+        private void FetchNextStreamBatch()
+        {
+            try
+            {
+                var max_rows = 1000;
+
+                if (_streamReader == null)
+                {
+                    _streamResponse = _httpClient.GetAsync(
+                        $"{_serverUrl}/cursors/{_cursorId}/stream?page_size={max_rows}",
+                        HttpCompletionOption.ResponseHeadersRead).Result;
+
+                    if (!_streamResponse.IsSuccessStatusCode)
+                    {
+                        throw new DbException($"Failed to fetch results: {_streamResponse.ReasonPhrase}");
+                    }
+
+                    _streamReader = new StreamReader(_streamResponse.Content.ReadAsStreamAsync().Result, Encoding.UTF8);
+                }
+
                 var rows = new List<Dictionary<string, object>>();
-                var rowsElement = jsonResponse.RootElement.GetProperty("rows");
-                
-                foreach (var rowElement in rowsElement.EnumerateArray())
+                var finished = false;
+
+                while (rows.Count < max_rows)
                 {
-                    var row = new Dictionary<string, object>();
-                    foreach (var property in rowElement.EnumerateObject())
+                    var line = _streamReader.ReadLine();
+                    if (line == null)
                     {
-                        if (property.Value.ValueKind == JsonValueKind.Null)
-                        {
-                            row[property.Name] = null;
-                        }
-                        else if (property.Value.ValueKind == JsonValueKind.String)
-                        {
-                            row[property.Name] = property.Value.GetString();
-                        }
-                        else if (property.Value.ValueKind == JsonValueKind.Number)
+                        throw new DbException("Result stream ended unexpectedly");
+                    }
+
+                    using (var document = JsonDocument.Parse(line))
+                    {
+                        var root = document.RootElement;
+
+                        if (root.ValueKind == JsonValueKind.Array)
                         {
-                            if (property.Value.TryGetInt64(out var intValue))
+                            var row = new Dictionary<string, object>();
+                            var ordinal = 0;
+                            foreach (var element in root.EnumerateArray())
                             {
-                                row[property.Name] = intValue;
+                                row[_columnNames[ordinal++]] = GetJsonValue(element);
                             }
-                            else
+                            rows.Add(row);
+                        }
+                        else if (root.TryGetProperty("columns", out var columnsElement))
+                        {
+                            // The header line carries the column names, so they are known even for empty results
+                            _columnNames = columnsElement.EnumerateArray().Select(column => column.GetString()).ToList();
+                            for (int i = 0; i < _columnNames.Count; i++)
                             {
-                                row[property.Name] = property.Value.GetDouble();
+                                _columnNameToIndex[_columnNames[i]] = i;
                             }
                         }
-                        else if (property.Value.ValueKind == JsonValueKind.True || property.Value.ValueKind == JsonValueKind.False)
+                        else if (root.TryGetProperty("error", out var errorElement))
                         {
-                            row[property.Name] = property.Value.GetBoolean();
+                            throw new DbException($"Failed to fetch results: {errorElement.GetString()}");
                         }
-                        else
+                        else if (root.TryGetProperty("done", out _))
                         {
-                            row[property.Name] = property.Value.GetRawText();
+                            finished = true;
+                            break;
                         }
                     }
-                    rows.Add(row);
+                }
+
+                _currentBatch = rows;
+
+                if (finished)
+                {
+                    _hasMoreRows = false;
+                    DisposeStream();
+                }
+            }
+            catch (Exception ex)
+            {
+                DisposeStream();
+                throw new DbException($"Error fetching results: {ex.Message}", ex);
+            }
+        }
+
+        /// <summary>
+        /// Releases the NDJSON result stream if one is open
+        /// </summary>
+        private void DisposeStream()
+        {
+            _streamReader?.Dispose();
+            _streamReader = null;
+            _streamResponse?.Dispose();
+            _streamResponse = null;
+        }
+
+        /// <summary>
+        /// Fetches the next batch of records as an Arrow IPC stream
+        /// </summary>
+        private void FetchNextArrowBatch()
+        {
+            try
+            {
+                var request = new HttpRequestMessage(HttpMethod.Get, $"{_serverUrl}/cursors/{_cursorId}/fetch?{PageSizeQuery}");
+                request.Headers.Accept.Add(new MediaTypeWithQualityHeaderValue(ArrowStreamMediaType));
+                var response = _httpClient.SendAsync(request).Result;
+
+                if (!response.IsSuccessStatusCode)
+                {
+                    throw new DbException($"Failed to fetch results: {response.ReasonPhrase}");
+                }
+
+                _hasMoreRows = response.Headers.TryGetValues("X-Trino-Has-More", out var hasMoreValues)
+                    && string.Equals(hasMoreValues.First(), "true", StringComparison.OrdinalIgnoreCase);
+
+                var rows = new List<Dictionary<string, object>>();
+                using (var stream = response.Content.ReadAsStreamAsync().Result)
+                using (var reader = new ArrowStreamReader(stream))
+                {
+                    RecordBatch batch;
+                    while ((batch = reader.ReadNextRecordBatch()) != null)
+                    {
+                        using (batch)
+                        {
+                            for (int rowIndex = 0; rowIndex < batch.Length; rowIndex++)
+                            {
+                                var row = new Dictionary<string, object>();
+                                for (int columnIndex = 0; columnIndex < batch.ColumnCount; columnIndex++)
+                                {
+                                    row[batch.Schema.GetFieldByIndex(columnIndex).Name] = GetArrowValue(batch.Column(columnIndex), rowIndex);
+                                }
+                                rows.Add(row);
+                            }
+                        }
+                    }
+
+                    // The schema carries the column names, so they are known even for empty results
+                    if (_columnNames.Count == 0 && reader.Schema != null)
+                    {
+                        _columnNames = reader.Schema.FieldsList.Select(field => field.Name).ToList();
+                        for (int i = 0; i < _columnNames.Count; i++)
+                        {
+                            _columnNameToIndex[_columnNames[i]] = i;
+                        }
+                    }
+                }
+
+                _currentBatch = rows;
+            }
+            catch (Exception ex)
+            {
+                throw new DbException($"Error fetching results: {ex.Message}", ex);
+            }
+        }
+
+        /// <summary>
+        /// Converts a single Arrow array slot to a CLR value
+        /// </summary>
+        /// <param name="array">The Arrow column</param>
+        /// <param name="index">The row index within the column</param>
+        /// <returns>The value, or null if the slot is null</returns>
+        private static object GetArrowValue(IArrowArray array, int index)
+        {
+            if (array.IsNull(index))
+            {
+                return null;
+            }
+
+            switch (array)
+            {
+                case BooleanArray booleanArray:
+                    return booleanArray.GetValue(index);
+                case Int8Array int8Array:
+                    return int8Array.GetValue(index);
+                case Int16Array int16Array:
+                    return int16Array.GetValue(index);
+                case Int32Array int32Array:
+                    return int32Array.GetValue(index);
+                case Int64Array int64Array:
+                    return int64Array.GetValue(index);
+                case FloatArray floatArray:
+                    return floatArray.GetValue(index);
+                case DoubleArray doubleArray:
+                    return doubleArray.GetValue(index);
+                case Decimal128Array decimalArray:
+                    return decimalArray.GetValue(index);
+                case StringArray stringArray:
+                    return stringArray.GetString(index);
+                case BinaryArray binaryArray:
+                    return binaryArray.GetBytes(index).ToArray();
+                case Date32Array dateArray:
+                    return dateArray.GetDateTime(index);
+                case TimestampArray timestampArray:
+                    var timestamp = timestampArray.GetTimestamp(index).Value;
+                    return string.IsNullOrEmpty(((TimestampType)timestampArray.Data.DataType).Timezone)
+                        ? timestamp.DateTime
+                        : timestamp.UtcDateTime;
+                case Time64Array timeArray:
+                    return TimeSpan.FromTicks(timeArray.GetMicroSeconds(index).Value * 10);
+                default:
+                    throw new NotSupportedException($"Arrow type {array.Data.DataType.Name} is not supported by the Trino ODBC driver");
+            }
+        }
+
+        /// <summary>
+        /// Fetches the next batch of records as MessagePack
+        /// </summary>
+        private void FetchNextMessagePackBatch()
+        {
+            try
+            {
+                var request = new HttpRequestMessage(HttpMethod.Get, $"{_serverUrl}/cursors/{_cursorId}/fetch?{PageSizeQuery}");
+                request.Headers.Accept.Add(new MediaTypeWithQualityHeaderValue(MessagePackMediaType));
+                var response = _httpClient.SendAsync(request).Result;
+
+                if (!response.IsSuccessStatusCode)
+                {
+                    throw new DbException($"Failed to fetch results: {response.ReasonPhrase}");
+                }
+
+                var reader = new MessagePackReader(response.Content.ReadAsByteArrayAsync().Result);
+                var rows = new List<Dictionary<string, object>>();
+
+                var propertyCount = reader.ReadMapHeader();
+                for (int i = 0; i < propertyCount; i++)
+                {
+                    switch (reader.ReadString())
+                    {
+                        case "has_more":
+                            _hasMoreRows = reader.ReadBoolean();
+                            break;
+                        case "rows":
+                            var rowCount = reader.ReadArrayHeader();
+                            for (int rowIndex = 0; rowIndex < rowCount; rowIndex++)
+                            {
+                                var row = new Dictionary<string, object>();
+                                var columnCount = reader.ReadMapHeader();
+                                for (int columnIndex = 0; columnIndex < columnCount; columnIndex++)
+                                {
+                                    var name = reader.ReadString();
+                                    row[name] = ReadMessagePackValue(ref reader);
+                                }
+                                rows.Add(row);
+                            }
+                            break;
+                        default:
+                            reader.Skip();
+                            break;
+                    }
                 }
 
                 _currentBatch = rows;
@@ -1352,6 +2023,102 @@ namespace TrinoODBC
             }
         }
 
+        /// <summary>
+        /// Reads a MessagePack value from a result row as a CLR value
+        /// </summary>
+        /// <param name="reader">The reader positioned at the value</param>
+        /// <returns>The value, or null for nil</returns>
+        private static object ReadMessagePackValue(ref MessagePackReader reader)
+        {
+            switch (reader.NextMessagePackType)
+            {
+                case MessagePackType.Nil:
+                    reader.ReadNil();
+                    return null;
+                case MessagePackType.Boolean:
+                    return reader.ReadBoolean();
+                case MessagePackType.Integer:
+                    return reader.ReadInt64();
+                case MessagePackType.Float:
+                    return reader.ReadDouble();
+                case MessagePackType.String:
+                    return reader.ReadString();
+                case MessagePackType.Binary:
+                    return reader.ReadBytes()?.ToArray();
+                case MessagePackType.Array:
+                    var items = new object[reader.ReadArrayHeader()];
+                    for (int i = 0; i < items.Length; i++)
+                    {
+                        items[i] = ReadMessagePackValue(ref reader);
+                    }
+                    return items;
+                case MessagePackType.Map:
+                    var entryCount = reader.ReadMapHeader();
+                    var map = new Dictionary<object, object>(entryCount);
+                    for (int i = 0; i < entryCount; i++)
+                    {
+                        var key = ReadMessagePackValue(ref reader);
+                        map[key] = ReadMessagePackValue(ref reader);
+                    }
+                    return map;
+                case MessagePackType.Extension:
+                    var header = reader.ReadExtensionFormatHeader();
+                    return GetMessagePackExtensionValue(header.TypeCode, reader.ReadRaw(header.Length).ToArray());
+                default:
+                    throw new NotSupportedException($"MessagePack type {reader.NextMessagePackType} is not supported by the Trino ODBC driver");
+            }
+        }
+
+        /// <summary>
+        /// Converts a MessagePack extension value written by the driver service to a CLR value
+        /// </summary>
+        /// <param name="typeCode">The extension type code</param>
+        /// <param name="data">The extension payload, with big-endian integers</param>
+        /// <returns>The value</returns>
+        private static object GetMessagePackExtensionValue(sbyte typeCode, byte[] data)
+        {
+            switch (typeCode)
+            {
+                case MessagePackDecimal:
+                    return GetMessagePackDecimal(data);
+                case MessagePackDate:
+                    return UnixEpoch.AddDays(BinaryPrimitives.ReadInt32BigEndian(data));
+                case MessagePackTimestamp:
+                    return UnixEpoch.AddTicks(BinaryPrimitives.ReadInt64BigEndian(data) * 10);
+                case MessagePackTimestampWithTimeZone:
+                    // The payload is the UTC instant followed by the zone offset in minutes, which DateTime cannot hold
+                    return DateTime.SpecifyKind(UnixEpoch.AddTicks(BinaryPrimitives.ReadInt64BigEndian(data) * 10), DateTimeKind.Utc);
+                case MessagePackTime:
+                    return TimeSpan.FromTicks(BinaryPrimitives.ReadInt64BigEndian(data) * 10);
+                default:
+                    throw new NotSupportedException($"MessagePack extension type {typeCode} is not supported by the Trino ODBC driver");
+            }
+        }
+
+        /// <summary>
+        /// Converts a MessagePack decimal (a scale byte and the big-endian unscaled value) to a CLR value
+        /// </summary>
+        /// <param name="data">The extension payload</param>
+        /// <returns>A decimal, or a string for values beyond the range and precision of System.Decimal</returns>
+        private static object GetMessagePackDecimal(byte[] data)
+        {
+            var scale = data[0];
+            var unscaled = new BigInteger(new ReadOnlySpan<byte>(data, 1, data.Length - 1), isUnsigned: false, isBigEndian: true);
+            var magnitude = BigInteger.Abs(unscaled);
+
+            if (scale <= 28 && magnitude < DecimalMagnitudeLimit)
+            {
+                var bits = new byte[12];
+                magnitude.TryWriteBytes(bits, out _, isUnsigned: true);
+                return new decimal(BitConverter.ToInt32(bits, 0), BitConverter.ToInt32(bits, 4), BitConverter.ToInt32(bits, 8),
+                    unscaled.Sign < 0, scale);
+            }
+
+            var digits = magnitude.ToString().PadLeft(scale + 1, '0');
+            var text = scale > 0 ? digits.Insert(digits.Length - scale, ".") : digits;
+            return unscaled.Sign < 0 ? "-" + text : text;
+        }
+
         // Additional method implementations for various GetXXX methods
 
         public override bool GetBoolean(int ordinal)
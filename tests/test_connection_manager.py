@@ -0,0 +1,205 @@
+"""
+Tests of ConnectionManager and AsyncConnectionManager against the fake Trino coordinator
+
+benchmarks/fake_trino.py runs in-process, so the driver talks to it through
+the real Trino Python client and the asyncio cursor. Run with:
+
+    python -m pytest tests
+"""
+
+import os
+import sys
+import asyncio
+import logging
+import importlib.util
+
+import pytest
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+from fake_trino import FakeTrino
+
+# Result shapes are chosen per statement through fake_trino.py's option comment
+QUERY = "/* fake: rows=25 columns=3 page_rows=10 */ SELECT * FROM orders"
+
+def load_driver():
+    """Import trino-odbc-driver.py as a module"""
+    spec = importlib.util.spec_from_file_location("trino_odbc_driver", os.path.join(ROOT, "trino-odbc-driver.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    logging.getLogger("trino-odbc-driver").setLevel(logging.WARNING)
+    return module
+
+@pytest.fixture(scope="module")
+def driver():
+    return load_driver()
+
+@pytest.fixture(scope="module")
+def coordinator():
+    with FakeTrino() as fake:
+        yield fake
+
+@pytest.fixture
+def params(coordinator):
+    return {"host": "127.0.0.1", "port": coordinator.port, "user": "test", "catalog": "hive", "schema": "sales"}
+
+@pytest.fixture
+def manager(driver):
+    manager = driver.ConnectionManager(driver.TrinoConnectionPool())
+    yield manager
+    for connection_id in list(manager.connections):
+        manager.close_connection(connection_id)
+
+def fetch_all(manager, cursor_id, max_rows=100):
+    """Fetch the rest of a cursor's result"""
+    rows = []
+    has_more = True
+    while has_more:
+        page = manager.fetch_results(cursor_id, max_rows)
+        rows.extend(page["rows"])
+        has_more = page["has_more"]
+    return rows
+
+def test_execute_and_fetch_follows_next_uri(manager, params):
+    cursor_id = manager.create_cursor(manager.create_connection(params))
+
+    result = manager.execute_query(cursor_id, QUERY)
+    assert len(result["columns"]) == 3
+
+    pages = [manager.fetch_results(cursor_id, 10) for _ in range(3)]
+    assert [len(page["rows"]) for page in pages] == [10, 10, 5]
+    assert [page["has_more"] for page in pages] == [True, True, False]
+    assert pages[-1]["total_rows"] == 25
+
+def test_has_more_is_exact_at_a_page_boundary(manager, params):
+    cursor_id = manager.create_cursor(manager.create_connection(params))
+    manager.execute_query(cursor_id, "/* fake: rows=20 columns=1 page_rows=10 */ SELECT * FROM t")
+
+    assert manager.fetch_results(cursor_id, 10)["has_more"]
+    last = manager.fetch_results(cursor_id, 10)
+    assert len(last["rows"]) == 10
+    assert not last["has_more"]
+
+def test_fetch_after_cancel_fails_until_the_next_query(driver, manager, params):
+    cursor_id = manager.create_cursor(manager.create_connection(params))
+    manager.execute_query(cursor_id, QUERY)
+    manager.fetch_results(cursor_id, 10)
+
+    assert manager.cancel_query(cursor_id)["success"]
+    with pytest.raises(driver.TrinoODBCError, match="cancelled"):
+        manager.fetch_results(cursor_id, 10)
+
+    manager.execute_query(cursor_id, QUERY)
+    assert len(fetch_all(manager, cursor_id)) == 25
+
+def test_cancel_queued_async_query_never_runs(manager, params, coordinator):
+    manager.async_workers = 1
+    blocker = manager.create_cursor(manager.create_connection(params))
+    cursor_id = manager.create_cursor(manager.create_connection(params))
+    coordinator.reset_counters()
+
+    # The only worker is busy, so the second query stays queued
+    manager.execute_async(blocker, "/* fake: rows=1 columns=1 page_latency=0.5 */ SELECT * FROM slow")
+    manager.execute_async(cursor_id, "SELECT * FROM never_run")
+    assert manager.cancel_query(cursor_id)["success"]
+
+    assert manager.get_query_status(cursor_id, wait=5)["state"] == "CANCELLED"
+    assert manager.get_query_status(blocker, wait=5)["state"] == "FINISHED"
+    assert coordinator.statements["SELECT"] == 1
+
+def test_prepared_statements_are_reused(driver, manager, params, coordinator):
+    manager.prepared_statement_cache_size = driver.EXPLICIT_PREPARED_STATEMENT_CACHE_SIZE
+    cursor_id = manager.create_cursor(manager.create_connection(params))
+    coordinator.reset_counters()
+
+    for value in range(3):
+        manager.execute_query(cursor_id, "SELECT ? + 1", [value])
+        assert len(fetch_all(manager, cursor_id)) == 1
+
+    assert coordinator.statements["PREPARE"] == 1
+    assert coordinator.statements["EXECUTE"] == 3
+
+def test_result_cache_key_follows_use_and_set_session(driver, manager, params):
+    manager.result_cache = driver.ResultCache(10 ** 7)
+    cursor_id = manager.create_cursor(manager.create_connection(params))
+
+    def run(query):
+        result = manager.execute_query(cursor_id, query)
+        fetch_all(manager, cursor_id)
+        return result["cached"]
+
+    assert not run(QUERY)
+    assert run(QUERY)
+
+    run("USE other")
+    assert not run(QUERY)
+    run("SET SESSION query_max_run_time = '1h'")
+    assert not run(QUERY)
+    run("RESET SESSION query_max_run_time")
+    assert run(QUERY)
+    run("USE sales")
+    assert run(QUERY)
+
+def test_result_cache_is_bypassed_in_a_transaction(driver, manager, params):
+    manager.result_cache = driver.ResultCache(10 ** 7)
+    connection_id = manager.create_connection(params)
+    cursor_id = manager.create_cursor(connection_id)
+    manager.execute_query(cursor_id, QUERY)
+    fetch_all(manager, cursor_id)
+
+    manager.connections[connection_id]._client_session.transaction_id = "transaction"
+    assert not manager.execute_query(cursor_id, QUERY)["cached"]
+    assert cursor_id not in manager.cache_fills
+    manager.connections[connection_id]._client_session.transaction_id = None
+
+def test_pool_resets_the_session_on_release(manager, params, coordinator):
+    connection_id = manager.create_connection(params)
+    conn = manager.connections[connection_id]
+    cursor_id = manager.create_cursor(connection_id)
+    manager.execute_query(cursor_id, "USE other.staging")
+    manager.execute_query(cursor_id, "SET SESSION query_max_run_time = '1h'")
+    manager.close_connection(connection_id)
+
+    connection_id = manager.create_connection(params)
+    assert manager.connections[connection_id] is conn
+    manager.execute_query(manager.create_cursor(connection_id), "SELECT 1")
+    assert coordinator.last_session["X-Trino-Catalog"] == "hive"
+    assert coordinator.last_session["X-Trino-Schema"] == "sales"
+    assert not coordinator.last_session.get("X-Trino-Session")
+
+def test_reaped_cursor_is_closed(driver, manager, params):
+    cursor_id = manager.create_cursor(manager.create_connection(params))
+    manager.execute_query(cursor_id, QUERY)
+    manager.cursor_idle_ttl = 0.01
+    manager.last_access[cursor_id] -= 1
+
+    assert manager.reap_idle() == {"cursors": 1, "connections": 0}
+    with pytest.raises(driver.TrinoODBCError, match="does not exist"):
+        manager.fetch_results(cursor_id, 10)
+
+def test_asyncio_connection_keeps_its_session(driver, params, coordinator):
+    pytest.importorskip("aiohttp")
+
+    async def run():
+        manager = driver.AsyncConnectionManager()
+        await manager.start()
+        try:
+            cursor_id = manager.create_cursor(manager.create_connection(params))
+            await manager.execute_query(cursor_id, "USE other.staging")
+            await manager.execute_query(cursor_id, "SET SESSION query_max_run_time = '1h'")
+            await manager.execute_query(cursor_id, "START TRANSACTION")
+            await manager.execute_query(cursor_id, QUERY)
+            session = dict(coordinator.last_session)
+            page = await manager.fetch_results(cursor_id, 100)
+            return session, page
+        finally:
+            await manager.stop()
+
+    session, page = asyncio.run(run())
+    assert session["X-Trino-Catalog"] == "other"
+    assert session["X-Trino-Schema"] == "staging"
+    assert session["X-Trino-Session"] == "query_max_run_time=1h"
+    assert session["X-Trino-Transaction-Id"]
+    assert len(page["rows"]) == 25
+    assert not page["has_more"]
@@ -5,17 +5,32 @@ Enables .NET applications to connect to Trino via ODBC
 """
 
 import os
+import re
+import asyncio
+import http.client
 import sys
 import json
+import math
+import base64
+import hashlib
+import struct
+import zlib
 import logging
 import argparse
-from typing import Dict, List, Optional, Any, Union, Tuple
+import decimal
+from typing import Dict, List, Optional, Any, Union, Tuple, Iterator, Set, Callable
 import uuid
+import urllib.parse
 import socket
 import threading
 import queue
 import time
-from datetime import datetime
+import weakref
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager, nullcontext
+from datetime import date, datetime, timedelta, time as datetime_time
+from decimal import Decimal
 
 # Third-party dependencies
 import pyodbc
@@ -23,7 +38,43 @@ import trino
 from trino.auth import BasicAuthentication
 from trino.dbapi import Connection as TrinoConnection
 from trino.dbapi import Cursor as TrinoCursor
-from flask import Flask, request, jsonify, Response
+from trino.transaction import NO_TRANSACTION
+from flask import Flask, request, jsonify, Response, g
+from werkzeug.datastructures import MIMEAccept
+from werkzeug.http import parse_accept_header
+
+# Optional dependencies
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+try:
+    from gunicorn.app.base import BaseApplication as GunicornApplication
+except ImportError:
+    GunicornApplication = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import aiohttp
+    from aiohttp import web
+except ImportError:
+    aiohttp = None
+    web = None
+
+try:
+    from trino.mapper import RowMapperFactory
+except ImportError:
+    RowMapperFactory = None
 
 # Set up logging
 logging.basicConfig(
@@ -41,249 +92,3166 @@ VERSION = "1.0.0"
 DEFAULT_PORT = 8991
 DRIVER_NAME = "Trino ODBC Driver for Alpine Linux"
 
+# Result encodings supported by the fetch endpoint
+RESULT_FORMAT_ROWS = "rows"
+RESULT_FORMAT_COLUMNAR = "columnar"
+RESULT_FORMATS = (RESULT_FORMAT_ROWS, RESULT_FORMAT_COLUMNAR)
+
+# Media types negotiated through the Accept header
+JSON_MIMETYPE = "application/json"
+ARROW_STREAM_MIMETYPE = "application/vnd.apache.arrow.stream"
+NDJSON_MIMETYPE = "application/x-ndjson"
+MSGPACK_MIMETYPE = "application/msgpack"
+
+# MessagePack extension type codes for Trino values without a MessagePack
+# counterpart; varbinary uses MessagePack's own bin family
+MSGPACK_EXT_DECIMAL = 1
+MSGPACK_EXT_DATE = 2
+MSGPACK_EXT_TIMESTAMP = 3
+MSGPACK_EXT_TIMESTAMP_TZ = 4
+MSGPACK_EXT_TIME = 5
+
+# Connection pool defaults
+DEFAULT_POOL_MIN_SIZE = 0
+DEFAULT_POOL_MAX_SIZE = 20
+DEFAULT_POOL_IDLE_TIMEOUT = 300.0
+DEFAULT_POOL_HEALTH_CHECK_INTERVAL = 30.0
+DEFAULT_POOL_ACQUIRE_TIMEOUT = 30.0
+
+# Result prefetch defaults
+DEFAULT_PREFETCH_DEPTH = 2
+DEFAULT_PREFETCH_PAGE_SIZE = 1000
+DEFAULT_PREFETCH_MAX_BYTES = 64 * 1024 * 1024
+
+# Adaptive page sizing: pages requested with max_bytes are capped at
+# DEFAULT_MAX_PAGE_ROWS rows, and the learned row width is a moving average
+DEFAULT_MAX_PAGE_ROWS = 100000
+ROW_WIDTH_SMOOTHING = 0.5
+# Encoded bytes per column assumed before a cursor's first page is measured
+ROW_WIDTH_GUESS_PER_COLUMN = 16
+
+# Worker threads running asynchronously submitted queries
+DEFAULT_ASYNC_WORKERS = 8
+
+# States reported for asynchronously submitted queries
+QUERY_STATE_QUEUED = "QUEUED"
+QUERY_STATE_RUNNING = "RUNNING"
+QUERY_STATE_FINISHED = "FINISHED"
+QUERY_STATE_FAILED = "FAILED"
+QUERY_STATE_CANCELLED = "CANCELLED"
+
+# Idle handle reaper defaults, in seconds (0 disables reaping); off unless
+# configured, since clients may legitimately hold handles open for a long time
+DEFAULT_CURSOR_IDLE_TTL = 0.0
+DEFAULT_CONNECTION_IDLE_TTL = 0.0
+DEFAULT_REAP_INTERVAL = 30.0
+
+# Result cache defaults (0 bytes disables the cache)
+DEFAULT_RESULT_CACHE_MAX_BYTES = 0
+DEFAULT_RESULT_CACHE_TTL = 60.0
+
+# Seconds catalog metadata is cached (0 disables the cache)
+DEFAULT_METADATA_CACHE_TTL = 300.0
+
+# Statements kept PREPAREd per Trino connection (0 prepares only the
+# statements registered with prepare_statement)
+DEFAULT_PREPARED_STATEMENT_CACHE_SIZE = 0
+
+# Statements kept PREPAREd per Trino connection by prepare_statement when the
+# prepared statement cache is otherwise disabled
+EXPLICIT_PREPARED_STATEMENT_CACHE_SIZE = 16
+
+# information_schema view, selected columns, LIKE-filtered columns and sort
+# order for each metadata kind; filters apply in schema, table, column order
+METADATA_QUERIES = {
+    "schemas": ("schemata",
+                ("catalog_name", "schema_name"),
+                ("schema_name",),
+                ("schema_name",)),
+    "tables": ("tables",
+               ("table_catalog", "table_schema", "table_name", "table_type"),
+               ("table_schema", "table_name"),
+               ("table_schema", "table_name")),
+    "columns": ("columns",
+                ("table_catalog", "table_schema", "table_name", "column_name", "ordinal_position",
+                 "data_type", "is_nullable", "column_default"),
+                ("table_schema", "table_name", "column_name"),
+                ("table_schema", "table_name", "ordinal_position"))
+}
+
+# Statements after which cached metadata may be stale
+DDL_KEYWORDS = ("CREATE", "DROP", "ALTER", "COMMENT")
+
+# Response compression defaults
+ENCODING_GZIP = "gzip"
+ENCODING_ZSTD = "zstd"
+DEFAULT_COMPRESSION_MIN_BYTES = 1024
+DEFAULT_GZIP_LEVEL = 6
+DEFAULT_ZSTD_LEVEL = 3
+COMPRESSED_ENDPOINTS = ("run_query", "fetch_results", "stream_results")
+
+# Production server defaults
+SERVER_GUNICORN = "gunicorn"
+SERVER_DEV = "dev"
+SERVER_ASYNCIO = "asyncio"
+DEFAULT_WORKERS = 1
+DEFAULT_THREADS = 16
+
+# With several workers, connection IDs start with "w<port>-", naming the
+# loopback port on which the owning worker accepts forwarded requests
+WORKER_ID_PATTERN = re.compile(r"^w(\d+)-")
+FORWARDED_HEADER = "X-Trino-ODBC-Forwarded"
+HOP_BY_HOP_HEADERS = ("connection", "keep-alive", "proxy-authenticate", "proxy-authorization",
+                      "te", "trailers", "transfer-encoding", "upgrade", "host")
+
+# Bulk insert defaults; Trino rejects statements longer than query.max-length
+# (1,000,000 characters by default)
+DEFAULT_EXECUTEMANY_MAX_STATEMENT_BYTES = 1000000
+DEFAULT_EXECUTEMANY_CONCURRENCY = 4
+
+# INSERT ... VALUES (...) statement with a single row of placeholders
+INSERT_VALUES_PATTERN = re.compile(r"^\s*(INSERT\s+INTO\s.+?\sVALUES)\s*(\(.*\))\s*;?\s*$",
+                                   re.IGNORECASE | re.DOTALL)
+
+# String literals and parameter placeholders in a VALUES row
+PLACEHOLDER_PATTERN = re.compile(r"'(?:[^']|'')*'|\?")
+
 class TrinoODBCError(Exception):
     """Base exception class for Trino ODBC driver errors"""
     pass
 
-class ConnectionManager:
-    """Manages connections to Trino servers"""
+def arrow_type_for(type_code: Optional[str]) -> Any:
+    """
+    Map a Trino type signature from cursor.description to an Arrow type
     
-    def __init__(self):
-        self.connections: Dict[str, TrinoConnection] = {}
-        self.cursors: Dict[str, TrinoCursor] = {}
-        self.connection_params: Dict[str, Dict] = {}
+    Args:
+        type_code: Trino type signature, e.g. "bigint" or "decimal(10,2)"
+        
+    Returns:
+        The matching pyarrow DataType; types without a native Arrow
+        counterpart (nested types, json, uuid, ...) map to string
+    """
+    type_code = (type_code or "").lower()
+    base = type_code.split("(", 1)[0].strip()
+    
+    simple_types = {
+        "boolean": pa.bool_(),
+        "tinyint": pa.int8(),
+        "smallint": pa.int16(),
+        "integer": pa.int32(),
+        "bigint": pa.int64(),
+        "real": pa.float32(),
+        "double": pa.float64(),
+        "varchar": pa.string(),
+        "char": pa.string(),
+        "varbinary": pa.binary(),
+        "date": pa.date32(),
+    }
+    if base in simple_types:
+        return simple_types[base]
+    
+    if base == "decimal":
+        precision, scale = 38, 0
+        if "(" in type_code:
+            args = type_code[type_code.index("(") + 1:type_code.rindex(")")].split(",")
+            precision = int(args[0])
+            scale = int(args[1]) if len(args) > 1 else 0
+        return pa.decimal128(precision, scale)
+    
+    if base == "timestamp":
+        if type_code.endswith("with time zone"):
+            return pa.timestamp("us", tz="UTC")
+        return pa.timestamp("us")
+    
+    if base == "time" and not type_code.endswith("with time zone"):
+        return pa.time64("us")
+    
+    return pa.string()
+
+def arrow_stream_rows(payload: bytes) -> List[Tuple]:
+    """Decode an Arrow IPC stream into a list of row tuples"""
+    if pa is None:
+        raise TrinoODBCError("Arrow input requires the pyarrow package")
+    table = pa.ipc.open_stream(payload).read_all()
+    return list(zip(*(column.to_pylist() for column in table.columns)))
+
+def arrow_column(values: List, arrow_type: Any) -> Any:
+    """Build an Arrow array for one column, stringifying non-native values"""
+    if pa.types.is_string(arrow_type):
+        converted = []
+        for value in values:
+            if value is not None and not isinstance(value, str):
+                if isinstance(value, (list, dict)):
+                    value = json.dumps(value, default=str)
+                else:
+                    value = str(value)
+            converted.append(value)
+        values = converted
+    return pa.array(values, type=arrow_type)
+
+# Trino types whose Python values json.dumps already encodes faithfully
+JSON_NATIVE_TYPES = ("boolean", "tinyint", "smallint", "integer", "bigint", "varchar", "char", "json")
+
+def split_type_arguments(arguments: str) -> List[str]:
+    """Split the arguments of a parametric Trino type at its top-level commas"""
+    parts, depth, quoted, start = [], 0, False, 0
+    for index, char in enumerate(arguments):
+        if char == '"':
+            quoted = not quoted
+        elif quoted:
+            continue
+        elif char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        elif char == "," and depth == 0:
+            parts.append(arguments[start:index].strip())
+            start = index + 1
+    parts.append(arguments[start:].strip())
+    return parts
+
+def row_field_type(field: str) -> str:
+    """Return the type of a row field, which is declared with a plain or quoted name or as a bare type"""
+    if field.startswith('"'):
+        return field[field.index('"', 1) + 1:].strip()
+    name, _, field_type = field.partition(" ")
+    if not field_type or "(" in name:
+        return field
+    return field_type
+
+def encode_float(value: float) -> Any:
+    """Encode a real or double, spelling out the values JSON has no literal for"""
+    return value if math.isfinite(value) else str(value)
+
+def encode_temporal(value: Any) -> str:
+    """Encode a date, time or timestamp as ISO 8601"""
+    return value if isinstance(value, str) else value.isoformat()
+
+def encode_binary(value: Any) -> str:
+    """Encode varbinary as base64, which is also how Trino sends it"""
+    return value if isinstance(value, str) else base64.b64encode(value).decode("ascii")
+
+def json_value_encoder(type_code: Optional[str]) -> Optional[Any]:
+    """
+    Build the function that turns values of a Trino type into JSON-native values
+    
+    Args:
+        type_code: Trino type signature from cursor.description, e.g.
+            "decimal(10,2)" or "array(row(x bigint, y date))"
+        
+    Returns:
+        A function of one non-null value, or None if the values need no
+        conversion. Decimals, intervals, UUIDs and other types without a
+        JSON counterpart become strings
+    """
+    type_code = (type_code or "").strip()
+    base = type_code.split("(", 1)[0].strip().lower()
+    arguments = type_code[type_code.index("(") + 1:type_code.rindex(")")] if "(" in type_code else ""
+    
+    if base in JSON_NATIVE_TYPES:
+        return None
+    if base in ("real", "double"):
+        return encode_float
+    if base in ("date", "time", "timestamp"):
+        return encode_temporal
+    if base == "varbinary":
+        return encode_binary
+    
+    if base == "array":
+        element = json_value_encoder(arguments)
+        if element is None:
+            return None
+        return lambda value: [None if item is None else element(item) for item in value]
+    
+    if base == "map":
+        key_type, value_type = split_type_arguments(arguments)
+        encode_key = json_value_encoder(key_type) or str
+        encode_value = json_value_encoder(value_type)
+        if encode_value is None:
+            return lambda value: {str(encode_key(key)): item for key, item in value.items()}
+        return lambda value: {str(encode_key(key)): None if item is None else encode_value(item)
+                              for key, item in value.items()}
+    
+    if base == "row":
+        fields = [json_value_encoder(row_field_type(field)) for field in split_type_arguments(arguments)]
+        if not any(fields):
+            return list
+        return lambda value: [item if item is None or encode is None else encode(item)
+                              for item, encode in zip(value, fields)]
+    
+    return str
+
+class RowEncoder:
+    """
+    Converts result rows for a response encoding with one converter per column
+    
+    The converters are chosen once from cursor.description by value_encoder
+    (json_value_encoder or msgpack_value_encoder) and reused for every page
+    of the result. Columns that need no conversion are skipped.
+    """
+    
+    def __init__(self, description: Optional[List], value_encoder: Callable = json_value_encoder):
+        self.value_encoder = value_encoder
+        self.column_names = [col[0] for col in description] if description else []
+        self.converters = []
+        for index, col in enumerate(description or []):
+            encode = value_encoder(col[1])
+            if encode is not None:
+                self.converters.append((index, encode))
+    
+    def encode_rows(self, rows: List) -> List[List]:
+        """Return the rows as lists of JSON-native values, without modifying them"""
+        if not self.converters:
+            return [list(row) for row in rows]
+        
+        encoded = []
+        converters = self.converters
+        for row in rows:
+            row = list(row)
+            for index, encode in converters:
+                value = row[index]
+                if value is not None:
+                    row[index] = encode(value)
+            encoded.append(row)
+        return encoded
+    
+    def encode_columns(self, columns: List[List]) -> List[List]:
+        """Convert one value list per column in place and return it"""
+        for index, encode in self.converters:
+            columns[index] = [None if value is None else encode(value) for value in columns[index]]
+        return columns
+
+UNIX_EPOCH = datetime(1970, 1, 1)
+UNIX_EPOCH_ORDINAL = UNIX_EPOCH.toordinal()
+ONE_MICROSECOND = timedelta(microseconds=1)
+# Wide enough that rescaling a decimal(38) never rounds
+DECIMAL_CONTEXT = decimal.Context(prec=80)
+
+# Payloads of the MessagePack extension types; all integers are big-endian.
+# Decimals are a scale byte followed by the unscaled value in two's complement
+# (8 bytes, or as many as it needs), dates are int32 days since 1970-01-01,
+# times int64 microseconds since midnight and timestamps int64 microseconds
+# since 1970-01-01 in wall-clock time. Timestamps with a time zone hold the
+# UTC instant followed by the int16 zone offset in minutes
+MSGPACK_DECIMAL_STRUCT = struct.Struct(">Bq")
+MSGPACK_INT32_STRUCT = struct.Struct(">i")
+MSGPACK_INT64_STRUCT = struct.Struct(">q")
+MSGPACK_TIMESTAMP_TZ_STRUCT = struct.Struct(">qh")
+
+def msgpack_decimal(value: Decimal, scale: int) -> Any:
+    """Encode a decimal with the given number of fractional digits"""
+    if isinstance(value, str):
+        return value
+    unscaled = int(value.scaleb(scale, DECIMAL_CONTEXT))
+    if -0x8000000000000000 <= unscaled <= 0x7fffffffffffffff:
+        return msgpack.ExtType(MSGPACK_EXT_DECIMAL, MSGPACK_DECIMAL_STRUCT.pack(scale, unscaled))
+    return msgpack.ExtType(MSGPACK_EXT_DECIMAL, bytes((scale,)) +
+                           unscaled.to_bytes(unscaled.bit_length() // 8 + 1, "big", signed=True))
+
+def msgpack_date(value: date) -> Any:
+    """Encode a date"""
+    if isinstance(value, str):
+        return value
+    return msgpack.ExtType(MSGPACK_EXT_DATE, MSGPACK_INT32_STRUCT.pack(value.toordinal() - UNIX_EPOCH_ORDINAL))
+
+def msgpack_timestamp(value: datetime) -> Any:
+    """Encode a timestamp, with its zone offset if it has one"""
+    if isinstance(value, str):
+        return value
+    offset = value.utcoffset()
+    if offset is None:
+        return msgpack.ExtType(MSGPACK_EXT_TIMESTAMP, MSGPACK_INT64_STRUCT.pack((value - UNIX_EPOCH) // ONE_MICROSECOND))
+    micros = (value.replace(tzinfo=None) - offset - UNIX_EPOCH) // ONE_MICROSECOND
+    return msgpack.ExtType(MSGPACK_EXT_TIMESTAMP_TZ,
+                           MSGPACK_TIMESTAMP_TZ_STRUCT.pack(micros, int(offset.total_seconds() // 60)))
+
+def msgpack_time(value: datetime_time) -> Any:
+    """Encode a time of day; times with a time zone are sent as ISO 8601 strings"""
+    if isinstance(value, str):
+        return value
+    if value.tzinfo is not None:
+        return value.isoformat()
+    micros = ((value.hour * 60 + value.minute) * 60 + value.second) * 1000000 + value.microsecond
+    return msgpack.ExtType(MSGPACK_EXT_TIME, MSGPACK_INT64_STRUCT.pack(micros))
+
+def msgpack_value_encoder(type_code: Optional[str]) -> Optional[Any]:
+    """
+    Build the function that turns values of a Trino column into MessagePack extension types
+    
+    Args:
+        type_code: Trino type signature from cursor.description
+        
+    Returns:
+        A function of one non-null value, or None if the packer can take the
+        values as they are. Values nested in arrays, maps and rows are
+        converted by msgpack_default instead
+    """
+    type_code = (type_code or "").strip()
+    base = type_code.split("(", 1)[0].strip().lower()
+    
+    if base == "decimal" and "(" in type_code:
+        scale = int(split_type_arguments(type_code[type_code.index("(") + 1:type_code.rindex(")")])[1])
+        return lambda value: msgpack_decimal(value, scale)
+    if base == "date":
+        return msgpack_date
+    if base == "timestamp":
+        return msgpack_timestamp
+    if base == "time":
+        return msgpack_time
+    return None
+
+def msgpack_default(value: Any) -> Any:
+    """Encode a value the packer has no type for; values other than decimals and temporals become strings"""
+    if isinstance(value, Decimal):
+        exponent = value.as_tuple().exponent
+        return msgpack_decimal(value, -exponent if isinstance(exponent, int) and exponent < 0 else 0)
+    if isinstance(value, datetime):
+        return msgpack_timestamp(value)
+    if isinstance(value, date):
+        return msgpack_date(value)
+    if isinstance(value, datetime_time):
+        return msgpack_time(value)
+    return str(value)
+
+def msgpack_packer() -> Any:
+    """Create a MessagePack packer for result values; packers are not thread-safe, so use one per response"""
+    if msgpack is None:
+        raise TrinoODBCError("MessagePack responses require the msgpack package")
+    return msgpack.Packer(default=msgpack_default, use_bin_type=True, datetime=False)
+
+# Column converters used for each response encoding of result rows
+VALUE_ENCODERS = {
+    JSON_MIMETYPE: json_value_encoder,
+    NDJSON_MIMETYPE: json_value_encoder,
+    MSGPACK_MIMETYPE: msgpack_value_encoder
+}
+
+def result_mimetype(accept: Optional[str], offers: Tuple[str, ...] = (JSON_MIMETYPE, MSGPACK_MIMETYPE)) -> str:
+    """Pick the media type of a result response from the request's Accept header, defaulting to the first offer"""
+    return parse_accept_header(accept, MIMEAccept).best_match(offers) or offers[0]
+
+class StreamFraming:
+    """
+    Encodes the messages and row pages of a streamed result
+    
+    NDJSON writes one JSON document per line, MessagePack writes the same
+    documents back to back as MessagePack objects. Rows are converted by a
+    RowEncoder built with value_encoder.
+    """
+    
+    def __init__(self, mimetype: str = NDJSON_MIMETYPE):
+        self.mimetype = mimetype
+        self.format = "msgpack" if mimetype == MSGPACK_MIMETYPE else "ndjson"
+        self.value_encoder = VALUE_ENCODERS[mimetype]
+        self.packer = msgpack_packer() if mimetype == MSGPACK_MIMETYPE else None
+    
+    def message(self, message: Dict) -> bytes:
+        """Encode a header, trailer or error message"""
+        if self.packer is not None:
+            return self.packer.pack(message)
+        return (json.dumps(message) + "\n").encode("utf-8")
+    
+    def rows(self, rows: List, encoder: RowEncoder) -> bytes:
+        """Encode a page of rows, each as an array of its values"""
+        if self.packer is not None:
+            return b"".join(map(self.packer.pack, encoder.encode_rows(rows)))
+        return "".join(json.dumps(row, default=str) + "\n" for row in encoder.encode_rows(rows)).encode("utf-8")
+
+class ResponseCompression:
+    """Content-Encoding negotiation and compression for result responses"""
+    
+    def __init__(self, min_bytes: int = DEFAULT_COMPRESSION_MIN_BYTES,
+                 gzip_level: int = DEFAULT_GZIP_LEVEL, zstd_level: int = DEFAULT_ZSTD_LEVEL):
+        self.min_bytes = min_bytes
+        self.gzip_level = gzip_level
+        self.zstd_level = zstd_level
+    
+    @property
+    def encodings(self) -> List[str]:
+        """Supported encodings in order of preference"""
+        return [ENCODING_ZSTD, ENCODING_GZIP] if zstandard is not None else [ENCODING_GZIP]
+    
+    def negotiate(self, accept_encoding: Optional[str]) -> Optional[str]:
+        """Pick the encoding for a response from the request's Accept-Encoding header"""
+        if not accept_encoding:
+            return None
+        return parse_accept_header(accept_encoding).best_match(self.encodings)
+    
+    def compressor(self, encoding: str) -> Any:
+        """Create a streaming compressor with compress() and flush() methods"""
+        if encoding == ENCODING_ZSTD:
+            return zstandard.ZstdCompressor(level=self.zstd_level).compressobj()
+        # wbits 31 selects the gzip container
+        return zlib.compressobj(self.gzip_level, zlib.DEFLATED, 31)
+    
+    def compress(self, body: bytes, encoding: str) -> bytes:
+        """Compress a complete response body"""
+        compressor = self.compressor(encoding)
+        payload = compressor.compress(body) + compressor.flush()
+        COMPRESSED_BYTES.inc(len(body), encoding=encoding, stage="in")
+        COMPRESSED_BYTES.inc(len(payload), encoding=encoding, stage="out")
+        return payload
+    
+    def compress_stream(self, chunks: Any, encoding: str) -> Iterator[bytes]:
+        """Compress a streamed body"""
+        compressor = StreamCompressor(self.compressor(encoding), encoding)
+        for chunk in chunks:
+            yield compressor.compress(chunk)
+        yield compressor.finish()
+
+class StreamCompressor:
+    """Compresses a streamed body chunk by chunk, flushing after each so clients see every page as it is produced"""
+    
+    def __init__(self, compressor: Any, encoding: str):
+        self.compressor = compressor
+        self.encoding = encoding
+        self.sync_flush = zstandard.COMPRESSOBJ_FLUSH_BLOCK if encoding == ENCODING_ZSTD else zlib.Z_SYNC_FLUSH
+    
+    def compress(self, chunk: bytes) -> bytes:
+        """Compress one chunk and flush it to a byte boundary"""
+        payload = self.compressor.compress(chunk) + self.compressor.flush(self.sync_flush)
+        COMPRESSED_BYTES.inc(len(chunk), encoding=self.encoding, stage="in")
+        COMPRESSED_BYTES.inc(len(payload), encoding=self.encoding, stage="out")
+        return payload
+    
+    def finish(self) -> bytes:
+        """End the compressed stream"""
+        payload = self.compressor.flush()
+        COMPRESSED_BYTES.inc(len(payload), encoding=self.encoding, stage="out")
+        return payload
+
+class Counter:
+    """Prometheus counter with optional labels"""
+    
+    kind = "counter"
+    
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.values: Dict[Tuple, float] = {}
         self.lock = threading.Lock()
     
-    def create_connection(self, params: Dict[str, Any]) -> str:
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        """Add amount to the counter for the given label values"""
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0.0) + amount
+    
+    def samples(self) -> List[Tuple[str, Tuple, float]]:
+        with self.lock:
+            return [(self.name + "_total", key, value) for key, value in self.values.items()]
+
+class Gauge:
+    """Prometheus gauge whose value is read from a callback at scrape time"""
+    
+    kind = "gauge"
+    
+    def __init__(self, name: str, documentation: str, callback):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames: Tuple[str, ...] = ()
+        self.callback = callback
+    
+    def samples(self) -> List[Tuple[str, Tuple, float]]:
+        return [(self.name, (), float(self.callback()))]
+
+class Histogram:
+    """Prometheus histogram with optional labels"""
+    
+    kind = "histogram"
+    
+    DEFAULT_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1,
+                       0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+    
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = buckets
+        # Per label values: [count per bucket, sum, count]
+        self.values: Dict[Tuple, List] = {}
+        self.lock = threading.Lock()
+    
+    def observe(self, value: float, **labels: str) -> None:
+        """Record one observation for the given label values"""
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        with self.lock:
+            entry = self.values.get(key)
+            if entry is None:
+                entry = self.values[key] = [[0] * len(self.buckets), 0.0, 0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    entry[0][index] += 1
+                    break
+            entry[1] += value
+            entry[2] += 1
+    
+    def samples(self) -> List[Tuple[str, Tuple, float]]:
+        samples = []
+        with self.lock:
+            for key, (bucket_counts, total, count) in self.values.items():
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets, bucket_counts):
+                    cumulative += bucket_count
+                    samples.append((self.name + "_bucket", key + (repr(bound),), cumulative))
+                samples.append((self.name + "_bucket", key + ("+Inf",), count))
+                samples.append((self.name + "_sum", key, total))
+                samples.append((self.name + "_count", key, count))
+        return samples
+
+class MetricsRegistry:
+    """Collection of metrics rendered in the Prometheus text exposition format"""
+    
+    def __init__(self):
+        self.metrics: List[Any] = []
+    
+    def counter(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+    
+    def gauge(self, name: str, documentation: str, callback) -> Gauge:
+        return self._register(Gauge(name, documentation, callback))
+    
+    def histogram(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames))
+    
+    def _register(self, metric):
+        self.metrics.append(metric)
+        return metric
+    
+    def render(self) -> str:
+        """Render every metric in the Prometheus text format"""
+        lines = []
+        for metric in self.metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for sample_name, label_values, value in metric.samples():
+                labelnames = metric.labelnames
+                if sample_name.endswith("_bucket"):
+                    labelnames = labelnames + ("le",)
+                labels = ",".join(f'{name}="{self._escape(label_value)}"'
+                                  for name, label_value in zip(labelnames, label_values))
+                lines.append(f"{sample_name}{{{labels}}} {value}" if labels else f"{sample_name} {value}")
+        return "\n".join(lines) + "\n"
+    
+    @staticmethod
+    def _escape(value: str) -> str:
+        return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+metrics = MetricsRegistry()
+REQUEST_LATENCY = metrics.histogram(
+    "trino_odbc_request_duration_seconds",
+    "Time spent handling REST requests (time to first byte for streamed responses)",
+    ("route", "method"))
+REQUESTS = metrics.counter(
+    "trino_odbc_requests", "REST requests handled", ("route", "method", "status"))
+ROWS_SERVED = metrics.counter(
+    "trino_odbc_rows_served", "Result rows returned to clients", ("format",))
+BYTES_SERVED = metrics.counter(
+    "trino_odbc_bytes_served", "Encoded result bytes returned to clients", ("format",))
+LOCK_WAIT = metrics.histogram(
+    "trino_odbc_lock_wait_seconds", "Time spent waiting to acquire ConnectionManager locks", ("lock",))
+EXECUTE_LATENCY = metrics.histogram(
+    "trino_odbc_execute_duration_seconds", "Time spent in Trino cursor.execute")
+REAPED = metrics.counter(
+    "trino_odbc_reaped_handles", "Idle cursors and connections closed by the reaper", ("kind",))
+RESULT_CACHE_LOOKUPS = metrics.counter(
+    "trino_odbc_result_cache_lookups", "Result cache lookups by outcome", ("result",))
+COMPRESSED_BYTES = metrics.counter(
+    "trino_odbc_compressed_bytes", "Response bytes before (in) and after (out) compression", ("encoding", "stage"))
+METADATA_CACHE_LOOKUPS = metrics.counter(
+    "trino_odbc_metadata_cache_lookups", "Metadata cache lookups by outcome", ("result",))
+PREPARED_STATEMENT_LOOKUPS = metrics.counter(
+    "trino_odbc_prepared_statement_lookups", "Prepared statement cache lookups by outcome", ("result",))
+PREPARED_STATEMENT_EVICTIONS = metrics.counter(
+    "trino_odbc_prepared_statement_evictions", "Prepared statements DEALLOCATEd to make room in the cache")
+
+class InstrumentedLock:
+    """threading.Lock that records how long each acquisition waited"""
+    
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+    
+    def acquire(self, blocking: bool = True, timeout: float = -1) -> bool:
+        start = time.perf_counter()
+        acquired = self._lock.acquire(blocking, timeout)
+        LOCK_WAIT.observe(time.perf_counter() - start, lock=self.name)
+        return acquired
+    
+    def release(self) -> None:
+        self._lock.release()
+    
+    def locked(self) -> bool:
+        return self._lock.locked()
+    
+    def __enter__(self) -> bool:
+        return self.acquire()
+    
+    def __exit__(self, *exc_info) -> None:
+        self.release()
+
+class TrinoConnectionPool:
+    """
+    Pool of Trino DB-API connections shared by logical driver connections
+    
+    Connections are pooled per distinct set of connection settings, so a
+    logical connection only ever receives a Trino connection opened with
+    exactly the parameters it asked for.
+    """
+    
+    def __init__(self, min_size: int = DEFAULT_POOL_MIN_SIZE,
+                 max_size: int = DEFAULT_POOL_MAX_SIZE,
+                 idle_timeout: float = DEFAULT_POOL_IDLE_TIMEOUT,
+                 health_check_interval: float = DEFAULT_POOL_HEALTH_CHECK_INTERVAL,
+                 acquire_timeout: float = DEFAULT_POOL_ACQUIRE_TIMEOUT):
         """
-        Create a new Trino connection with the given parameters
+        Args:
+            min_size: Idle connections per key kept alive by idle eviction
+            max_size: Maximum connections (leased and idle) per key
+            idle_timeout: Seconds an idle connection may sit in the pool
+            health_check_interval: Idle seconds after which a connection is
+                checked with a trivial query before being leased again
+            acquire_timeout: Seconds to wait for a free connection when a
+                key is at max_size
+        """
+        self.min_size = min_size
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.health_check_interval = health_check_interval
+        self.acquire_timeout = acquire_timeout
+        
+        # Idle connections per key, oldest first, as (connection, released_at)
+        self.idle: Dict[Tuple, List[Tuple[TrinoConnection, float]]] = {}
+        # Number of open connections (leased and idle) per key
+        self.sizes: Dict[Tuple, int] = {}
+        # Pool key and connection parameters of every leased connection, by id()
+        self.leased: Dict[int, Tuple[Tuple, Dict[str, Any]]] = {}
+        self.condition = threading.Condition()
+        self._evictor: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+    
+    @staticmethod
+    def pool_key(params: Dict[str, Any]) -> Tuple:
+        """Build the pool key identifying interchangeable connections, with the password hashed"""
+        password = params.get('password')
+        return (
+            params.get('host', 'localhost'),
+            params.get('port', 8080),
+            params.get('user', 'trino'),
+            params.get('catalog'),
+            params.get('schema'),
+            params.get('http_scheme', 'http'),
+            params.get('verify', True),
+            hashlib.sha256(password.encode('utf-8')).hexdigest() if password else None,
+            json.dumps(params.get('session_properties') or {}, sort_keys=True, default=str)
+        )
+    
+    def acquire(self, params: Dict[str, Any]) -> TrinoConnection:
+        """
+        Lease a connection for the given parameters
+        
+        Reuses the most recently released idle connection for the key if
+        there is one, opens a new one if the key is below max_size, and
+        otherwise waits up to acquire_timeout for a connection to be released.
         
         Args:
             params: Connection parameters including host, port, user, etc.
             
         Returns:
-            A unique connection ID
+            A Trino connection that must be handed back with release()
         """
-        connection_id = str(uuid.uuid4())
+        key = self.pool_key(params)
+        deadline = time.monotonic() + self.acquire_timeout
+        conn = None
         
-        try:
-            auth = None
-            if params.get('user') and params.get('password'):
-                auth = BasicAuthentication(params['user'], params['password'])
-            
-            conn = trino.dbapi.connect(
-                host=params.get('host', 'localhost'),
-                port=params.get('port', 8080),
-                user=params.get('user', 'trino'),
-                catalog=params.get('catalog'),
-                schema=params.get('schema'),
-                auth=auth,
-                http_scheme=params.get('http_scheme', 'http'),
-                verify=params.get('verify', True),
-                session_properties=params.get('session_properties', {})
-            )
-            
-            with self.lock:
-                self.connections[connection_id] = conn
-                self.connection_params[connection_id] = params
-                
-            logger.info(f"Created connection {connection_id} to {params.get('host')}:{params.get('port')}")
-            return connection_id
-            
-        except Exception as e:
-            logger.error(f"Failed to connect to Trino: {str(e)}")
-            raise TrinoODBCError(f"Failed to connect to Trino: {str(e)}")
+        with self.condition:
+            while True:
+                idle = self.idle.get(key)
+                if idle:
+                    conn, released_at = idle.pop()
+                    break
+                if self.sizes.get(key, 0) < self.max_size:
+                    self.sizes[key] = self.sizes.get(key, 0) + 1
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TrinoODBCError(
+                        f"Timed out waiting for a pooled connection to {params.get('host')}:{params.get('port')}")
+                self.condition.wait(remaining)
+        
+        if conn is not None and time.monotonic() - released_at >= self.health_check_interval:
+            if not self._is_healthy(conn):
+                logger.info(f"Discarding unhealthy pooled connection to {params.get('host')}:{params.get('port')}")
+                self._close_quietly(conn)
+                conn = None
+        
+        if conn is None:
+            try:
+                conn = self._connect(params)
+            except Exception:
+                with self.condition:
+                    self._forget(key)
+                raise
+        
+        with self.condition:
+            self.leased[id(conn)] = (key, params)
+        return conn
     
-    def close_connection(self, connection_id: str) -> bool:
+    def release(self, conn: TrinoConnection, discard: bool = False) -> None:
         """
-        Close a Trino connection
+        Return a leased connection to the pool
+        
+        The session state that statements may have changed (USE, SET
+        SESSION, SET ROLE, PREPARE) is restored to the connection parameters
+        first. A connection whose session can't be restored is discarded.
         
         Args:
-            connection_id: The connection ID to close
-            
+            conn: A connection obtained from acquire()
+            discard: Close the connection instead of keeping it for reuse
+        """
+        with self.condition:
+            key, params = self.leased.pop(id(conn), (None, None))
+        if key is not None and not discard and not self._reset_session(conn, params):
+            logger.info(f"Discarding pooled connection to {params.get('host')}:{params.get('port')} "
+                        f"whose session could not be reset")
+            discard = True
+        
+        with self.condition:
+            if key is None:
+                discard = True
+            elif discard:
+                self._forget(key)
+            else:
+                self.idle.setdefault(key, []).append((conn, time.monotonic()))
+                self.condition.notify()
+        
+        if discard:
+            self._close_quietly(conn)
+    
+    def evict_idle(self) -> int:
+        """
+        Close connections that have been idle longer than idle_timeout
+        
         Returns:
-            True if the connection was closed successfully
+            The number of connections closed
         """
-        with self.lock:
-            if connection_id in self.connections:
-                # Close any open cursors for this connection
-                cursors_to_close = [cursor_id for cursor_id, cursor in self.cursors.items() 
-                                   if cursor_id.startswith(connection_id)]
+        expired = []
+        now = time.monotonic()
+        
+        with self.condition:
+            for key, idle in list(self.idle.items()):
+                while len(idle) > self.min_size and now - idle[0][1] >= self.idle_timeout:
+                    expired.append(idle.pop(0)[0])
+                    self._forget(key)
+                if not idle:
+                    del self.idle[key]
+        
+        for conn in expired:
+            self._close_quietly(conn)
+        
+        if expired:
+            logger.info(f"Evicted {len(expired)} idle pooled connections")
+        return len(expired)
+    
+    def start_evictor(self, interval: Optional[float] = None) -> None:
+        """Start a daemon thread that periodically evicts idle connections"""
+        if self._evictor is not None:
+            return
+        
+        interval = interval or max(1.0, min(self.idle_timeout, 30.0))
+        
+        def run():
+            while not self._stop.wait(interval):
+                try:
+                    self.evict_idle()
+                except Exception as e:
+                    logger.error(f"Error evicting idle pooled connections: {str(e)}")
+        
+        self._evictor = threading.Thread(target=run, name="trino-pool-evictor", daemon=True)
+        self._evictor.start()
+    
+    def stats(self) -> Dict[str, int]:
+        """Return the number of leased and idle connections"""
+        with self.condition:
+            return {
+                "leased": len(self.leased),
+                "idle": sum(len(idle) for idle in self.idle.values())
+            }
+    
+    def _forget(self, key: Tuple) -> None:
+        """Drop one connection from a key's size count; caller holds the condition"""
+        self.sizes[key] -= 1
+        if self.sizes[key] <= 0:
+            del self.sizes[key]
+        self.condition.notify()
+    
+    @staticmethod
+    def _connect(params: Dict[str, Any]) -> TrinoConnection:
+        """Open a new Trino connection"""
+        auth = None
+        if params.get('user') and params.get('password'):
+            auth = BasicAuthentication(params['user'], params['password'])
+        
+        return trino.dbapi.connect(
+            host=params.get('host', 'localhost'),
+            port=params.get('port', 8080),
+            user=params.get('user', 'trino'),
+            catalog=params.get('catalog'),
+            schema=params.get('schema'),
+            auth=auth,
+            http_scheme=params.get('http_scheme', 'http'),
+            verify=params.get('verify', True),
+            session_properties=params.get('session_properties', {})
+        )
+    
+    @staticmethod
+    def _reset_session(conn: TrinoConnection, params: Dict[str, Any]) -> bool:
+        """Restore a connection's client session to its connection parameters, reporting success"""
+        try:
+            session = conn._client_session
+            if session.transaction_id not in (None, NO_TRANSACTION):
+                return False
+            session.catalog = params.get('catalog')
+            session.schema = params.get('schema')
+            session.properties = dict(params.get('session_properties') or {})
+            session.roles = {}
+            session.prepared_statements = {}
+            return True
+        except Exception:
+            return False
+    
+    @staticmethod
+    def _is_healthy(conn: TrinoConnection) -> bool:
+        """Check that a pooled connection can still run a query"""
+        try:
+            cursor = conn.cursor()
+            try:
+                cursor.execute("SELECT 1")
+                cursor.fetchall()
+            finally:
+                cursor.close()
+            return True
+        except Exception:
+            return False
+    
+    @staticmethod
+    def _close_quietly(conn: TrinoConnection) -> None:
+        """Close a connection, ignoring errors"""
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+def estimate_rows_size(rows: List) -> int:
+    """
+    Estimate the in-memory size of a page of rows
+    
+    The first row is measured and assumed representative, which keeps the
+    estimate cheap enough to run on every prefetched page.
+    """
+    if not rows:
+        return 0
+    first = rows[0]
+    row_size = sys.getsizeof(first) + sum(sys.getsizeof(value) for value in first)
+    return row_size * len(rows)
+
+def result_row_count(result: Dict) -> int:
+    """Count the rows of a fetch or query result in either JSON result format"""
+    if "row_count" in result:
+        return result["row_count"]
+    return len(result.get("rows", ()))
+
+class CursorPrefetcher:
+    """
+    Fetches result pages for a cursor on a background thread
+    
+    Pages are kept in a bounded queue so that the next pages are already
+    downloaded and decoded when the client asks for them. The worker pauses
+    once depth pages or max_bytes of rows are buffered, and always buffers at
+    least one page so that a single oversized page cannot stall the cursor.
+    """
+    
+    def __init__(self, cursor_id: str, cursor: TrinoCursor,
+                 page_size: int = DEFAULT_PREFETCH_PAGE_SIZE,
+                 depth: int = DEFAULT_PREFETCH_DEPTH,
+                 max_bytes: int = DEFAULT_PREFETCH_MAX_BYTES):
+        self.cursor_id = cursor_id
+        self.cursor = cursor
+        self.page_size = page_size
+        self.depth = max(1, depth)
+        self.max_bytes = max_bytes
+        
+        # Buffered pages as (rows, estimated_size)
+        self.pages: List[Tuple[List, int]] = []
+        self.buffered_bytes = 0
+        self.exhausted = False
+        self.error: Optional[Exception] = None
+        self.closed = False
+        self.condition = threading.Condition()
+        
+        # Rows from a dequeued page that did not fit in the last take()
+        self.leftover: List = []
+        
+        self.thread = threading.Thread(target=self._run, name=f"prefetch-{cursor_id}", daemon=True)
+        self.thread.start()
+    
+    def _run(self) -> None:
+        """Worker loop feeding the page queue until the cursor is drained"""
+        try:
+            while True:
+                with self.condition:
+                    while not self.closed and self.pages and (
+                            len(self.pages) >= self.depth or self.buffered_bytes >= self.max_bytes):
+                        self.condition.wait()
+                    if self.closed:
+                        return
                 
-                for cursor_id in cursors_to_close:
-                    self.cursors[cursor_id].close()
-                    del self.cursors[cursor_id]
+                rows = self.cursor.fetchmany(self.page_size)
+                size = estimate_rows_size(rows)
                 
-                # Close the connection
-                self.connections[connection_id].close()
-                del self.connections[connection_id]
-                del self.connection_params[connection_id]
+                with self.condition:
+                    if rows:
+                        self.pages.append((rows, size))
+                        self.buffered_bytes += size
+                    if len(rows) < self.page_size:
+                        self.exhausted = True
+                    self.condition.notify_all()
+                    if self.exhausted:
+                        return
+        except Exception as e:
+            with self.condition:
+                self.error = e
+                self.condition.notify_all()
+    
+    def take(self, max_rows: int) -> List:
+        """
+        Return up to max_rows rows, waiting for the worker if necessary
+        
+        Fewer than max_rows rows are returned only once the result is exhausted.
+        """
+        rows = self.leftover
+        self.leftover = []
+        
+        while len(rows) < max_rows:
+            with self.condition:
+                while not self.pages and not self.exhausted and self.error is None and not self.closed:
+                    self.condition.wait()
                 
-                logger.info(f"Closed connection {connection_id}")
+                if self.closed:
+                    raise TrinoODBCError("Query was cancelled")
+                if self.pages:
+                    page, size = self.pages.pop(0)
+                    self.buffered_bytes -= size
+                    self.condition.notify_all()
+                elif self.error is not None:
+                    raise self.error
+                else:
+                    break
+            
+            rows = rows + page if rows else page
+        
+        if len(rows) > max_rows:
+            self.leftover = rows[max_rows:]
+            rows = rows[:max_rows]
+        return rows
+    
+    def close(self) -> None:
+        """Stop the worker, drop any buffered pages and fail any waiting take()"""
+        with self.condition:
+            self.closed = True
+            self.pages = []
+            self.buffered_bytes = 0
+            self.condition.notify_all()
+        self.leftover = []
+
+class AsyncExecution:
+    """State of a query submitted for asynchronous execution on a cursor"""
+    
+    def __init__(self, cursor: TrinoCursor, query: str):
+        self.cursor = cursor
+        self.query = query
+        self.state = QUERY_STATE_QUEUED
+        self.result: Optional[Dict] = None
+        self.error: Optional[str] = None
+        self.submitted_at = time.monotonic()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.cancel_requested = False
+        self.condition = threading.Condition()
+    
+    @property
+    def done(self) -> bool:
+        return self.state in (QUERY_STATE_FINISHED, QUERY_STATE_FAILED, QUERY_STATE_CANCELLED)
+    
+    def set_state(self, state: str, result: Optional[Dict] = None, error: Optional[str] = None) -> None:
+        """Move to a new state and wake up any long-polling status requests"""
+        with self.condition:
+            now = time.monotonic()
+            if state == QUERY_STATE_RUNNING:
+                self.started_at = now
+            elif state in (QUERY_STATE_FINISHED, QUERY_STATE_FAILED, QUERY_STATE_CANCELLED):
+                self.finished_at = now
+            self.state = state
+            self.result = result
+            self.error = error
+            self.condition.notify_all()
+    
+    def start(self) -> bool:
+        """Move a queued query to running, or report False if it was cancelled while queued"""
+        with self.condition:
+            if self.cancel_requested:
+                if not self.done:
+                    self.set_state(QUERY_STATE_CANCELLED, error="Query was cancelled before it started")
+                return False
+            self.set_state(QUERY_STATE_RUNNING)
+            return True
+    
+    def cancel(self) -> bool:
+        """
+        Request cancellation of the query
+        
+        A query that is still queued is cancelled right away and never runs;
+        one already running must also be cancelled in Trino by the caller.
+        
+        Returns:
+            True if the query was still queued and is now cancelled
+        """
+        with self.condition:
+            if self.done:
+                return False
+            self.cancel_requested = True
+            if self.state == QUERY_STATE_QUEUED:
+                self.set_state(QUERY_STATE_CANCELLED, error="Query was cancelled before it started")
                 return True
+            return False
+    
+    def wait(self, timeout: float) -> None:
+        """Block until the query has finished, failed or been cancelled, or timeout elapses"""
+        with self.condition:
+            self.condition.wait_for(lambda: self.done, timeout)
+    
+    def status(self) -> Dict:
+        """Describe the execution, including Trino's progress statistics"""
+        with self.condition:
+            end = self.finished_at or time.monotonic()
+            status = {
+                "state": self.state,
+                "query_id": getattr(self.cursor, "query_id", None),
+                "elapsed": round(end - self.submitted_at, 3),
+                "progress": None,
+                "stats": None
+            }
+            if self.result is not None:
+                status["columns"] = self.result["columns"]
+                status["rowcount"] = self.result["rowcount"]
+            if self.error is not None:
+                status["error"] = self.error
+        
+        stats = self.cursor.stats
+        if stats:
+            status["stats"] = dict(stats)
+            if stats.get("progressPercentage") is not None:
+                status["progress"] = stats["progressPercentage"]
+            elif stats.get("totalSplits"):
+                status["progress"] = round(100.0 * stats.get("completedSplits", 0) / stats["totalSplits"], 2)
+        if self.state == QUERY_STATE_FINISHED:
+            status["progress"] = 100.0
+        return status
+
+# String literals and quoted identifiers, or runs of whitespace and comments, in SQL text
+SQL_TOKEN_PATTERN = re.compile(r"'(?:[^']|'')*'|\"(?:[^\"]|\"\")*\"|(?:\s|--[^\n]*|/\*.*?\*/)+", re.DOTALL)
+
+def normalize_sql(query: str) -> str:
+    """
+    Normalize SQL text for use in a cache key
+    
+    Comments and whitespace runs collapse to a single space,
+    while string literals and quoted identifiers are kept verbatim. Trailing
+    semicolons are removed.
+    """
+    def replace(match):
+        token = match.group(0)
+        if token[0] in "'\"":
+            return token
+        return " "
+    
+    return SQL_TOKEN_PATTERN.sub(replace, query).strip().rstrip(";").strip()
+
+class CachedResult:
+    """A complete query result held by the ResultCache"""
+    
+    def __init__(self, description: List, rowcount: int, rows: List, size: int, expires_at: float):
+        self.description = description
+        self.rowcount = rowcount
+        self.rows = rows
+        self.size = size
+        self.expires_at = expires_at
+
+class ResultCache:
+    """
+    LRU cache of complete query results, bounded by estimated size in bytes
+    
+    Entries expire ttl seconds after they were stored. Results larger than
+    max_entry_bytes (a quarter of the cache by default) are never stored, so
+    one large result cannot flush everything else.
+    """
+    
+    def __init__(self, max_bytes: int, ttl: float = DEFAULT_RESULT_CACHE_TTL,
+                 max_entry_bytes: Optional[int] = None):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.max_entry_bytes = max_entry_bytes if max_entry_bytes is not None else max_bytes // 4
+        self.entries: "OrderedDict[Tuple, CachedResult]" = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.lock = InstrumentedLock("result_cache")
+    
+    @staticmethod
+    def key(query: str, parameters: Optional[List], params: Dict[str, Any], session: Dict[str, Any]) -> Tuple:
+        """
+        Build the cache key for a query
+        
+        Args:
+            query: The SQL query text
+            parameters: Optional parameters for the query
+            params: Parameters of the connection running the query, which
+                supply the server and user
+            session: Current catalog, schema, session properties and roles
+                of the connection, which USE and SET SESSION may have
+                changed since it was opened
+        """
+        return (
+            normalize_sql(query),
+            json.dumps(parameters or [], default=str),
+            TrinoConnectionPool.pool_key(params),
+            json.dumps(session, sort_keys=True, default=str)
+        )
+    
+    @staticmethod
+    def is_cacheable(query: str) -> bool:
+        """Only read-only SELECT and WITH queries are cached"""
+        words = normalize_sql(query).split(None, 1)
+        return bool(words) and words[0].upper() in ("SELECT", "WITH")
+    
+    def get(self, key: Tuple) -> Optional[CachedResult]:
+        """Return the unexpired result stored under key, counting a hit or miss"""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry.expires_at <= time.monotonic():
+                self._remove(key)
+                entry = None
+            
+            if entry is None:
+                self.misses += 1
             else:
-                logger.warning(f"Attempted to close non-existent connection {connection_id}")
-                return False
+                self.entries.move_to_end(key)
+                self.hits += 1
+        
+        RESULT_CACHE_LOOKUPS.inc(result="miss" if entry is None else "hit")
+        return entry
+    
+    def put(self, key: Tuple, description: List, rowcount: int, rows: List, size: int) -> bool:
+        """
+        Store a complete result, evicting least recently used entries to make room
+        
+        Returns:
+            True if the result was stored
+        """
+        if size > self.max_entry_bytes:
+            return False
+        
+        entry = CachedResult(description, rowcount, rows, size, time.monotonic() + self.ttl)
+        with self.lock:
+            if key in self.entries:
+                self._remove(key)
+            while self.entries and self.size + size > self.max_bytes:
+                self._remove(next(iter(self.entries)))
+            self.entries[key] = entry
+            self.size += size
+        return True
+    
+    def _remove(self, key: Tuple) -> None:
+        """Drop an entry; caller holds the lock"""
+        self.size -= self.entries.pop(key).size
+    
+    def stats(self) -> Dict[str, int]:
+        """Return the number of entries, bytes used, hits and misses"""
+        with self.lock:
+            return {
+                "entries": len(self.entries),
+                "bytes": self.size,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses
+            }
+
+class ResultCacheFill:
+    """Collects the rows of a cacheable result as the client fetches them"""
+    
+    def __init__(self, key: Tuple, description: List, rowcount: int, max_bytes: int):
+        self.key = key
+        self.description = description
+        self.rowcount = rowcount
+        self.max_bytes = max_bytes
+        self.rows: List = []
+        self.size = 0
+        self.abandoned = False
+    
+    def add(self, rows: List) -> bool:
+        """
+        Record a fetched page
+        
+        Returns:
+            False once the result has grown too large to cache
+        """
+        self.size += estimate_rows_size(rows)
+        if self.size > self.max_bytes:
+            self.abandoned = True
+            self.rows = []
+            return False
+        self.rows.extend(rows)
+        return True
+
+class CachedResultReader:
+    """Serves pages of a cached result to one cursor"""
+    
+    def __init__(self, entry: CachedResult):
+        self.entry = entry
+        self.position = 0
+    
+    def take(self, max_rows: int) -> List:
+        """Return up to max_rows rows following the last page served"""
+        rows = self.entry.rows[self.position:self.position + max_rows]
+        self.position += len(rows)
+        return rows
+
+def sql_identifier(name: str) -> str:
+    """Quote a SQL identifier"""
+    return '"' + name.replace('"', '""') + '"'
+
+def sql_string_literal(value: str) -> str:
+    """Quote a SQL string literal"""
+    return "'" + value.replace("'", "''") + "'"
+
+def sql_literal(value: Any) -> str:
+    """Render a parameter value as a Trino SQL literal"""
+    if value is None:
+        return "NULL"
+    if isinstance(value, bool):
+        return "TRUE" if value else "FALSE"
+    if isinstance(value, int):
+        return str(value)
+    if isinstance(value, float):
+        if math.isnan(value):
+            return "nan()"
+        if math.isinf(value):
+            return "infinity()" if value > 0 else "-infinity()"
+        return repr(value)
+    if isinstance(value, Decimal):
+        return f"DECIMAL '{value}'"
+    if isinstance(value, str):
+        return sql_string_literal(value)
+    if isinstance(value, (bytes, bytearray)):
+        return f"X'{bytes(value).hex()}'"
+    if isinstance(value, datetime):
+        if value.tzinfo is not None:
+            offset = value.strftime('%z')
+            naive = value.replace(tzinfo=None).isoformat(sep=' ')
+            return f"TIMESTAMP '{naive} {offset[:3]}:{offset[3:5]}'"
+        return f"TIMESTAMP '{value.isoformat(sep=' ')}'"
+    if isinstance(value, date):
+        return f"DATE '{value.isoformat()}'"
+    if isinstance(value, datetime_time):
+        return f"TIME '{value.isoformat()}'"
+    if isinstance(value, (list, tuple)):
+        return "ARRAY[" + ", ".join(sql_literal(item) for item in value) + "]"
+    raise TrinoODBCError(f"Unsupported parameter type: {type(value).__name__}")
+
+def split_placeholders(text: str) -> List[str]:
+    """Split SQL text around its ? placeholders, leaving string literals intact"""
+    parts = [""]
+    position = 0
+    for placeholder in PLACEHOLDER_PATTERN.finditer(text):
+        if placeholder.group(0) == "?":
+            parts[-1] += text[position:placeholder.start()]
+            parts.append("")
+            position = placeholder.end()
+    parts[-1] += text[position:]
+    return parts
+
+def bind_parameters(query: str, parameters: List) -> str:
+    """Substitute parameter values, as SQL literals, for the ? placeholders of a query"""
+    parts = split_placeholders(query)
+    if len(parameters) != len(parts) - 1:
+        raise TrinoODBCError(f"Expected {len(parts) - 1} parameters, got {len(parameters)}")
+    return parts[0] + "".join(sql_literal(value) + part for value, part in zip(parameters, parts[1:]))
+
+def batch_insert_values(query: str, rows: List, max_statement_bytes: int) -> Optional[List[Tuple[str, int]]]:
+    """
+    Group parameter rows into multi-row INSERT ... VALUES statements
+    
+    Each statement holds as many rows as fit in max_statement_bytes of UTF-8
+    text, and at least one.
+    
+    Args:
+        query: An INSERT ... VALUES statement with one row of ? placeholders
+        rows: Parameter values for each row to insert
+        max_statement_bytes: Size limit for each generated statement
+        
+    Returns:
+        List of (statement, row_count) tuples, or None if the query is not
+        a single-row INSERT ... VALUES statement
+    """
+    match = INSERT_VALUES_PATTERN.match(query)
+    if match is None:
+        return None
+    head, row_template = match.groups()
+    
+    parts = split_placeholders(row_template)
+    placeholder_count = len(parts) - 1
+    
+    statements = []
+    values: List[str] = []
+    size = len(head.encode("utf-8"))
+    for row in rows:
+        if len(row) != placeholder_count:
+            raise TrinoODBCError(f"Expected {placeholder_count} parameters per row, got {len(row)}")
+        
+        rendered = parts[0] + "".join(sql_literal(value) + part for value, part in zip(row, parts[1:]))
+        rendered_size = len(rendered.encode("utf-8")) + 2
+        if values and size + rendered_size > max_statement_bytes:
+            statements.append((f"{head} {', '.join(values)}", len(values)))
+            values = []
+            size = len(head.encode("utf-8"))
+        values.append(rendered)
+        size += rendered_size
+    
+    if values:
+        statements.append((f"{head} {', '.join(values)}", len(values)))
+    return statements
+
+def metadata_query(kind: str, catalog: str, patterns: Tuple) -> str:
+    """Build the information_schema query listing one kind of metadata of a catalog"""
+    view, columns, filter_columns, order = METADATA_QUERIES[kind]
+    conditions = [f"{name} LIKE {sql_string_literal(pattern)}"
+                  for name, pattern in zip(filter_columns, patterns) if pattern is not None]
+    return (f"SELECT {', '.join(columns)} "
+            f"FROM {sql_identifier(catalog)}.information_schema.{view}"
+            + (f" WHERE {' AND '.join(conditions)}" if conditions else "")
+            + f" ORDER BY {', '.join(order)}")
+
+class MetadataCache:
+    """
+    TTL cache of information_schema query results, shared by all connections
+    
+    Entries are scoped to a server and user, since users may see different
+    objects, and can be invalidated for a single catalog.
+    """
+    
+    def __init__(self, ttl: float = DEFAULT_METADATA_CACHE_TTL):
+        self.ttl = ttl
+        # (scope, catalog, kind, filters) -> (expires_at, rows)
+        self.entries: Dict[Tuple, Tuple[float, List]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.lock = InstrumentedLock("metadata_cache")
+    
+    @staticmethod
+    def scope(params: Dict[str, Any]) -> Tuple:
+        """Return the server and user that cached metadata belongs to"""
+        return (params.get('host', 'localhost'), params.get('port', 8080), params.get('user', 'trino'))
+    
+    def get(self, key: Tuple) -> Optional[List]:
+        """Return the unexpired rows stored under key, counting a hit or miss"""
+        if not self.ttl:
+            return None
+        
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry[0] <= time.monotonic():
+                del self.entries[key]
+                entry = None
+            
+            if entry is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        
+        METADATA_CACHE_LOOKUPS.inc(result="miss" if entry is None else "hit")
+        return entry[1] if entry is not None else None
+    
+    def put(self, key: Tuple, rows: List) -> None:
+        """Store rows under key for ttl seconds"""
+        if not self.ttl:
+            return
+        
+        with self.lock:
+            self.entries[key] = (time.monotonic() + self.ttl, rows)
+    
+    def invalidate(self, scope: Tuple, catalog: Optional[str] = None) -> int:
+        """
+        Drop cached metadata for a server and user
+        
+        Args:
+            scope: The scope returned by MetadataCache.scope
+            catalog: Only drop metadata of this catalog; all catalogs if None
+            
+        Returns:
+            The number of entries dropped
+        """
+        with self.lock:
+            keys = [key for key in self.entries
+                    if key[0] == scope and (catalog is None or key[1] == catalog)]
+            for key in keys:
+                del self.entries[key]
+        return len(keys)
+    
+    def stats(self) -> Dict[str, int]:
+        """Return the number of entries, hits and misses"""
+        with self.lock:
+            return {
+                "entries": len(self.entries),
+                "hits": self.hits,
+                "misses": self.misses
+            }
+
+class PreparedStatement:
+    """A statement registered in a PreparedStatementCache"""
+    
+    def __init__(self, name: str):
+        self.name = name
+        # Set once a PREPARE of the statement has succeeded
+        self.prepared = False
+        # Executions currently being sent, which keep the statement from being evicted
+        self.users = 0
+
+class PreparedStatementCache:
+    """
+    LRU cache of the statements PREPAREd on one Trino connection, by query text
+    
+    Trino keeps prepared statements in the client session, which sends all of
+    them in a header with every request, so the cache is bounded by count.
+    Statements are pinned while an execution of them is being sent and only
+    unpinned ones are evicted; the caller DEALLOCATEs what checkout() evicts.
+    """
+    
+    def __init__(self, max_size: int = EXPLICIT_PREPARED_STATEMENT_CACHE_SIZE):
+        self.max_size = max_size
+        self.statements: "OrderedDict[str, PreparedStatement]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = InstrumentedLock("prepared_statements")
+    
+    def __contains__(self, query: str) -> bool:
+        with self.lock:
+            return query in self.statements
+    
+    def checkout(self, query: str) -> Tuple[PreparedStatement, List[str]]:
+        """
+        Look up or register the statement for a query and pin it
+        
+        Args:
+            query: The SQL text of the statement
+            
+        Returns:
+            The statement, which the caller must PREPARE if it is not yet
+            prepared and hand back with checkin(), and the names of the
+            statements evicted to make room, which the caller must DEALLOCATE
+        """
+        with self.lock:
+            statement = self.statements.get(query)
+            if statement is None:
+                statement = PreparedStatement(f"odbc_{uuid.uuid4().hex}")
+                self.statements[query] = statement
+            else:
+                self.statements.move_to_end(query)
+            hit = statement.prepared
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+            statement.users += 1
+            
+            evicted = []
+            excess = len(self.statements) - self.max_size
+            if excess > 0:
+                for key in [key for key, entry in self.statements.items() if entry.users == 0][:excess]:
+                    evicted.append(self.statements.pop(key).name)
+                self.evictions += len(evicted)
+        
+        PREPARED_STATEMENT_LOOKUPS.inc(result="hit" if hit else "miss")
+        PREPARED_STATEMENT_EVICTIONS.inc(len(evicted))
+        return statement, evicted
+    
+    def checkin(self, query: str, statement: PreparedStatement, prepared: bool) -> None:
+        """
+        Unpin a statement obtained from checkout()
+        
+        Args:
+            query: The SQL text the statement was checked out for
+            statement: The statement
+            prepared: Whether the statement is prepared; if not, because its
+                PREPARE failed, it is dropped from the cache
+        """
+        with self.lock:
+            statement.users -= 1
+            if prepared:
+                statement.prepared = True
+            elif not statement.prepared and self.statements.get(query) is statement:
+                del self.statements[query]
+    
+    def stats(self) -> Dict[str, int]:
+        """Return the number of statements, hits, misses and evictions"""
+        with self.lock:
+            return {
+                "statements": len(self.statements),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions
+            }
+
+class BaseConnectionManager:
+    """
+    Handle registry, per-cursor result state and result encoding shared by
+    ConnectionManager and AsyncConnectionManager
+    
+    Subclasses open connections and cursors and do all I/O with Trino; this
+    class keeps track of the handles and of what each cursor is serving, and
+    turns fetched rows into responses. Registry access goes through
+    self.lock, which is never held across Trino I/O.
+    """
+    
+    def __init__(self):
+        self.connections: Dict[str, Any] = {}
+        self.cursors: Dict[str, Any] = {}
+        # IDs of the open cursors owned by each connection
+        self.connection_cursors: Dict[str, Set[str]] = {}
+        self.connection_params: Dict[str, Dict] = {}
+        self.arrow_schemas: Dict[str, Any] = {}
+        # Average encoded row width of each cursor's result, learned from the pages sent
+        self.row_widths: Dict[str, float] = {}
+        # Row read past the end of each cursor's last page, to tell whether more rows follow
+        self.lookahead_rows: Dict[str, List] = {}
+        # JSON value converters of each cursor's result, built once from its description
+        self.row_encoders: Dict[str, RowEncoder] = {}
+        # Rows returned so far from each cursor's current result
+        self.rows_fetched: Dict[str, int] = {}
+        # Serializes operations on a single cursor, so that independent
+        # cursors run in parallel and a close waits for an in-flight fetch
+        self.cursor_locks: Dict[str, Any] = {}
+        # Monotonic time of the last client request touching each connection or cursor
+        self.last_access: Dict[str, float] = {}
+        self.cursor_idle_ttl = DEFAULT_CURSOR_IDLE_TTL
+        self.connection_idle_ttl = DEFAULT_CONNECTION_IDLE_TTL
+        self.reaped_cursors = 0
+        self.reaped_connections = 0
+        # Queries submitted with execute_async, by cursor ID
+        self.executions: Dict[str, AsyncExecution] = {}
+        # Opt-in cache of complete results; None disables caching
+        self.result_cache: Optional[ResultCache] = None
+        # Cacheable results being recorded, and cached results being served, by cursor ID
+        self.cache_fills: Dict[str, ResultCacheFill] = {}
+        self.cache_readers: Dict[str, CachedResultReader] = {}
+        # Cursors whose query was cancelled; fetches fail until they run another query
+        self.cancelled_cursors: Set[str] = set()
+        self.metadata_cache = MetadataCache()
+        self.executemany_max_statement_bytes = DEFAULT_EXECUTEMANY_MAX_STATEMENT_BYTES
+        self.executemany_concurrency = DEFAULT_EXECUTEMANY_CONCURRENCY
+        # Prepended to connection IDs, so that cursor IDs carry it as well
+        self.id_prefix = ""
+        # Guards the dictionaries above; never held across Trino I/O
+        self.lock: Any = InstrumentedLock("registry")
+    
+    def _register_connection(self, conn: Any, params: Dict[str, Any]) -> str:
+        """Register an opened connection and return its new ID"""
+        connection_id = f"{self.id_prefix}{uuid.uuid4()}"
+        with self.lock:
+            self.connections[connection_id] = conn
+            self.connection_cursors[connection_id] = set()
+            self.connection_params[connection_id] = params
+            self.last_access[connection_id] = time.monotonic()
+        
+        logger.info(f"Created connection {connection_id} to {params.get('host')}:{params.get('port')}")
+        return connection_id
+    
+    def _unregister_connection(self, connection_id: str) -> Optional[Tuple[Any, List[Tuple]]]:
+        """
+        Unregister a connection and its cursors so no new operation can start on them
+        
+        Returns:
+            The connection and a (cursor_id, cursor, cursor_lock, execution)
+            tuple per cursor, or None if the connection does not exist
+        """
+        with self.lock:
+            if connection_id not in self.connections:
+                return None
+            
+            conn = self.connections.pop(connection_id)
+            del self.connection_params[connection_id]
+            self.last_access.pop(connection_id, None)
+            cursors = [(cursor_id, self.cursors.pop(cursor_id), self.cursor_locks.pop(cursor_id),
+                        self.executions.pop(cursor_id, None))
+                       for cursor_id in self.connection_cursors.pop(connection_id)]
+            for cursor_id, _, _, _ in cursors:
+                self.last_access.pop(cursor_id, None)
+                self.cancelled_cursors.discard(cursor_id)
+            return conn, cursors
+    
+    def _register_cursor(self, connection_id: str, cursor_factory: Callable[[Any], Any], cursor_lock: Any) -> str:
+        """Register a new cursor made by cursor_factory from a connection and return its ID"""
+        with self.lock:
+            if connection_id not in self.connections:
+                raise TrinoODBCError(f"Connection {connection_id} does not exist")
+            
+            cursor_id = f"{connection_id}_{str(uuid.uuid4())}"
+            self.cursors[cursor_id] = cursor_factory(self.connections[connection_id])
+            self.cursor_locks[cursor_id] = cursor_lock
+            self.connection_cursors[connection_id].add(cursor_id)
+            self.last_access[cursor_id] = self.last_access[connection_id] = time.monotonic()
+        
+        logger.info(f"Created cursor {cursor_id} for connection {connection_id}")
+        return cursor_id
+    
+    def _unregister_cursor(self, cursor_id: str) -> Tuple[Any, Any, Optional[AsyncExecution]]:
+        """
+        Unregister a cursor so no new operation can start on it
+        
+        Returns:
+            The cursor (None if it does not exist), its lock and its
+            asynchronous execution, if any
+        """
+        with self.lock:
+            cursor = self.cursors.pop(cursor_id, None)
+            cursor_lock = self.cursor_locks.pop(cursor_id, None)
+            execution = self.executions.pop(cursor_id, None)
+            self.cancelled_cursors.discard(cursor_id)
+            if cursor is not None:
+                self.connection_cursors[self._cursor_connection_id(cursor_id)].discard(cursor_id)
+                self.last_access.pop(cursor_id, None)
+        return cursor, cursor_lock, execution
+    
+    def _lookup_cursor(self, cursor_id: str) -> Tuple[Any, Any]:
+        """Look up a cursor and its lock for a new operation, recording the access"""
+        with self.lock:
+            cursor = self.cursors.get(cursor_id)
+            cursor_lock = self.cursor_locks.get(cursor_id)
+            execution = self.executions.get(cursor_id)
+            if cursor is not None:
+                now = time.monotonic()
+                self.last_access[cursor_id] = now
+                self.last_access[self._cursor_connection_id(cursor_id)] = now
+        
+        if cursor is None:
+            raise TrinoODBCError(f"Cursor {cursor_id} does not exist")
+        
+        # Don't tie up a request behind an asynchronously running query
+        if execution is not None and not execution.done:
+            raise TrinoODBCError(f"Query on cursor {cursor_id} is still {execution.state.lower()}")
+        
+        return cursor, cursor_lock
+    
+    def _lookup_execution(self, cursor_id: str) -> AsyncExecution:
+        """Return the query submitted asynchronously on a cursor, recording the access"""
+        with self.lock:
+            if cursor_id not in self.cursors:
+                raise TrinoODBCError(f"Cursor {cursor_id} does not exist")
+            execution = self.executions.get(cursor_id)
+            self.last_access[cursor_id] = time.monotonic()
+        
+        if execution is None:
+            raise TrinoODBCError(f"No query has been submitted asynchronously on cursor {cursor_id}")
+        return execution
+    
+    def _mark_cancelled(self, cursor_id: str) -> Tuple[Any, Optional[AsyncExecution], Optional[CachedResultReader]]:
+        """
+        Mark a cursor's query cancelled, so that its next fetch drops its result and fails
+        
+        The result state is left for that fetch to drop under the cursor
+        lock, since a fetch in progress may still be updating it. A result
+        being recorded for the result cache is abandoned right away.
+        
+        Returns:
+            The cursor, its asynchronous execution and its cached result reader
+        """
+        with self.lock:
+            cursor = self.cursors.get(cursor_id)
+            execution = self.executions.get(cursor_id)
+            fill = self.cache_fills.get(cursor_id)
+            reader = self.cache_readers.get(cursor_id)
+            if cursor is not None:
+                self.cancelled_cursors.add(cursor_id)
+        
+        if cursor is None:
+            raise TrinoODBCError(f"Cursor {cursor_id} does not exist")
+        
+        # A cancelled result is incomplete and must not be cached
+        if fill is not None:
+            fill.abandoned = True
+        return cursor, execution, reader
+    
+    @staticmethod
+    def _cursor_connection_id(cursor_id: str) -> str:
+        """Return the ID of the connection that owns a cursor"""
+        return cursor_id.rsplit("_", 1)[0]
+    
+    def _clear_result(self, cursor_id: str) -> None:
+        """Drop the state derived from a cursor's current result; caller holds its lock"""
+        self.cache_fills.pop(cursor_id, None)
+        self.cache_readers.pop(cursor_id, None)
+        self.arrow_schemas.pop(cursor_id, None)
+        self.row_widths.pop(cursor_id, None)
+        self.lookahead_rows.pop(cursor_id, None)
+        self.row_encoders.pop(cursor_id, None)
+        self.rows_fetched.pop(cursor_id, None)
+    
+    def _start_result(self, cursor_id: str, query: str, parameters: Optional[List],
+                      use_cache: bool) -> Tuple[Optional[Tuple], Optional[Dict]]:
+        """
+        Prepare a cursor whose lock the caller holds for a new query
+        
+        Returns:
+            The query's result cache key (None if it is not cacheable) and,
+            if its result is cached, the response answering it from the cache
+        """
+        with self.lock:
+            self.cancelled_cursors.discard(cursor_id)
+        # A new statement invalidates any state derived from the previous result
+        self._clear_result(cursor_id)
+        
+        if not (use_cache and self.result_cache is not None and ResultCache.is_cacheable(query)):
+            return None, None
+        
+        # Results read inside a transaction may see its uncommitted writes
+        connection_id = self._cursor_connection_id(cursor_id)
+        session = self._session_state(connection_id)
+        if session is None:
+            return None, None
+        
+        cache_key = ResultCache.key(query, parameters, self.connection_params[connection_id], session)
+        entry = self.result_cache.get(cache_key)
+        if entry is None:
+            return cache_key, None
+        
+        self.cache_readers[cursor_id] = CachedResultReader(entry)
+        logger.info(f"Served query on cursor {cursor_id} from the result cache: {query[:100]}...")
+        return cache_key, {
+            "success": True,
+            "columns": self._column_metadata(entry.description),
+            "rowcount": entry.rowcount,
+            "cached": True
+        }
+    
+    def _executed_result(self, cursor_id: str, query: str, description: Optional[List], rowcount: int,
+                         cache_key: Optional[Tuple]) -> Dict:
+        """Record a query that has run on Trino and build the response describing its result"""
+        # Schema changes make cached metadata for the server stale
+        words = normalize_sql(query).split(None, 1)
+        if words and words[0].upper() in DDL_KEYWORDS:
+            self.metadata_cache.invalidate(MetadataCache.scope(
+                self.connection_params[self._cursor_connection_id(cursor_id)]))
+        
+        rowcount = rowcount if rowcount >= 0 else -1
+        
+        # Get column information if available
+        columns = []
+        if description:
+            columns = self._column_metadata(description)
+            
+            if cache_key is not None:
+                self.cache_fills[cursor_id] = ResultCacheFill(
+                    cache_key, description, rowcount, self.result_cache.max_entry_bytes)
+        
+        logger.info(f"Executed query on cursor {cursor_id}: {query[:100]}...")
+        return {
+            "success": True,
+            "columns": columns,
+            "rowcount": rowcount,
+            "cached": False
+        }
+    
+    def _session_state(self, connection_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Return the current catalog, schema, session properties and roles of a connection
+        
+        Returns:
+            The session state, or None while a transaction is open on it
+        """
+        params = self.connection_params[connection_id]
+        return {
+            "catalog": params.get('catalog'),
+            "schema": params.get('schema'),
+            "properties": dict(params.get('session_properties') or {}),
+            "roles": {},
+            "authorization_user": None
+        }
+    
+    @staticmethod
+    def _column_metadata(description: List) -> List[Dict]:
+        """Describe result columns from a DB-API cursor description"""
+        return [
+            {
+                "name": col[0],
+                "type_code": col[1],
+                "display_size": col[2],
+                "internal_size": col[3],
+                "precision": col[4],
+                "scale": col[5],
+                "null_ok": col[6]
+            }
+            for col in description
+        ]
+    
+    def _execute_many_response(self, cursor_id: str, rows: List, results: List[Dict]) -> Dict:
+        """Sum up the statements run by execute_many"""
+        failed = [result for result in results if "error" in result]
+        logger.info(f"Executed {len(rows)} rows in {len(results)} statements on cursor {cursor_id}"
+                    + (f", {len(failed)} failed" if failed else ""))
+        
+        response = {
+            "success": not failed,
+            "rowcount": sum(result["rowcount"] for result in results if result["rowcount"] >= 0),
+            "batches": results
+        }
+        if failed:
+            response["error"] = f"{len(failed)} of {len(results)} statements failed: {failed[0]['error']}"
+        return response
+    
+    def _page_rows(self, cursor_id: str, description: Optional[List], max_rows: int,
+                   max_bytes: Optional[int]) -> int:
+        """Choose the number of rows for a page, fitting max_bytes if given"""
+        if not max_bytes:
+            return max_rows
+        
+        width = self.row_widths.get(cursor_id)
+        if width is None:
+            # Row objects repeat the column names, so count them in the first guess
+            width = sum(len(col[0]) + ROW_WIDTH_GUESS_PER_COLUMN for col in description or []) \
+                or ROW_WIDTH_GUESS_PER_COLUMN
+        return max(1, min(max_rows, int(max_bytes // width)))
+    
+    def record_page_bytes(self, cursor_id: str, row_count: int, byte_count: int) -> None:
+        """
+        Learn a cursor's average encoded row width from a page sent to the client
+        
+        Args:
+            cursor_id: The cursor the page was fetched from
+            row_count: Number of rows in the page
+            byte_count: Encoded size of the page
+        """
+        if row_count <= 0:
+            return
+        
+        width = byte_count / row_count
+        with self.lock:
+            # Don't resurrect state for a cursor closed in the meantime
+            if cursor_id not in self.cursors:
+                return
+            previous = self.row_widths.get(cursor_id)
+            self.row_widths[cursor_id] = width if previous is None \
+                else previous + ROW_WIDTH_SMOOTHING * (width - previous)
+    
+    def _page_response(self, cursor_id: str, description: Optional[List], rows: List, has_more: bool,
+                       page_rows: int, result_format: str, max_bytes: Optional[int], mimetype: str) -> Dict:
+        """Encode a fetched page as the fetch_results response"""
+        column_names = [col[0] for col in description] if description else []
+        
+        logger.info(f"Fetched {len(rows)} rows from cursor {cursor_id}")
+        ROWS_SERVED.inc(len(rows), format=result_format)
+        
+        encoder = self._row_encoder(cursor_id, description, VALUE_ENCODERS[mimetype])
+        if result_format == RESULT_FORMAT_COLUMNAR:
+            result = {
+                "success": True,
+                "columns": column_names,
+                "data": encoder.encode_columns(self._to_columns(rows, len(column_names))),
+                "row_count": len(rows),
+                "has_more": has_more
+            }
+        else:
+            # Convert rows to a list of dictionaries if possible
+            result_rows = encoder.encode_rows(rows)
+            if column_names:
+                result_rows = [dict(zip(column_names, row)) for row in result_rows]
+            
+            result = {
+                "success": True,
+                "rows": result_rows,
+                "has_more": has_more
+            }
+        
+        if max_bytes:
+            result["page_rows"] = page_rows
+        if not has_more:
+            result["total_rows"] = self.rows_fetched.get(cursor_id, 0)
+        return result
+    
+    def _arrow_page(self, cursor_id: str, cursor: Any, rows: List, max_bytes: Optional[int]) -> bytes:
+        """Encode a fetched page as an Arrow IPC stream containing one record batch"""
+        schema = self._arrow_schema(cursor_id, cursor)
+        
+        columns = self._to_columns(rows, len(schema))
+        batch = pa.RecordBatch.from_arrays(
+            [arrow_column(values, field.type) for values, field in zip(columns, schema)],
+            schema=schema
+        )
+        
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, schema) as writer:
+            writer.write_batch(batch)
+        
+        logger.info(f"Fetched {len(rows)} rows from cursor {cursor_id} as Arrow")
+        payload = sink.getvalue().to_pybytes()
+        ROWS_SERVED.inc(len(rows), format="arrow")
+        BYTES_SERVED.inc(len(payload), format="arrow")
+        if max_bytes:
+            self.record_page_bytes(cursor_id, len(rows), len(payload))
+        return payload
+    
+    def _row_encoder(self, cursor_id: str, description: Optional[List],
+                     value_encoder: Callable = json_value_encoder) -> RowEncoder:
+        """Return the row encoder for a cursor, building it once from its description per response encoding"""
+        encoder = self.row_encoders.get(cursor_id)
+        if encoder is None or encoder.value_encoder is not value_encoder:
+            encoder = RowEncoder(description, value_encoder)
+            self.row_encoders[cursor_id] = encoder
+        return encoder
+    
+    def _arrow_schema(self, cursor_id: str, cursor: Any) -> Any:
+        """Return the Arrow schema for a cursor, deriving it once from its description"""
+        schema = self.arrow_schemas.get(cursor_id)
+        if schema is None:
+            schema = pa.schema([
+                pa.field(col[0], arrow_type_for(col[1]))
+                for col in (self._description(cursor_id, cursor) or [])
+            ])
+            self.arrow_schemas[cursor_id] = schema
+        return schema
+    
+    def _description(self, cursor_id: str, cursor: Any) -> Optional[List]:
+        """Return the description of the result the cursor is serving"""
+        reader = self.cache_readers.get(cursor_id)
+        if reader is not None:
+            return reader.entry.description
+        return cursor.description
+    
+    def _take_lookahead(self, cursor_id: str) -> List:
+        """Return the rows held back from a cursor's last page, failing if its query was cancelled"""
+        with self.lock:
+            cancelled = cursor_id in self.cancelled_cursors
+        if cancelled:
+            self._discard_result(cursor_id)
+            raise TrinoODBCError("Query was cancelled")
+        return self.lookahead_rows.pop(cursor_id, [])
+    
+    def _discard_result(self, cursor_id: str) -> None:
+        """Drop the rows a cancelled cursor still holds; caller holds its lock"""
+        self.cache_fills.pop(cursor_id, None)
+        self.cache_readers.pop(cursor_id, None)
+        self.lookahead_rows.pop(cursor_id, None)
+    
+    def _split_page(self, cursor_id: str, rows: List, max_rows: int) -> Tuple[List, bool]:
+        """Hold back the rows read beyond a page for the next one, and report whether there were any"""
+        has_more = len(rows) > max_rows
+        if has_more:
+            self.lookahead_rows[cursor_id] = rows[max_rows:]
+            rows = rows[:max_rows]
+        self.rows_fetched[cursor_id] = self.rows_fetched.get(cursor_id, 0) + len(rows)
+        return rows, has_more
+    
+    def _record_fill(self, cursor_id: str, fill: ResultCacheFill, rows: List, max_rows: int) -> None:
+        """Add a fetched page to a result being recorded, caching the result once it is complete"""
+        if fill.abandoned or not fill.add(rows):
+            self.cache_fills.pop(cursor_id, None)
+            return
+        
+        # A short page means the result is exhausted
+        if len(rows) < max_rows:
+            self.cache_fills.pop(cursor_id, None)
+            if self.result_cache.put(fill.key, fill.description, fill.rowcount, fill.rows, fill.size):
+                logger.info(f"Cached {len(fill.rows)} rows from cursor {cursor_id}")
+    
+    @staticmethod
+    def _to_columns(rows: List, column_count: int) -> List[List]:
+        """Transpose a page of rows into one value list per column"""
+        if not rows:
+            return [[] for _ in range(column_count)]
+        return [list(column) for column in zip(*rows)]
+    
+    def _metadata_request(self, connection_id: str, kind: str, catalog: Optional[str],
+                          patterns: Tuple) -> Tuple[Any, str, Tuple, Tuple]:
+        """
+        Validate a metadata request
+        
+        Returns:
+            The connection, the catalog to describe, the LIKE patterns that
+            apply to the kind and the metadata cache key
+        """
+        if kind not in METADATA_QUERIES:
+            raise TrinoODBCError(f"Unsupported metadata kind: {kind}")
+        
+        with self.lock:
+            if connection_id not in self.connections:
+                raise TrinoODBCError(f"Connection {connection_id} does not exist")
+            conn = self.connections[connection_id]
+            params = self.connection_params[connection_id]
+            self.last_access[connection_id] = time.monotonic()
+        
+        catalog = catalog or params.get('catalog')
+        if not catalog:
+            raise TrinoODBCError("A catalog is required to list metadata")
+        
+        patterns = patterns[:len(METADATA_QUERIES[kind][2])]
+        return conn, catalog, patterns, (MetadataCache.scope(params), catalog, kind, patterns)
+    
+    def invalidate_metadata(self, connection_id: str, catalog: Optional[str] = None) -> int:
+        """
+        Drop cached metadata for the server and user of a connection
+        
+        Args:
+            connection_id: The connection whose server and user to invalidate
+            catalog: Only drop metadata of this catalog; all catalogs if None
+            
+        Returns:
+            The number of cache entries dropped
+        """
+        with self.lock:
+            if connection_id not in self.connections:
+                raise TrinoODBCError(f"Connection {connection_id} does not exist")
+            params = self.connection_params[connection_id]
+        
+        return self.metadata_cache.invalidate(MetadataCache.scope(params), catalog)
+    
+    def get_connection_info(self, connection_id: str) -> Dict:
+        """
+        Get information about a connection
+        
+        Args:
+            connection_id: The connection ID to get information for
+            
+        Returns:
+            Dictionary containing connection information
+        """
+        with self.lock:
+            if connection_id not in self.connections:
+                raise TrinoODBCError(f"Connection {connection_id} does not exist")
+            
+            params = self.connection_params[connection_id]
+            self.last_access[connection_id] = time.monotonic()
+            
+            # Return a copy of the connection parameters without sensitive info
+            info = params.copy()
+            if 'password' in info:
+                info['password'] = '***'
+            
+            return info
+    
+    def _idle_handles(self) -> Tuple[List[str], List[str]]:
+        """Return the IDs of the cursors and connections that reap_idle should close"""
+        now = time.monotonic()
+        
+        with self.lock:
+            idle_cursors = []
+            if self.cursor_idle_ttl:
+                idle_cursors = [cursor_id for cursor_id in self.cursors
+                                if now - self.last_access.get(cursor_id, now) >= self.cursor_idle_ttl
+                                and not self.cursor_locks[cursor_id].locked()]
+            
+            idle_connections = []
+            if self.connection_idle_ttl:
+                idle_connections = [connection_id for connection_id in self.connections
+                                    if now - self.last_access.get(connection_id, now) >= self.connection_idle_ttl
+                                    and not any(self.cursor_locks[cursor_id].locked()
+                                                for cursor_id in self.connection_cursors[connection_id])]
+        
+        return idle_cursors, idle_connections
+    
+    def _record_reaped(self, reaped_cursors: int, reaped_connections: int) -> Dict[str, int]:
+        """Count the handles closed by reap_idle"""
+        with self.lock:
+            self.reaped_cursors += reaped_cursors
+            self.reaped_connections += reaped_connections
+        REAPED.inc(reaped_cursors, kind="cursor")
+        REAPED.inc(reaped_connections, kind="connection")
+        
+        if reaped_cursors or reaped_connections:
+            logger.info(f"Reaped {reaped_cursors} idle cursors and {reaped_connections} idle connections")
+        return {"cursors": reaped_cursors, "connections": reaped_connections}
+    
+    def stats(self) -> Dict[str, int]:
+        """Return the number of open and reaped cursors and connections"""
+        with self.lock:
+            return {
+                "open_connections": len(self.connections),
+                "open_cursors": len(self.cursors),
+                "reaped_connections": self.reaped_connections,
+                "reaped_cursors": self.reaped_cursors
+            }
+
+class ConnectionManager(BaseConnectionManager):
+    """Manages connections to Trino servers"""
+    
+    def __init__(self, pool: Optional[TrinoConnectionPool] = None):
+        super().__init__()
+        self.pool = pool or TrinoConnectionPool()
+        self.prefetchers: Dict[str, CursorPrefetcher] = {}
+        self.prefetch_depth = DEFAULT_PREFETCH_DEPTH
+        self.prefetch_max_bytes = DEFAULT_PREFETCH_MAX_BYTES
+        self._reaper: Optional[threading.Thread] = None
+        self.async_workers = DEFAULT_ASYNC_WORKERS
+        self._executor: Optional[ThreadPoolExecutor] = None
+        # Prepared statements of each leased Trino connection; they live in its
+        # client session, which the pool clears on release, so they last only
+        # as long as the connection's current lease
+        self.prepared_statements: "weakref.WeakKeyDictionary[TrinoConnection, PreparedStatementCache]" = \
+            weakref.WeakKeyDictionary()
+        self.prepared_statement_cache_size = DEFAULT_PREPARED_STATEMENT_CACHE_SIZE
+    
+    def create_connection(self, params: Dict[str, Any]) -> str:
+        """
+        Create a new Trino connection with the given parameters
+        
+        Args:
+            params: Connection parameters including host, port, user, etc.
+            
+        Returns:
+            A unique connection ID
+        """
+        try:
+            conn = self.pool.acquire(params)
+        except Exception as e:
+            logger.error(f"Failed to connect to Trino: {str(e)}")
+            raise TrinoODBCError(f"Failed to connect to Trino: {str(e)}")
+        
+        return self._register_connection(conn, params)
+    
+    def close_connection(self, connection_id: str) -> bool:
+        """
+        Close a Trino connection
+        
+        Args:
+            connection_id: The connection ID to close
+            
+        Returns:
+            True if the connection was closed successfully
+        """
+        registered = self._unregister_connection(connection_id)
+        if registered is None:
+            logger.warning(f"Attempted to close non-existent connection {connection_id}")
+            return False
+        
+        conn, cursors_to_close = registered
+        with self.lock:
+            # The pool drops the session's prepared statements, so forget them here
+            self.prepared_statements.pop(conn, None)
+        
+        # Don't wait for long asynchronous queries to finish; cancel them
+        for cursor_id, cursor, _, execution in cursors_to_close:
+            self._cancel_execution(cursor_id, cursor, execution)
+        
+        # Close the cursors once any in-flight operation on them has finished
+        released = False
+        try:
+            for cursor_id, cursor, cursor_lock, _ in cursors_to_close:
+                with cursor_lock:
+                    self._release_cursor(cursor_id, cursor)
+            released = True
+        finally:
+            # Return the connection to the pool, unless a cursor failed to close
+            # and may have left a query running on it
+            self.pool.release(conn, discard=not released)
+        
+        logger.info(f"Closed connection {connection_id}")
+        return True
+    
+    def create_cursor(self, connection_id: str) -> str:
+        """
+        Create a new cursor for an existing connection
+        
+        Args:
+            connection_id: The connection ID to create a cursor for
+            
+        Returns:
+            A unique cursor ID
+        """
+        return self._register_cursor(connection_id, lambda conn: conn.cursor(), InstrumentedLock("cursor"))
+    
+    def close_cursor(self, cursor_id: str) -> bool:
+        """
+        Close a cursor
+        
+        Args:
+            cursor_id: The cursor ID to close
+            
+        Returns:
+            True if the cursor was closed successfully
+        """
+        cursor, cursor_lock, execution = self._unregister_cursor(cursor_id)
+        if cursor is None:
+            logger.warning(f"Attempted to close non-existent cursor {cursor_id}")
+            return False
+        
+        # Don't wait for a long asynchronous query to finish; cancel it
+        self._cancel_execution(cursor_id, cursor, execution)
+        
+        # Wait for any in-flight execute or fetch on the cursor to finish
+        with cursor_lock:
+            self._release_cursor(cursor_id, cursor)
+        
+        logger.info(f"Closed cursor {cursor_id}")
+        return True
+    
+    @staticmethod
+    def _cancel_execution(cursor_id: str, cursor: TrinoCursor, execution: Optional[AsyncExecution]) -> None:
+        """Cancel the unfinished asynchronous query of an unregistered cursor without taking its lock"""
+        if execution is None or execution.cancel() or execution.done:
+            return
+        try:
+            cursor.cancel()
+        except Exception as e:
+            logger.warning(f"Error cancelling query on cursor {cursor_id}: {str(e)}")
+    
+    def _release_cursor(self, cursor_id: str, cursor: TrinoCursor) -> None:
+        """Close an unregistered cursor and drop its per-cursor state; caller holds its lock"""
+        self._stop_prefetch(cursor_id)
+        try:
+            cursor.close()
+        finally:
+            self._clear_result(cursor_id)
+    
+    def _acquire_cursor(self, cursor_id: str) -> Tuple[TrinoCursor, InstrumentedLock]:
+        """
+        Look up a cursor and acquire its lock
+        
+        Returns:
+            The cursor and its lock, which the caller must release
+        """
+        cursor, cursor_lock = self._lookup_cursor(cursor_id)
+        cursor_lock.acquire()
+        
+        # The cursor may have been closed while we waited for its lock
+        if self.cursors.get(cursor_id) is not cursor:
+            cursor_lock.release()
+            raise TrinoODBCError(f"Cursor {cursor_id} does not exist")
+        
+        return cursor, cursor_lock
+    
+    @contextmanager
+    def _locked_cursor(self, cursor_id: str) -> Iterator[TrinoCursor]:
+        """Hold a cursor's lock for the duration of a with block"""
+        cursor, cursor_lock = self._acquire_cursor(cursor_id)
+        try:
+            yield cursor
+        finally:
+            cursor_lock.release()
+    
+    def execute_query(self, cursor_id: str, query: str, parameters: Optional[List] = None,
+                      prefetch: bool = False, use_cache: bool = True) -> Dict:
+        """
+        Execute a SQL query using the specified cursor
+        
+        When the result cache is enabled, a SELECT whose result is cached is
+        answered from memory without running it on Trino, and the result of
+        one that is not is stored once the client has fetched all of it.
+        
+        Args:
+            cursor_id: The cursor ID to use
+            query: The SQL query to execute
+            parameters: Optional parameters for the query
+            prefetch: Fetch result pages on a background thread ahead of
+                the client's fetch requests
+            use_cache: Allow the result to be served from and stored in the
+                result cache
+            
+        Returns:
+            Dictionary with execution status and column information
+        """
+        with self._locked_cursor(cursor_id) as cursor:
+            return self._execute_locked(cursor_id, cursor, query, parameters, prefetch, use_cache)
+    
+    def _execute_locked(self, cursor_id: str, cursor: TrinoCursor, query: str,
+                        parameters: Optional[List], prefetch: bool, use_cache: bool = True) -> Dict:
+        """Execute a query on a cursor whose lock the caller holds"""
+        try:
+            self._stop_prefetch(cursor_id)
+            cache_key, cached = self._start_result(cursor_id, query, parameters, use_cache)
+            if cached is not None:
+                return cached
+            
+            start = time.perf_counter()
+            self._execute_statement(cursor_id, cursor, query, parameters)
+            EXECUTE_LATENCY.observe(time.perf_counter() - start)
+            
+            result = self._executed_result(cursor_id, query, cursor.description, cursor.rowcount, cache_key)
+            if prefetch and cursor.description:
+                self.prefetchers[cursor_id] = CursorPrefetcher(
+                    cursor_id, cursor,
+                    depth=self.prefetch_depth,
+                    max_bytes=self.prefetch_max_bytes
+                )
+            return result
+            
+        except Exception as e:
+            logger.error(f"Query execution error on cursor {cursor_id}: {str(e)}")
+            raise TrinoODBCError(f"Query execution error: {str(e)}")
+    
+    def _execute_statement(self, cursor_id: str, cursor: TrinoCursor, query: str,
+                           parameters: Optional[List]) -> None:
+        """
+        Run a query on a cursor whose lock the caller holds
+        
+        Queries prepared with prepare_statement, and all queries with
+        parameters if the prepared statement cache is enabled, run as EXECUTE
+        of a statement kept PREPAREd on the Trino connection, so that
+        repeated executions don't PREPARE and DEALLOCATE each time.
+        """
+        conn, cache = self._statement_cache(self._cursor_connection_id(cursor_id))
+        if cache is None or not (parameters and self.prepared_statement_cache_size or query in cache):
+            if parameters:
+                cursor.execute(query, parameters)
+            else:
+                cursor.execute(query)
+            return
+        
+        statement = self._checkout_statement(conn, cache, query)
+        try:
+            using = f" USING {', '.join(sql_literal(value) for value in parameters)}" if parameters else ""
+            cursor.execute(f"EXECUTE {statement.name}{using}")
+        finally:
+            cache.checkin(query, statement, True)
+    
+    def prepare_statement(self, connection_id: str, query: str) -> Dict:
+        """
+        PREPARE a statement on a connection ahead of its executions
+        
+        Later executions of the same query text on any cursor of the
+        connection, with or without parameters, run the prepared statement.
+        
+        Args:
+            connection_id: The connection ID to prepare the statement on
+            query: The SQL text of the statement, with ? placeholders
+            
+        Returns:
+            Dictionary with the name of the prepared statement
+        """
+        conn, cache = self._statement_cache(connection_id, create=True)
+        
+        try:
+            statement = self._checkout_statement(conn, cache, query)
+        except Exception as e:
+            logger.error(f"Error preparing statement on connection {connection_id}: {str(e)}")
+            raise TrinoODBCError(f"Error preparing statement: {str(e)}")
+        cache.checkin(query, statement, True)
+        
+        logger.info(f"Prepared statement {statement.name} on connection {connection_id}: {query[:100]}...")
+        return {"success": True, "statement": statement.name}
+    
+    def prepared_statement_stats(self) -> Dict[str, int]:
+        """Return the prepared statement cache counters summed over all Trino connections"""
+        with self.lock:
+            caches = list(self.prepared_statements.values())
+        totals = {"connections": len(caches), "statements": 0, "hits": 0, "misses": 0, "evictions": 0}
+        for cache in caches:
+            for key, value in cache.stats().items():
+                totals[key] += value
+        return totals
+    
+    def _statement_cache(self, connection_id: str,
+                         create: bool = False) -> Tuple[Optional[TrinoConnection], Optional[PreparedStatementCache]]:
+        """
+        Return a connection's Trino connection and prepared statement cache
+        
+        With the cache disabled, there is no cache until create is passed by
+        prepare_statement, which creates one of EXPLICIT_PREPARED_STATEMENT_CACHE_SIZE.
+        """
+        with self.lock:
+            conn = self.connections.get(connection_id)
+            if conn is None:
+                raise TrinoODBCError(f"Connection {connection_id} does not exist")
+            cache = self.prepared_statements.get(conn)
+            if cache is None:
+                if not (self.prepared_statement_cache_size or create):
+                    return conn, None
+                cache = self.prepared_statements[conn] = PreparedStatementCache(
+                    self.prepared_statement_cache_size or EXPLICIT_PREPARED_STATEMENT_CACHE_SIZE)
+            return conn, cache
+    
+    def _checkout_statement(self, conn: TrinoConnection, cache: PreparedStatementCache,
+                            query: str) -> PreparedStatement:
+        """Check out the statement for a query, PREPARing it and DEALLOCATing what it evicts as needed"""
+        statement, evicted = cache.checkout(query)
+        
+        try:
+            if not statement.prepared:
+                try:
+                    self._run_statement(conn, f"PREPARE {statement.name} FROM {query}")
+                except Exception:
+                    cache.checkin(query, statement, False)
+                    raise
+        finally:
+            for name in evicted:
+                try:
+                    self._run_statement(conn, f"DEALLOCATE PREPARE {name}")
+                except Exception as e:
+                    logger.warning(f"Error deallocating prepared statement {name}: {str(e)}")
+        return statement
+    
+    @staticmethod
+    def _run_statement(conn: TrinoConnection, sql: str) -> None:
+        """Run a statement without a result on its own cursor of a Trino connection"""
+        cursor = conn.cursor()
+        try:
+            cursor.execute(sql)
+            cursor.fetchall()
+        finally:
+            cursor.close()
+    
+    def execute_many(self, cursor_id: str, query: str, rows: List,
+                     max_statement_bytes: Optional[int] = None,
+                     concurrency: Optional[int] = None) -> Dict:
+        """
+        Execute a statement once for each row of parameters
+        
+        A single-row INSERT ... VALUES statement is rewritten into multi-row
+        INSERT statements of at most max_statement_bytes each. Any other
+        statement runs once per row. The statements run on their own Trino
+        cursors, at most concurrency at a time, while the cursor's lock is
+        held.
+        
+        Args:
+            cursor_id: The cursor ID to use
+            query: The SQL statement, with ? placeholders
+            rows: Parameter values for each execution
+            max_statement_bytes: Size limit for generated INSERT statements
+            concurrency: Maximum number of statements running at once,
+                capped by the service-wide executemany_concurrency
+            
+        Returns:
+            Dictionary with the total rowcount and the rows sent and rowcount
+            (or error) of each statement
+        """
+        max_statement_bytes = max_statement_bytes or self.executemany_max_statement_bytes
+        concurrency = max(1, min(concurrency or self.executemany_concurrency, self.executemany_concurrency))
+        
+        batches = batch_insert_values(query, rows, max_statement_bytes)
+        
+        with self._locked_cursor(cursor_id):
+            conn, cache = self._statement_cache(self._cursor_connection_id(cursor_id))
+            
+            # Statements run once per row are prepared once for all rows
+            statement = None
+            if batches is None and cache is not None and rows \
+                    and (self.prepared_statement_cache_size or query in cache):
+                statement = self._checkout_statement(conn, cache, query)
+                batches = [(f"EXECUTE {statement.name} USING {', '.join(sql_literal(value) for value in row)}"
+                            if row else f"EXECUTE {statement.name}", 1) for row in rows]
+            elif batches is None:
+                batches = [((query, list(row)), 1) for row in rows]
+            
+            try:
+                with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="executemany") as executor:
+                    results = list(executor.map(lambda batch: self._run_batch(conn, *batch), batches))
+            finally:
+                if statement is not None:
+                    cache.checkin(query, statement, True)
+        
+        return self._execute_many_response(cursor_id, rows, results)
+    
+    @staticmethod
+    def _run_batch(conn: TrinoConnection, statement: Union[str, Tuple[str, List]], row_count: int) -> Dict:
+        """Run one executemany statement to completion on a new cursor"""
+        cursor = conn.cursor()
+        try:
+            start = time.perf_counter()
+            if isinstance(statement, tuple):
+                cursor.execute(*statement)
+            else:
+                cursor.execute(statement)
+            cursor.fetchall()
+            EXECUTE_LATENCY.observe(time.perf_counter() - start)
+            return {
+                "rows": row_count,
+                "rowcount": cursor.rowcount if cursor.rowcount >= 0 else row_count
+            }
+        except Exception as e:
+            return {
+                "rows": row_count,
+                "rowcount": -1,
+                "error": str(e)
+            }
+        finally:
+            cursor.close()
+    
+    def execute_async(self, cursor_id: str, query: str, parameters: Optional[List] = None,
+                      prefetch: bool = False, use_cache: bool = True) -> Dict:
+        """
+        Submit a SQL query for execution on a background worker
+        
+        Returns as soon as the query is queued. Its progress is reported by
+        get_query_status, and results can be fetched once it has finished.
+        
+        Args:
+            cursor_id: The cursor ID to use
+            query: The SQL query to execute
+            parameters: Optional parameters for the query
+            prefetch: Prefetch result pages once the query has started, as
+                for execute_query
+            use_cache: Allow the result cache to be used, as for execute_query
+            
+        Returns:
+            Dictionary with the submission status and query state
+        """
+        cursor, cursor_lock = self._acquire_cursor(cursor_id)
+        
+        # The worker takes over the cursor lock and releases it when the query is done
+        try:
+            execution = AsyncExecution(cursor, query)
+            with self.lock:
+                self.executions[cursor_id] = execution
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self.async_workers,
+                                                        thread_name_prefix="async-query")
+            self._executor.submit(self._run_async, cursor_id, cursor, cursor_lock, execution,
+                                 query, parameters, prefetch, use_cache)
+        except Exception:
+            cursor_lock.release()
+            raise
+        
+        logger.info(f"Submitted query on cursor {cursor_id}: {query[:100]}...")
+        return {
+            "success": True,
+            "state": execution.state
+        }
+    
+    def _run_async(self, cursor_id: str, cursor: TrinoCursor, cursor_lock: InstrumentedLock,
+                   execution: AsyncExecution, query: str, parameters: Optional[List], prefetch: bool,
+                   use_cache: bool) -> None:
+        """Executor task running a query submitted with execute_async"""
+        try:
+            # A query cancelled while queued never reaches Trino
+            if not execution.start():
+                logger.info(f"Skipped query cancelled before it started on cursor {cursor_id}")
+                return
+            result = self._execute_locked(cursor_id, cursor, query, parameters, prefetch, use_cache)
+            execution.set_state(QUERY_STATE_FINISHED, result=result)
+        except Exception as e:
+            state = QUERY_STATE_CANCELLED if execution.cancel_requested else QUERY_STATE_FAILED
+            execution.set_state(state, error=str(e))
+        finally:
+            cursor_lock.release()
+    
+    def cancel_query(self, cursor_id: str) -> Dict:
+        """
+        Cancel the query running on a cursor
+        
+        Does not wait for the cursor lock, so it can interrupt an execute or
+        fetch in progress. Buffered prefetched pages are dropped and any
+        fetch waiting on them fails. A query submitted with execute_async
+        that is still queued is cancelled without ever running. The cursor
+        is marked cancelled rather than having its result state dropped here,
+        since a fetch in progress may still be updating it; later fetches
+        see the mark, drop that state under the cursor lock and fail. The
+        cursor stays open and can run another query.
+        
+        Args:
+            cursor_id: The cursor ID whose query should be cancelled
+            
+        Returns:
+            Dictionary with the cancellation status
+        """
+        cursor, execution, reader = self._mark_cancelled(cursor_id)
+        with self.lock:
+            prefetcher = self.prefetchers.get(cursor_id)
+        
+        # A query still queued is cancelled before it reaches Trino
+        if execution is not None and execution.cancel():
+            logger.info(f"Cancelled queued query on cursor {cursor_id}")
+            return {
+                "success": True
+            }
+        
+        # Results served from the cache have no Trino query behind them
+        if reader is not None:
+            logger.info(f"Cancelled cached result on cursor {cursor_id}")
+            return {
+                "success": True
+            }
+        
+        if prefetcher is not None:
+            prefetcher.close()
+        
+        try:
+            cursor.cancel()
+        except Exception as e:
+            logger.error(f"Error cancelling query on cursor {cursor_id}: {str(e)}")
+            raise TrinoODBCError(f"Error cancelling query: {str(e)}")
+        
+        logger.info(f"Cancelled query on cursor {cursor_id}")
+        return {
+            "success": True
+        }
     
-    def create_cursor(self, connection_id: str) -> str:
+    def get_query_status(self, cursor_id: str, wait: float = 0) -> Dict:
         """
-        Create a new cursor for an existing connection
+        Get the state of the query submitted asynchronously on a cursor
         
         Args:
-            connection_id: The connection ID to create a cursor for
+            cursor_id: The cursor ID to report on
+            wait: Seconds to wait for a queued or running query to finish
+                or be cancelled before reporting (long polling)
             
         Returns:
-            A unique cursor ID
+            Dictionary with the query state, progress and Trino statistics
         """
-        with self.lock:
-            if connection_id not in self.connections:
-                raise TrinoODBCError(f"Connection {connection_id} does not exist")
-            
-            cursor_id = f"{connection_id}_{str(uuid.uuid4())}"
-            self.cursors[cursor_id] = self.connections[connection_id].cursor()
-            
-            logger.info(f"Created cursor {cursor_id} for connection {connection_id}")
-            return cursor_id
+        execution = self._lookup_execution(cursor_id)
+        if wait > 0:
+            execution.wait(wait)
+        
+        status = execution.status()
+        status["success"] = True
+        return status
     
-    def close_cursor(self, cursor_id: str) -> bool:
+    def fetch_results(self, cursor_id: str, max_rows: int = 1000,
+                      result_format: str = RESULT_FORMAT_ROWS, max_bytes: Optional[int] = None,
+                      mimetype: str = JSON_MIMETYPE) -> Dict:
         """
-        Close a cursor
+        Fetch results from a previously executed query
         
         Args:
-            cursor_id: The cursor ID to close
+            cursor_id: The cursor ID to fetch results from
+            max_rows: Maximum number of rows to fetch at once
+            result_format: "rows" for a list of row objects, or "columnar" for
+                the column names followed by one value array per column
+            max_bytes: Optional encoded-size budget for the page; the number
+                of rows is chosen from the cursor's learned row width, up to
+                max_rows, and reported as "page_rows"
+            mimetype: Response encoding the values are converted for,
+                JSON_MIMETYPE or MSGPACK_MIMETYPE
             
         Returns:
-            True if the cursor was closed successfully
+            Dictionary containing the fetched rows and "has_more", which is
+            exact: false as soon as the page holds the last row. The last
+            page also reports the result's "total_rows"
         """
-        with self.lock:
-            if cursor_id in self.cursors:
-                self.cursors[cursor_id].close()
-                del self.cursors[cursor_id]
+        if result_format not in RESULT_FORMATS:
+            raise TrinoODBCError(f"Unsupported result format: {result_format}")
+        
+        with self._locked_cursor(cursor_id) as cursor:
+            try:
+                description = self._description(cursor_id, cursor)
+                page_rows = self._page_rows(cursor_id, description, max_rows, max_bytes)
+                rows, has_more = self._fetch_rows(cursor_id, cursor, page_rows)
+                return self._page_response(cursor_id, description, rows, has_more, page_rows,
+                                           result_format, max_bytes, mimetype)
                 
-                logger.info(f"Closed cursor {cursor_id}")
-                return True
-            else:
-                logger.warning(f"Attempted to close non-existent cursor {cursor_id}")
-                return False
+            except Exception as e:
+                logger.error(f"Error fetching results from cursor {cursor_id}: {str(e)}")
+                raise TrinoODBCError(f"Error fetching results: {str(e)}")
     
-    def execute_query(self, cursor_id: str, query: str, parameters: Optional[List] = None) -> Dict:
+    def run_query(self, connection_id: str, query: str, parameters: Optional[List] = None,
+                  max_rows: int = 1000, result_format: str = RESULT_FORMAT_ROWS,
+                  prefetch: bool = False, use_cache: bool = True, max_bytes: Optional[int] = None,
+                  mimetype: str = JSON_MIMETYPE) -> Dict:
         """
-        Execute a SQL query using the specified cursor
+        Create a cursor, execute a query on it and fetch the first page of results
+        
+        If the first page exhausts the result, the cursor is closed before
+        returning and no cursor ID is reported; otherwise the remaining rows
+        can be fetched or streamed through the returned cursor ID.
         
         Args:
-            cursor_id: The cursor ID to use
+            connection_id: The connection ID to run the query on
             query: The SQL query to execute
             parameters: Optional parameters for the query
+            max_rows: Maximum number of rows to return in the first page
+            result_format: Encoding of the first page, as for fetch_results
+            prefetch: Prefetch the remaining pages, as for execute_query
+            use_cache: Allow the result cache to be used, as for execute_query
+            max_bytes: Encoded-size budget for the first page, as for fetch_results
+            mimetype: Response encoding of the first page, as for fetch_results
             
         Returns:
-            Dictionary with execution status and column information
+            Dictionary with the column information, the first page of rows
+            and the cursor ID (None if the cursor was closed)
+        """
+        cursor_id = self.create_cursor(connection_id)
+        
+        try:
+            result = self.execute_query(cursor_id, query, parameters, prefetch, use_cache)
+            page = self.fetch_results(cursor_id, max_rows, result_format, max_bytes, mimetype)
+        except Exception:
+            # Report the query's error, not a failure to clean up after it
+            try:
+                self.close_cursor(cursor_id)
+            except Exception as e:
+                logger.warning(f"Error closing cursor {cursor_id} after a failed query: {str(e)}")
+            raise
+        
+        # Column names are already part of the column metadata
+        page.pop("columns", None)
+        result.update(page)
+        
+        if not result["has_more"]:
+            self.close_cursor(cursor_id)
+            cursor_id = None
+        
+        result["cursor_id"] = cursor_id
+        return result
+    
+    def stream_results(self, cursor_id: str, page_size: int = 1000,
+                       mimetype: str = NDJSON_MIMETYPE) -> Iterator[bytes]:
+        """
+        Drain a cursor as newline-delimited JSON or a MessagePack sequence
+        
+        The first message is {"columns": [...]}, followed by one array per
+        row and a closing {"done": true, "row_count": N} message. If fetching
+        fails part-way, an {"error": "..."} message is written instead of the
+        closing one. Only one page of rows is held in memory at a time.
+        
+        Args:
+            cursor_id: The cursor ID to stream results from
+            page_size: Number of rows to fetch from Trino per page
+            mimetype: NDJSON_MIMETYPE, or MSGPACK_MIMETYPE for MessagePack
+                objects written back to back
+            
+        Returns:
+            An iterator of encoded chunks, one per page
         """
         with self.lock:
             if cursor_id not in self.cursors:
                 raise TrinoODBCError(f"Cursor {cursor_id} does not exist")
         
+        return self._generate_stream(cursor_id, page_size, StreamFraming(mimetype))
+    
+    def _generate_stream(self, cursor_id: str, page_size: int, framing: StreamFraming) -> Iterator[bytes]:
+        """Yield the framing for stream_results, one chunk per page"""
+        # The cursor lock is held until the stream is drained or the client goes away
         try:
-            cursor = self.cursors[cursor_id]
-            
-            if parameters:
-                cursor.execute(query, parameters)
-            else:
-                cursor.execute(query)
-            
-            # Get column information if available
-            columns = []
-            if cursor.description:
-                columns = [
-                    {
-                        "name": col[0],
-                        "type_code": col[1],
-                        "display_size": col[2],
-                        "internal_size": col[3],
-                        "precision": col[4],
-                        "scale": col[5],
-                        "null_ok": col[6]
-                    }
-                    for col in cursor.description
-                ]
+            cursor, cursor_lock = self._acquire_cursor(cursor_id)
+        except TrinoODBCError as e:
+            yield framing.message({"error": str(e)})
+            return
+        
+        try:
+            description = self._description(cursor_id, cursor)
+            column_names = [col[0] for col in description] if description else []
+            yield framing.message({"columns": column_names})
             
-            logger.info(f"Executed query on cursor {cursor_id}: {query[:100]}...")
-            return {
-                "success": True,
-                "columns": columns,
-                "rowcount": cursor.rowcount if cursor.rowcount >= 0 else -1
-            }
+            encoder = self._row_encoder(cursor_id, description, framing.value_encoder)
+            row_count = 0
+            try:
+                has_more = True
+                while has_more:
+                    rows, has_more = self._fetch_rows(cursor_id, cursor, page_size)
+                    if not rows:
+                        break
+                    row_count += len(rows)
+                    chunk = framing.rows(rows, encoder)
+                    ROWS_SERVED.inc(len(rows), format=framing.format)
+                    BYTES_SERVED.inc(len(chunk), format=framing.format)
+                    yield chunk
+            except Exception as e:
+                logger.error(f"Error streaming results from cursor {cursor_id}: {str(e)}")
+                yield framing.message({"error": f"Error fetching results: {str(e)}"})
+                return
             
-        except Exception as e:
-            logger.error(f"Query execution error on cursor {cursor_id}: {str(e)}")
-            raise TrinoODBCError(f"Query execution error: {str(e)}")
+            logger.info(f"Streamed {row_count} rows from cursor {cursor_id}")
+            yield framing.message({"done": True, "row_count": row_count})
+        finally:
+            cursor_lock.release()
     
-    def fetch_results(self, cursor_id: str, max_rows: int = 1000) -> Dict:
+    def fetch_results_arrow(self, cursor_id: str, max_rows: int = 1000,
+                            max_bytes: Optional[int] = None) -> Tuple[bytes, bool, int]:
         """
-        Fetch results from a previously executed query
+        Fetch results as an Arrow IPC stream containing one record batch
         
         Args:
             cursor_id: The cursor ID to fetch results from
             max_rows: Maximum number of rows to fetch at once
+            max_bytes: Optional encoded-size budget for the page, as for fetch_results
             
         Returns:
-            Dictionary containing the fetched rows and status
+            Tuple of the encoded IPC stream, whether more rows follow and the
+            number of rows requested for the page
         """
-        with self.lock:
-            if cursor_id not in self.cursors:
-                raise TrinoODBCError(f"Cursor {cursor_id} does not exist")
+        if pa is None:
+            raise TrinoODBCError("Arrow output requires the pyarrow package")
+        
+        with self._locked_cursor(cursor_id) as cursor:
+            try:
+                page_rows = self._page_rows(cursor_id, self._description(cursor_id, cursor), max_rows, max_bytes)
+                rows, has_more = self._fetch_rows(cursor_id, cursor, page_rows)
+                return self._arrow_page(cursor_id, cursor, rows, max_bytes), has_more, page_rows
+                
+            except Exception as e:
+                logger.error(f"Error fetching results from cursor {cursor_id}: {str(e)}")
+                raise TrinoODBCError(f"Error fetching results: {str(e)}")
+    
+    def _fetch_rows(self, cursor_id: str, cursor: TrinoCursor, max_rows: int) -> Tuple[List, bool]:
+        """
+        Fetch the next page of rows and whether more rows follow it
         
+        One row beyond the page is read ahead and held back for the next
+        page, so the end of the result is known without an extra, empty fetch.
+        Fails if the cursor's query has been cancelled.
+        """
+        rows = self._take_lookahead(cursor_id)
+        wanted = max_rows + 1 - len(rows)
+        if wanted > 0:
+            rows = rows + self._read_rows(cursor_id, cursor, wanted)
+        return self._split_page(cursor_id, rows, max_rows)
+    
+    def _read_rows(self, cursor_id: str, cursor: TrinoCursor, max_rows: int) -> List:
+        """
+        Read up to max_rows rows from the cursor's result
+        
+        Rows come from the result cache if the query was answered from it,
+        otherwise from the cursor's prefetcher if it has one, or from Trino.
+        """
+        reader = self.cache_readers.get(cursor_id)
+        if reader is not None:
+            return reader.take(max_rows)
+        
+        fill = self.cache_fills.get(cursor_id)
         try:
-            cursor = self.cursors[cursor_id]
-            rows = cursor.fetchmany(max_rows)
-            
-            # Convert rows to a list of dictionaries if possible
-            result_rows = []
-            if cursor.description:
-                column_names = [col[0] for col in cursor.description]
-                for row in rows:
-                    result_rows.append(dict(zip(column_names, row)))
+            prefetcher = self.prefetchers.get(cursor_id)
+            if prefetcher is not None:
+                rows = prefetcher.take(max_rows)
             else:
-                result_rows = [list(row) for row in rows]
-            
-            has_more = len(rows) >= max_rows
-            
-            logger.info(f"Fetched {len(rows)} rows from cursor {cursor_id}")
-            return {
-                "success": True,
-                "rows": result_rows,
-                "has_more": has_more
-            }
-            
-        except Exception as e:
-            logger.error(f"Error fetching results from cursor {cursor_id}: {str(e)}")
-            raise TrinoODBCError(f"Error fetching results: {str(e)}")
+                rows = cursor.fetchmany(max_rows)
+        except Exception:
+            self.cache_fills.pop(cursor_id, None)
+            raise
+        
+        if fill is not None:
+            self._record_fill(cursor_id, fill, rows, max_rows)
+        return rows
     
-    def get_connection_info(self, connection_id: str) -> Dict:
+    def _session_state(self, connection_id: str) -> Optional[Dict[str, Any]]:
+        """Return the state of the connection's Trino client session, which USE and SET SESSION update"""
+        with self.lock:
+            conn = self.connections[connection_id]
+        
+        session = getattr(conn, '_client_session', None)
+        if session is None:
+            return super()._session_state(connection_id)
+        if session.transaction_id not in (None, NO_TRANSACTION):
+            return None
+        return {
+            "catalog": session.catalog,
+            "schema": session.schema,
+            "properties": dict(session.properties),
+            "roles": dict(session.roles),
+            "authorization_user": session.authorization_user
+        }
+    
+    def _discard_result(self, cursor_id: str) -> None:
+        """Drop the rows a cancelled cursor still holds, including prefetched ones"""
+        self._stop_prefetch(cursor_id)
+        super()._discard_result(cursor_id)
+    
+    def _stop_prefetch(self, cursor_id: str) -> None:
+        """Stop and discard the cursor's prefetcher, if any"""
+        prefetcher = self.prefetchers.pop(cursor_id, None)
+        if prefetcher is not None:
+            prefetcher.close()
+    
+    def get_metadata(self, connection_id: str, kind: str, catalog: Optional[str] = None,
+                     schema: Optional[str] = None, table: Optional[str] = None,
+                     column: Optional[str] = None) -> Dict:
         """
-        Get information about a connection
+        List schemas, tables or columns from a catalog's information_schema
+        
+        Results are served from the metadata cache when possible.
         
         Args:
-            connection_id: The connection ID to get information for
+            connection_id: The connection ID to query through
+            kind: "schemas", "tables" or "columns"
+            catalog: Catalog to describe; defaults to the connection's catalog
+            schema: Optional LIKE pattern for schema names
+            table: Optional LIKE pattern for table names
+            column: Optional LIKE pattern for column names
             
         Returns:
-            Dictionary containing connection information
+            Dictionary with the column names and one row object per object found
         """
-        with self.lock:
-            if connection_id not in self.connections:
-                raise TrinoODBCError(f"Connection {connection_id} does not exist")
-            
-            params = self.connection_params[connection_id]
-            
-            # Return a copy of the connection parameters without sensitive info
-            info = params.copy()
-            if 'password' in info:
-                info['password'] = '***'
+        conn, catalog, patterns, key = self._metadata_request(connection_id, kind, catalog, (schema, table, column))
+        columns = METADATA_QUERIES[kind][1]
+        rows = self.metadata_cache.get(key)
+        cached = rows is not None
+        
+        if rows is None:
+            query = metadata_query(kind, catalog, patterns)
+            cursor = conn.cursor()
+            try:
+                cursor.execute(query)
+                rows = [dict(zip(columns, row)) for row in cursor.fetchall()]
+            except Exception as e:
+                logger.error(f"Error listing {kind} of catalog {catalog}: {str(e)}")
+                raise TrinoODBCError(f"Error listing {kind}: {str(e)}")
+            finally:
+                cursor.close()
             
-            return info
+            self.metadata_cache.put(key, rows)
+        
+        return {
+            "success": True,
+            "columns": list(columns),
+            "rows": rows,
+            "cached": cached
+        }
+    
+    def reap_idle(self) -> Dict[str, int]:
+        """
+        Close cursors and connections that clients have stopped using
+        
+        A cursor is reaped once it has not been used for cursor_idle_ttl
+        seconds, and a connection once neither it nor any of its cursors has
+        been used for connection_idle_ttl seconds. Closing a cursor cancels
+        its Trino query. Handles with an operation in progress are never
+        reaped. A TTL of 0 disables reaping for that kind of handle.
+        
+        Returns:
+            Dictionary with the number of cursors and connections reaped
+        """
+        idle_cursors, idle_connections = self._idle_handles()
+        reaped_cursors = sum(1 for cursor_id in idle_cursors if self.close_cursor(cursor_id))
+        reaped_connections = sum(1 for connection_id in idle_connections if self.close_connection(connection_id))
+        return self._record_reaped(reaped_cursors, reaped_connections)
+    
+    def start_reaper(self, interval: float = DEFAULT_REAP_INTERVAL) -> None:
+        """Start a daemon thread that periodically reaps idle cursors and connections"""
+        if self._reaper is not None:
+            return
+        
+        def run():
+            while True:
+                time.sleep(interval)
+                try:
+                    self.reap_idle()
+                except Exception as e:
+                    logger.error(f"Error reaping idle handles: {str(e)}")
+        
+        self._reaper = threading.Thread(target=run, name="idle-reaper", daemon=True)
+        self._reaper.start()
 
 # Flask REST API for the ODBC driver
 app = Flask(__name__)
-connection_manager = ConnectionManager()
+connection_pool = TrinoConnectionPool()
+connection_manager = ConnectionManager(connection_pool)
+response_compression = ResponseCompression()
+
+metrics.gauge("trino_odbc_open_connections", "Open logical connections",
+              lambda: len(connection_manager.connections))
+metrics.gauge("trino_odbc_open_cursors", "Open cursors",
+              lambda: len(connection_manager.cursors))
+metrics.gauge("trino_odbc_pool_leased_connections", "Pooled Trino connections leased to logical connections",
+              lambda: connection_pool.stats()["leased"])
+metrics.gauge("trino_odbc_pool_idle_connections", "Idle pooled Trino connections",
+              lambda: connection_pool.stats()["idle"])
+
+@app.before_request
+def start_request_timer():
+    """Record when request handling started"""
+    g.request_start = time.perf_counter()
+
+# Loopback port of this worker's forwarding listener when serving with several workers
+worker_port: Optional[int] = None
+
+@app.before_request
+def forward_to_owner():
+    """Hand requests for another worker's connection or cursor over to that worker"""
+    if worker_port is None or request.headers.get(FORWARDED_HEADER):
+        return None
+    
+    view_args = request.view_args or {}
+    handle_id = view_args.get('cursor_id') or view_args.get('connection_id')
+    match = WORKER_ID_PATTERN.match(handle_id or "")
+    if match is None or int(match.group(1)) == worker_port:
+        return None
+    
+    g.forwarded = True
+    return forward_request(int(match.group(1)))
+
+def forward_request(port: int) -> Response:
+    """Proxy the current request to the worker listening on a loopback port, streaming its response"""
+    headers = {name: value for name, value in request.headers.items()
+               if name.lower() not in HOP_BY_HOP_HEADERS}
+    headers[FORWARDED_HEADER] = "1"
+    path = request.path + (f"?{request.query_string.decode('latin-1')}" if request.query_string else "")
+    
+    upstream_conn = http.client.HTTPConnection("127.0.0.1", port)
+    try:
+        upstream_conn.request(request.method, path, body=request.get_data(), headers=headers)
+        upstream = upstream_conn.getresponse()
+    except OSError as e:
+        upstream_conn.close()
+        logger.error(f"Error forwarding {request.method} {request.path} to worker on port {port}: {str(e)}")
+        return jsonify({
+            "success": False,
+            "error": f"The worker owning this handle is unavailable: {str(e)}"
+        }), 400
+    
+    def relay():
+        try:
+            while True:
+                chunk = upstream.read1(65536)
+                if not chunk:
+                    break
+                yield chunk
+        finally:
+            upstream_conn.close()
+    
+    response_headers = [(name, value) for name, value in upstream.getheaders()
+                        if name.lower() not in HOP_BY_HOP_HEADERS]
+    return Response(relay(), status=upstream.status, headers=response_headers)
+
+@app.after_request
+def record_request_metrics(response):
+    """Record latency and status of the handled request"""
+    start = getattr(g, 'request_start', None)
+    if start is not None:
+        route = request.url_rule.rule if request.url_rule else "<unmatched>"
+        REQUEST_LATENCY.observe(time.perf_counter() - start, route=route, method=request.method)
+        REQUESTS.inc(route=route, method=request.method, status=response.status_code)
+    return response
+
+@app.after_request
+def compress_response(response):
+    """Compress result responses with the best encoding the client accepts"""
+    # Forwarded responses were already negotiated by the owning worker
+    if request.endpoint not in COMPRESSED_ENDPOINTS or g.get('forwarded'):
+        return response
+    response.vary.add('Accept-Encoding')
+    
+    encoding = response_compression.negotiate(request.headers.get('Accept-Encoding'))
+    if encoding is None:
+        return response
+    
+    if response.is_streamed:
+        response.response = response_compression.compress_stream(response.response, encoding)
+        response.headers.pop('Content-Length', None)
+    else:
+        body = response.get_data()
+        if len(body) < response_compression.min_bytes:
+            return response
+        response.set_data(response_compression.compress(body, encoding))
+    response.headers['Content-Encoding'] = encoding
+    return response
+
+def result_response(result: Dict, mimetype: str) -> Response:
+    """Encode a successful result as JSON or MessagePack"""
+    if mimetype == MSGPACK_MIMETYPE:
+        return Response(msgpack_packer().pack(result), mimetype=MSGPACK_MIMETYPE)
+    return jsonify(result)
+
+@app.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    """Expose driver metrics in the Prometheus text format"""
+    return Response(metrics.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
 
 @app.route('/status', methods=['GET'])
 def status():
@@ -291,7 +3259,12 @@ def status():
     return jsonify({
         "status": "ok",
         "version": VERSION,
-        "name": DRIVER_NAME
+        "name": DRIVER_NAME,
+        "pool": connection_pool.stats(),
+        "handles": connection_manager.stats(),
+        "result_cache": connection_manager.result_cache.stats() if connection_manager.result_cache else None,
+        "metadata_cache": connection_manager.metadata_cache.stats(),
+        "prepared_statements": connection_manager.prepared_statement_stats()
     })
 
 @app.route('/connections', methods=['POST'])
@@ -330,88 +3303,1318 @@ def close_connection(connection_id):
 def create_cursor(connection_id):
     """Create a new cursor for a connection"""
     try:
-        cursor_id = connection_manager.create_cursor(connection_id)
-        return jsonify({
-            "success": True,
-            "cursor_id": cursor_id
-        })
+        cursor_id = connection_manager.create_cursor(connection_id)
+        return jsonify({
+            "success": True,
+            "cursor_id": cursor_id
+        })
+    except Exception as e:
+        logger.error(f"Error creating cursor for connection {connection_id}: {str(e)}")
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 400
+
+@app.route('/connections/<connection_id>/query', methods=['POST'])
+def run_query(connection_id):
+    """Execute a query on a new cursor and return the first page of results"""
+    try:
+        data = request.json
+        query = data.get('query')
+        parameters = data.get('parameters')
+        max_bytes = int(data['max_bytes']) if data.get('max_bytes') else None
+        max_rows = int(data.get('max_rows', DEFAULT_MAX_PAGE_ROWS if max_bytes else 1000))
+        result_format = data.get('format', RESULT_FORMAT_ROWS)
+        prefetch = bool(data.get('prefetch', False))
+        use_cache = bool(data.get('cache', True))
+        
+        if not query:
+            return jsonify({
+                "success": False,
+                "error": "Query is required"
+            }), 400
+        
+        mimetype = result_mimetype(request.headers.get('Accept'))
+        result = connection_manager.run_query(connection_id, query, parameters, max_rows,
+                                              result_format, prefetch, use_cache, max_bytes,
+                                              mimetype=mimetype)
+        response = result_response(result, mimetype)
+        BYTES_SERVED.inc(response.content_length or 0,
+                         format="msgpack" if mimetype == MSGPACK_MIMETYPE else result_format)
+        if max_bytes and result["cursor_id"]:
+            connection_manager.record_page_bytes(result["cursor_id"], result_row_count(result),
+                                                 response.content_length or 0)
+        return response
+        
+    except Exception as e:
+        logger.error(f"Error running query on connection {connection_id}: {str(e)}")
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 400
+
+@app.route('/cursors/<cursor_id>', methods=['DELETE'])
+def close_cursor(cursor_id):
+    """Close a cursor"""
+    try:
+        success = connection_manager.close_cursor(cursor_id)
+        return jsonify({
+            "success": success
+        })
+    except Exception as e:
+        logger.error(f"Error closing cursor {cursor_id}: {str(e)}")
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 400
+
+@app.route('/cursors/<cursor_id>/execute', methods=['POST'])
+def execute_query(cursor_id):
+    """Execute a SQL query using a cursor"""
+    try:
+        data = request.json
+        query = data.get('query')
+        parameters = data.get('parameters')
+        prefetch = bool(data.get('prefetch', False))
+        run_async = bool(data.get('async', False))
+        use_cache = bool(data.get('cache', True))
+        
+        if not query:
+            return jsonify({
+                "success": False,
+                "error": "Query is required"
+            }), 400
+        
+        if run_async:
+            result = connection_manager.execute_async(cursor_id, query, parameters, prefetch, use_cache)
+        else:
+            result = connection_manager.execute_query(cursor_id, query, parameters, prefetch, use_cache)
+        return result_response(result, result_mimetype(request.headers.get('Accept')))
+        
+    except Exception as e:
+        logger.error(f"Error executing query on cursor {cursor_id}: {str(e)}")
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 400
+
+@app.route('/cursors/<cursor_id>/executemany', methods=['POST'])
+def execute_many(cursor_id):
+    """
+    Execute a statement once per row of parameters
+    
+    The parameters are sent either as JSON, with "parameters" holding one
+    array per row or "columns" holding one array per column, or as an Arrow
+    IPC stream body with the query and options in the query string.
+    """
+    try:
+        if request.mimetype == ARROW_STREAM_MIMETYPE:
+            options = request.args
+            rows = arrow_stream_rows(request.get_data())
+        else:
+            options = request.json
+            if options.get('columns') is not None:
+                rows = list(zip(*options['columns']))
+            else:
+                rows = options.get('parameters') or []
+        
+        query = options.get('query')
+        if not query:
+            return jsonify({
+                "success": False,
+                "error": "Query is required"
+            }), 400
+        
+        max_statement_bytes = options.get('max_statement_bytes')
+        concurrency = options.get('concurrency')
+        result = connection_manager.execute_many(
+            cursor_id, query, rows,
+            int(max_statement_bytes) if max_statement_bytes else None,
+            int(concurrency) if concurrency else None
+        )
+        return jsonify(result), (200 if result["success"] else 400)
+        
+    except Exception as e:
+        logger.error(f"Error executing batch on cursor {cursor_id}: {str(e)}")
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 400
+
+@app.route('/cursors/<cursor_id>/cancel', methods=['POST'])
+def cancel_query(cursor_id):
+    """Cancel the query running on a cursor"""
+    try:
+        result = connection_manager.cancel_query(cursor_id)
+        return jsonify(result)
+        
+    except Exception as e:
+        logger.error(f"Error cancelling query on cursor {cursor_id}: {str(e)}")
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 400
+
+@app.route('/cursors/<cursor_id>/status', methods=['GET'])
+def get_query_status(cursor_id):
+    """Report the state of an asynchronously submitted query"""
+    try:
+        wait = request.args.get('wait', 0, type=float)
+        result = connection_manager.get_query_status(cursor_id, wait)
+        return jsonify(result)
+        
+    except Exception as e:
+        logger.error(f"Error getting query status for cursor {cursor_id}: {str(e)}")
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 400
+
+@app.route('/cursors/<cursor_id>/fetch', methods=['GET'])
+def fetch_results(cursor_id):
+    """Fetch results from a cursor"""
+    try:
+        max_bytes = request.args.get('max_bytes', type=int)
+        max_rows = request.args.get('max_rows', DEFAULT_MAX_PAGE_ROWS if max_bytes else 1000, type=int)
+        
+        accepted = result_mimetype(request.headers.get('Accept'),
+                                   (JSON_MIMETYPE, ARROW_STREAM_MIMETYPE, MSGPACK_MIMETYPE))
+        if accepted == ARROW_STREAM_MIMETYPE:
+            payload, has_more, page_rows = connection_manager.fetch_results_arrow(cursor_id, max_rows, max_bytes)
+            response = Response(payload, mimetype=ARROW_STREAM_MIMETYPE)
+            response.headers['X-Trino-Has-More'] = 'true' if has_more else 'false'
+            response.headers['X-Trino-Page-Rows'] = str(page_rows)
+            return response
+        
+        result_format = request.args.get('format', RESULT_FORMAT_ROWS)
+        result = connection_manager.fetch_results(cursor_id, max_rows, result_format, max_bytes,
+                                                  mimetype=accepted)
+        response = result_response(result, accepted)
+        BYTES_SERVED.inc(response.content_length or 0,
+                         format="msgpack" if accepted == MSGPACK_MIMETYPE else result_format)
+        if max_bytes:
+            connection_manager.record_page_bytes(cursor_id, result_row_count(result), response.content_length or 0)
+        return response
+        
+    except Exception as e:
+        logger.error(f"Error fetching results from cursor {cursor_id}: {str(e)}")
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 400
+
+@app.route('/cursors/<cursor_id>/stream', methods=['GET'])
+def stream_results(cursor_id):
+    """Stream all remaining rows of a cursor as NDJSON or MessagePack in a single response"""
+    try:
+        page_size = request.args.get('page_size', 1000, type=int)
+        mimetype = result_mimetype(request.headers.get('Accept'), (NDJSON_MIMETYPE, MSGPACK_MIMETYPE))
+        chunks = connection_manager.stream_results(cursor_id, page_size, mimetype)
+        return Response(chunks, mimetype=mimetype)
+        
     except Exception as e:
-        logger.error(f"Error creating cursor for connection {connection_id}: {str(e)}")
+        logger.error(f"Error streaming results from cursor {cursor_id}: {str(e)}")
         return jsonify({
             "success": False,
             "error": str(e)
         }), 400
 
-@app.route('/cursors/<cursor_id>', methods=['DELETE'])
-def close_cursor(cursor_id):
-    """Close a cursor"""
+@app.route('/connections/<connection_id>/info', methods=['GET'])
+def get_connection_info(connection_id):
+    """Get information about a connection"""
     try:
-        success = connection_manager.close_cursor(cursor_id)
+        info = connection_manager.get_connection_info(connection_id)
         return jsonify({
-            "success": success
+            "success": True,
+            "info": info
         })
     except Exception as e:
-        logger.error(f"Error closing cursor {cursor_id}: {str(e)}")
+        logger.error(f"Error getting info for connection {connection_id}: {str(e)}")
         return jsonify({
             "success": False,
             "error": str(e)
         }), 400
 
-@app.route('/cursors/<cursor_id>/execute', methods=['POST'])
-def execute_query(cursor_id):
-    """Execute a SQL query using a cursor"""
+@app.route('/connections/<connection_id>/prepare', methods=['POST'])
+def prepare_statement(connection_id):
+    """PREPARE a statement on a connection ahead of its executions"""
     try:
-        data = request.json
-        query = data.get('query')
-        parameters = data.get('parameters')
+        query = request.json.get('query')
         
         if not query:
             return jsonify({
                 "success": False,
                 "error": "Query is required"
             }), 400
-            
-        result = connection_manager.execute_query(cursor_id, query, parameters)
-        return jsonify(result)
         
+        return jsonify(connection_manager.prepare_statement(connection_id, query))
     except Exception as e:
-        logger.error(f"Error executing query on cursor {cursor_id}: {str(e)}")
+        logger.error(f"Error preparing statement on connection {connection_id}: {str(e)}")
         return jsonify({
             "success": False,
             "error": str(e)
         }), 400
 
-@app.route('/cursors/<cursor_id>/fetch', methods=['GET'])
-def fetch_results(cursor_id):
-    """Fetch results from a cursor"""
+@app.route('/connections/<connection_id>/metadata/<kind>', methods=['GET'])
+def get_metadata(connection_id, kind):
+    """List the schemas, tables or columns of a catalog"""
     try:
-        max_rows = request.args.get('max_rows', 1000, type=int)
-        result = connection_manager.fetch_results(cursor_id, max_rows)
+        result = connection_manager.get_metadata(
+            connection_id, kind,
+            catalog=request.args.get('catalog'),
+            schema=request.args.get('schema'),
+            table=request.args.get('table'),
+            column=request.args.get('column')
+        )
         return jsonify(result)
-        
     except Exception as e:
-        logger.error(f"Error fetching results from cursor {cursor_id}: {str(e)}")
+        logger.error(f"Error getting {kind} metadata for connection {connection_id}: {str(e)}")
         return jsonify({
             "success": False,
             "error": str(e)
         }), 400
 
-@app.route('/connections/<connection_id>/info', methods=['GET'])
-def get_connection_info(connection_id):
-    """Get information about a connection"""
+@app.route('/connections/<connection_id>/metadata/cache', methods=['DELETE'])
+def invalidate_metadata(connection_id):
+    """Drop cached metadata, optionally for a single catalog"""
     try:
-        info = connection_manager.get_connection_info(connection_id)
+        dropped = connection_manager.invalidate_metadata(connection_id, request.args.get('catalog'))
         return jsonify({
             "success": True,
-            "info": info
+            "invalidated": dropped
         })
     except Exception as e:
-        logger.error(f"Error getting info for connection {connection_id}: {str(e)}")
+        logger.error(f"Error invalidating metadata for connection {connection_id}: {str(e)}")
         return jsonify({
             "success": False,
             "error": str(e)
         }), 400
 
+# Asyncio serving layer: the same REST routes on aiohttp, with Trino's
+# statement protocol spoken over non-blocking HTTP
+class AsyncClientSession:
+    """
+    Client session of a connection served by the asyncio server
+    
+    Counterpart of trino.client.ClientSession: holds the catalog, schema,
+    session properties, roles and transaction that USE, SET SESSION, SET ROLE
+    and START TRANSACTION change, updates them from Trino's response headers
+    and sends them with every later request on the connection.
+    """
+    
+    def __init__(self, params: Dict[str, Any]):
+        self.params = params
+        self.base_url = (f"{params.get('http_scheme', 'http')}://"
+                         f"{params.get('host', 'localhost')}:{params.get('port', 8080)}")
+        self.catalog: Optional[str] = params.get('catalog')
+        self.schema: Optional[str] = params.get('schema')
+        self.properties: Dict[str, str] = dict(params.get('session_properties') or {})
+        self.roles: Dict[str, str] = {}
+        self.authorization_user: Optional[str] = None
+        self.transaction_id: Optional[str] = None
+    
+    def headers(self) -> Dict[str, str]:
+        """Build the Trino client headers for the session"""
+        user = self.params.get('user', 'trino')
+        headers = {
+            "X-Trino-User": self.authorization_user or user,
+            "X-Trino-Source": DRIVER_NAME
+        }
+        if self.authorization_user:
+            headers["X-Trino-Original-User"] = user
+        if self.catalog:
+            headers["X-Trino-Catalog"] = self.catalog
+        if self.schema:
+            headers["X-Trino-Schema"] = self.schema
+        if self.properties:
+            headers["X-Trino-Session"] = ",".join(
+                f"{name}={urllib.parse.quote(str(value))}" for name, value in self.properties.items())
+        if self.roles:
+            headers["X-Trino-Role"] = ",".join(
+                f"{catalog}={urllib.parse.quote(str(role))}" for catalog, role in self.roles.items())
+        if self.transaction_id:
+            headers["X-Trino-Transaction-Id"] = self.transaction_id
+        if self.params.get('password'):
+            headers["Authorization"] = aiohttp.BasicAuth(user, self.params['password']).encode()
+        return headers
+    
+    def update(self, headers: Any) -> None:
+        """
+        Apply the session changes a Trino response announces, as trino.client.TrinoRequest.process does
+        
+        Args:
+            headers: The response headers, as a multidict
+        """
+        for name in self._header_items(headers, "X-Trino-Clear-Session"):
+            self.properties.pop(name, None)
+        for name, value in self._header_pairs(headers, "X-Trino-Set-Session"):
+            self.properties[name] = value
+        if "X-Trino-Set-Catalog" in headers:
+            self.catalog = headers["X-Trino-Set-Catalog"]
+        if "X-Trino-Set-Schema" in headers:
+            self.schema = headers["X-Trino-Set-Schema"]
+        for catalog, role in self._header_pairs(headers, "X-Trino-Set-Role"):
+            self.roles[catalog] = role
+        if "X-Trino-Set-Authorization-User" in headers:
+            self.authorization_user = headers["X-Trino-Set-Authorization-User"]
+        if "X-Trino-Reset-Authorization-User" in headers:
+            self.authorization_user = None
+        started = headers.get("X-Trino-Started-Transaction-Id")
+        if started and started != NO_TRANSACTION:
+            self.transaction_id = started
+        if "X-Trino-Clear-Transaction-Id" in headers:
+            self.transaction_id = None
+    
+    @staticmethod
+    def _header_items(headers: Any, name: str) -> List[str]:
+        """Return the comma-separated items of every occurrence of a header"""
+        return [item.strip() for value in headers.getall(name, []) for item in value.split(",") if item.strip()]
+    
+    @classmethod
+    def _header_pairs(cls, headers: Any, name: str) -> List[Tuple[str, str]]:
+        """Return the name=value items of a header, with the values URL-decoded"""
+        return [(key.strip(), urllib.parse.unquote_plus(value.strip()))
+                for key, _, value in (item.partition("=") for item in cls._header_items(headers, name))]
+
+class AsyncTrinoCursor:
+    """
+    Cursor that runs statements through Trino's REST protocol on aiohttp
+    
+    Mirrors the parts of trino.dbapi.Cursor that the driver uses, with
+    coroutines in place of blocking calls, so a query waiting on Trino holds
+    no thread. With prefetch enabled, the next result page is requested
+    while the current one is being served. Statements run in the
+    connection's client session, which their responses may change.
+    """
+    
+    def __init__(self, session: Any, client_session: AsyncClientSession):
+        self.session = session
+        self.client_session = client_session
+        self.prefetch = False
+        self.description: Optional[List] = None
+        self.rowcount = -1
+        self.query_id: Optional[str] = None
+        self.stats: Optional[Dict] = None
+        self._next_uri: Optional[str] = None
+        self._rows: List = []
+        self._mapper = None
+        self._pending: Optional[asyncio.Future] = None
+        self._cancelled = False
+    
+    async def _request(self, method: str, url: str, data: Optional[bytes] = None) -> Optional[Dict]:
+        """Send one protocol request, retrying while the coordinator is busy"""
+        ssl = None if self.client_session.params.get('verify', True) else False
+        for attempt in range(3):
+            async with self.session.request(method, url, data=data, headers=self.client_session.headers(),
+                                            ssl=ssl) as response:
+                if response.status in (502, 503, 504) and attempt < 2:
+                    await asyncio.sleep(0.1 * (attempt + 1))
+                    continue
+                if method == "DELETE":
+                    return None
+                if response.status != 200:
+                    text = await response.text()
+                    raise TrinoODBCError(f"Trino returned HTTP {response.status}: {text[:200]}")
+                result = await response.json(content_type=None)
+                if not result.get('error'):
+                    self.client_session.update(response.headers)
+                return result
+    
+    def _apply(self, result: Dict) -> None:
+        """Take the state, columns and rows from a protocol response"""
+        self.query_id = result.get('id', self.query_id)
+        self.stats = result.get('stats', self.stats)
+        self._next_uri = result.get('nextUri')
+        
+        error = result.get('error')
+        if error:
+            self._next_uri = None
+            raise TrinoODBCError(f"{error.get('errorName', 'QUERY_FAILED')}: {error.get('message')}")
+        
+        if self.description is None and result.get('columns'):
+            columns = result['columns']
+            self.description = [(col['name'], col['type'], None, None, None, None, None) for col in columns]
+            if RowMapperFactory is not None:
+                self._mapper = RowMapperFactory().create(columns=columns, legacy_primitive_types=False)
+        
+        data = result.get('data')
+        if data:
+            self._rows.extend(self._mapper.map(data) if self._mapper is not None else data)
+        
+        if result.get('updateCount') is not None:
+            self.rowcount = result['updateCount']
+    
+    async def _advance(self) -> None:
+        """Follow nextUri once"""
+        if self._pending is not None:
+            pending, self._pending = self._pending, None
+            result = await pending
+        else:
+            result = await self._request("GET", self._next_uri)
+        
+        if self._cancelled:
+            raise TrinoODBCError("Query was cancelled")
+        self._apply(result)
+        
+        if self.prefetch and self._next_uri:
+            self._pending = asyncio.ensure_future(self._request("GET", self._next_uri))
+    
+    async def execute(self, query: str, parameters: Optional[List] = None) -> "AsyncTrinoCursor":
+        """Submit a statement and wait until its result columns are known"""
+        await self.cancel()
+        self.description = None
+        self.rowcount = -1
+        self.query_id = None
+        self.stats = None
+        self._rows = []
+        self._mapper = None
+        self._cancelled = False
+        
+        statement = bind_parameters(query, parameters) if parameters else query
+        result = await self._request("POST", f"{self.client_session.base_url}/v1/statement",
+                                     data=statement.encode("utf-8"))
+        if self._cancelled:
+            if result.get('nextUri'):
+                await self._request("DELETE", result['nextUri'])
+            raise TrinoODBCError("Query was cancelled")
+        self._apply(result)
+        
+        while self.description is None and self._next_uri:
+            await self._advance()
+        return self
+    
+    async def fetchmany(self, size: int) -> List:
+        """Return up to size rows, following nextUri until they are available"""
+        while len(self._rows) < size and self._next_uri:
+            await self._advance()
+        rows, self._rows = self._rows[:size], self._rows[size:]
+        return rows
+    
+    async def fetchall(self) -> List:
+        """Return all remaining rows"""
+        while self._next_uri:
+            await self._advance()
+        rows, self._rows = self._rows, []
+        return rows
+    
+    async def cancel(self) -> None:
+        """Cancel the running statement, if any, and drop its buffered rows"""
+        self._cancelled = True
+        if self._pending is not None:
+            self._pending.cancel()
+            self._pending = None
+        next_uri, self._next_uri = self._next_uri, None
+        self._rows = []
+        if next_uri:
+            await self._request("DELETE", next_uri)
+    
+    async def close(self) -> None:
+        """Close the cursor, cancelling its running statement"""
+        try:
+            await self.cancel()
+        except Exception as e:
+            logger.warning(f"Error cancelling query {self.query_id} on close: {str(e)}")
+
+class AsyncConnectionManager(BaseConnectionManager):
+    """
+    Asyncio counterpart of ConnectionManager
+    
+    All state is owned by the event loop thread, so the registry needs no
+    lock; per-cursor asyncio locks serialize operations on one cursor.
+    Connections are AsyncClientSessions rather than open sockets, since
+    every cursor talks to Trino through the shared aiohttp session.
+    """
+    
+    def __init__(self):
+        super().__init__()
+        self.lock = nullcontext()
+        self.execution_tasks: Dict[str, asyncio.Task] = {}
+        self.session = None
+    
+    async def start(self) -> None:
+        """Open the HTTP session used to reach Trino"""
+        # No connection limit: concurrency is bounded by memory, not sockets
+        self.session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=0))
+    
+    async def stop(self) -> None:
+        """Close every connection and the HTTP session"""
+        for connection_id in list(self.connections):
+            await self.close_connection(connection_id)
+        await self.session.close()
+    
+    def create_connection(self, params: Dict[str, Any]) -> str:
+        """Register a connection with the given parameters; Trino is contacted lazily"""
+        return self._register_connection(AsyncClientSession(params), params)
+    
+    async def close_connection(self, connection_id: str) -> bool:
+        """Close a connection and its cursors"""
+        registered = self._unregister_connection(connection_id)
+        if registered is None:
+            logger.warning(f"Attempted to close non-existent connection {connection_id}")
+            return False
+        
+        _, cursors_to_close = registered
+        for cursor_id, cursor, cursor_lock, execution in cursors_to_close:
+            await self._release_cursor(cursor_id, cursor, cursor_lock, execution)
+        
+        logger.info(f"Closed connection {connection_id}")
+        return True
+    
+    def create_cursor(self, connection_id: str) -> str:
+        """Create a new cursor for an existing connection"""
+        return self._register_cursor(connection_id, lambda client_session: AsyncTrinoCursor(self.session, client_session),
+                                     asyncio.Lock())
+    
+    async def close_cursor(self, cursor_id: str) -> bool:
+        """Close a cursor once any operation in progress on it has finished"""
+        cursor, cursor_lock, execution = self._unregister_cursor(cursor_id)
+        if cursor is None:
+            logger.warning(f"Attempted to close non-existent cursor {cursor_id}")
+            return False
+        
+        await self._release_cursor(cursor_id, cursor, cursor_lock, execution)
+        logger.info(f"Closed cursor {cursor_id}")
+        return True
+    
+    async def _release_cursor(self, cursor_id: str, cursor: AsyncTrinoCursor, cursor_lock: asyncio.Lock,
+                              execution: Optional[AsyncExecution]) -> None:
+        """Close an unregistered cursor and drop its per-cursor state"""
+        self.execution_tasks.pop(cursor_id, None)
+        
+        # Don't wait for a long asynchronous query to finish; cancel it
+        if execution is not None and not execution.cancel() and not execution.done:
+            try:
+                await cursor.cancel()
+            except Exception as e:
+                logger.warning(f"Error cancelling query on cursor {cursor_id}: {str(e)}")
+        
+        async with cursor_lock:
+            try:
+                await cursor.close()
+            finally:
+                self._clear_result(cursor_id)
+    
+    def _session_state(self, connection_id: str) -> Optional[Dict[str, Any]]:
+        """Return the state of the connection's client session, which USE and SET SESSION update"""
+        session = self.connections[connection_id]
+        if session.transaction_id:
+            return None
+        return {
+            "catalog": session.catalog,
+            "schema": session.schema,
+            "properties": dict(session.properties),
+            "roles": dict(session.roles),
+            "authorization_user": session.authorization_user
+        }
+    
+    async def _acquire_cursor(self, cursor_id: str) -> Tuple[AsyncTrinoCursor, asyncio.Lock]:
+        """Look up a cursor and acquire its lock, which the caller must release"""
+        cursor, cursor_lock = self._lookup_cursor(cursor_id)
+        await cursor_lock.acquire()
+        
+        # The cursor may have been closed while we waited for its lock
+        if self.cursors.get(cursor_id) is not cursor:
+            cursor_lock.release()
+            raise TrinoODBCError(f"Cursor {cursor_id} does not exist")
+        return cursor, cursor_lock
+    
+    async def execute_query(self, cursor_id: str, query: str, parameters: Optional[List] = None,
+                            prefetch: bool = False, use_cache: bool = True) -> Dict:
+        """Execute a SQL query using the specified cursor, as ConnectionManager.execute_query"""
+        cursor, cursor_lock = await self._acquire_cursor(cursor_id)
+        try:
+            return await self._execute_locked(cursor_id, cursor, query, parameters, prefetch, use_cache)
+        finally:
+            cursor_lock.release()
+    
+    async def _execute_locked(self, cursor_id: str, cursor: AsyncTrinoCursor, query: str,
+                              parameters: Optional[List], prefetch: bool, use_cache: bool) -> Dict:
+        """Execute a query on a cursor whose lock the caller holds"""
+        try:
+            cache_key, cached = self._start_result(cursor_id, query, parameters, use_cache)
+            if cached is not None:
+                return cached
+            
+            cursor.prefetch = prefetch
+            start = time.perf_counter()
+            await cursor.execute(query, parameters)
+            EXECUTE_LATENCY.observe(time.perf_counter() - start)
+            
+            return self._executed_result(cursor_id, query, cursor.description, cursor.rowcount, cache_key)
+        
+        except Exception as e:
+            logger.error(f"Query execution error on cursor {cursor_id}: {str(e)}")
+            raise TrinoODBCError(f"Query execution error: {str(e)}")
+    
+    async def execute_async(self, cursor_id: str, query: str, parameters: Optional[List] = None,
+                            prefetch: bool = False, use_cache: bool = True) -> Dict:
+        """Submit a SQL query as a background task, as ConnectionManager.execute_async"""
+        cursor, cursor_lock = await self._acquire_cursor(cursor_id)
+        execution = AsyncExecution(cursor, query)
+        self.executions[cursor_id] = execution
+        self.execution_tasks[cursor_id] = asyncio.ensure_future(
+            self._run_async(cursor_id, cursor, cursor_lock, execution, query, parameters, prefetch, use_cache))
+        
+        logger.info(f"Submitted query on cursor {cursor_id}: {query[:100]}...")
+        return {
+            "success": True,
+            "state": execution.state
+        }
+    
+    async def _run_async(self, cursor_id: str, cursor: AsyncTrinoCursor, cursor_lock: asyncio.Lock,
+                         execution: AsyncExecution, query: str, parameters: Optional[List],
+                         prefetch: bool, use_cache: bool) -> None:
+        """Task running a query submitted with execute_async"""
+        try:
+            # A query cancelled before the task ran never reaches Trino
+            if not execution.start():
+                logger.info(f"Skipped query cancelled before it started on cursor {cursor_id}")
+                return
+            result = await self._execute_locked(cursor_id, cursor, query, parameters, prefetch, use_cache)
+            execution.set_state(QUERY_STATE_FINISHED, result=result)
+        except Exception as e:
+            state = QUERY_STATE_CANCELLED if execution.cancel_requested else QUERY_STATE_FAILED
+            execution.set_state(state, error=str(e))
+        finally:
+            cursor_lock.release()
+    
+    async def cancel_query(self, cursor_id: str) -> Dict:
+        """Cancel the query running on a cursor without waiting for its lock, as ConnectionManager.cancel_query"""
+        cursor, execution, reader = self._mark_cancelled(cursor_id)
+        
+        # A query still queued is cancelled before it reaches Trino
+        if execution is not None and execution.cancel():
+            logger.info(f"Cancelled queued query on cursor {cursor_id}")
+            return {
+                "success": True
+            }
+        
+        if reader is None:
+            try:
+                await cursor.cancel()
+            except Exception as e:
+                logger.error(f"Error cancelling query on cursor {cursor_id}: {str(e)}")
+                raise TrinoODBCError(f"Error cancelling query: {str(e)}")
+        
+        logger.info(f"Cancelled query on cursor {cursor_id}")
+        return {
+            "success": True
+        }
+    
+    async def get_query_status(self, cursor_id: str, wait: float = 0) -> Dict:
+        """Get the state of an asynchronously submitted query, long-polling up to wait seconds"""
+        execution = self._lookup_execution(cursor_id)
+        
+        task = self.execution_tasks.get(cursor_id)
+        if wait > 0 and task is not None and not task.done():
+            await asyncio.wait({task}, timeout=wait)
+        
+        status = execution.status()
+        status["success"] = True
+        return status
+    
+    async def fetch_results(self, cursor_id: str, max_rows: int = 1000,
+                            result_format: str = RESULT_FORMAT_ROWS, max_bytes: Optional[int] = None,
+                            mimetype: str = JSON_MIMETYPE) -> Dict:
+        """Fetch results from a previously executed query, as ConnectionManager.fetch_results"""
+        if result_format not in RESULT_FORMATS:
+            raise TrinoODBCError(f"Unsupported result format: {result_format}")
+        
+        cursor, cursor_lock = await self._acquire_cursor(cursor_id)
+        try:
+            description = self._description(cursor_id, cursor)
+            page_rows = self._page_rows(cursor_id, description, max_rows, max_bytes)
+            rows, has_more = await self._fetch_rows(cursor_id, cursor, page_rows)
+            return self._page_response(cursor_id, description, rows, has_more, page_rows,
+                                       result_format, max_bytes, mimetype)
+        
+        except Exception as e:
+            logger.error(f"Error fetching results from cursor {cursor_id}: {str(e)}")
+            raise TrinoODBCError(f"Error fetching results: {str(e)}")
+        finally:
+            cursor_lock.release()
+    
+    async def fetch_results_arrow(self, cursor_id: str, max_rows: int = 1000,
+                                  max_bytes: Optional[int] = None) -> Tuple[bytes, bool, int]:
+        """Fetch results as an Arrow IPC stream, as ConnectionManager.fetch_results_arrow"""
+        if pa is None:
+            raise TrinoODBCError("Arrow output requires the pyarrow package")
+        
+        cursor, cursor_lock = await self._acquire_cursor(cursor_id)
+        try:
+            page_rows = self._page_rows(cursor_id, self._description(cursor_id, cursor), max_rows, max_bytes)
+            rows, has_more = await self._fetch_rows(cursor_id, cursor, page_rows)
+            return self._arrow_page(cursor_id, cursor, rows, max_bytes), has_more, page_rows
+        
+        except Exception as e:
+            logger.error(f"Error fetching results from cursor {cursor_id}: {str(e)}")
+            raise TrinoODBCError(f"Error fetching results: {str(e)}")
+        finally:
+            cursor_lock.release()
+    
+    async def run_query(self, connection_id: str, query: str, parameters: Optional[List] = None,
+                        max_rows: int = 1000, result_format: str = RESULT_FORMAT_ROWS,
+                        prefetch: bool = False, use_cache: bool = True, max_bytes: Optional[int] = None,
+                        mimetype: str = JSON_MIMETYPE) -> Dict:
+        """Create a cursor, execute a query and fetch the first page, as ConnectionManager.run_query"""
+        cursor_id = self.create_cursor(connection_id)
+        
+        try:
+            result = await self.execute_query(cursor_id, query, parameters, prefetch, use_cache)
+            page = await self.fetch_results(cursor_id, max_rows, result_format, max_bytes, mimetype)
+        except Exception:
+            try:
+                await self.close_cursor(cursor_id)
+            except Exception as e:
+                logger.warning(f"Error closing cursor {cursor_id} after a failed query: {str(e)}")
+            raise
+        
+        page.pop("columns", None)
+        result.update(page)
+        
+        if not result["has_more"]:
+            await self.close_cursor(cursor_id)
+            cursor_id = None
+        
+        result["cursor_id"] = cursor_id
+        return result
+    
+    async def stream_results(self, cursor_id: str, page_size: int = 1000, framing: Optional[StreamFraming] = None):
+        """Drain a cursor as NDJSON or MessagePack chunks, as ConnectionManager.stream_results"""
+        framing = framing or StreamFraming()
+        try:
+            cursor, cursor_lock = await self._acquire_cursor(cursor_id)
+        except TrinoODBCError as e:
+            yield framing.message({"error": str(e)})
+            return
+        
+        try:
+            description = self._description(cursor_id, cursor)
+            column_names = [col[0] for col in description] if description else []
+            yield framing.message({"columns": column_names})
+            
+            encoder = self._row_encoder(cursor_id, description, framing.value_encoder)
+            row_count = 0
+            try:
+                has_more = True
+                while has_more:
+                    rows, has_more = await self._fetch_rows(cursor_id, cursor, page_size)
+                    if not rows:
+                        break
+                    row_count += len(rows)
+                    chunk = framing.rows(rows, encoder)
+                    ROWS_SERVED.inc(len(rows), format=framing.format)
+                    BYTES_SERVED.inc(len(chunk), format=framing.format)
+                    yield chunk
+            except Exception as e:
+                logger.error(f"Error streaming results from cursor {cursor_id}: {str(e)}")
+                yield framing.message({"error": f"Error fetching results: {str(e)}"})
+                return
+            
+            logger.info(f"Streamed {row_count} rows from cursor {cursor_id}")
+            yield framing.message({"done": True, "row_count": row_count})
+        finally:
+            cursor_lock.release()
+    
+    async def _fetch_rows(self, cursor_id: str, cursor: AsyncTrinoCursor, max_rows: int) -> Tuple[List, bool]:
+        """Fetch the next page of rows and whether more rows follow, as ConnectionManager._fetch_rows"""
+        rows = self._take_lookahead(cursor_id)
+        wanted = max_rows + 1 - len(rows)
+        if wanted > 0:
+            rows = rows + await self._read_rows(cursor_id, cursor, wanted)
+        return self._split_page(cursor_id, rows, max_rows)
+    
+    async def _read_rows(self, cursor_id: str, cursor: AsyncTrinoCursor, max_rows: int) -> List:
+        """Read up to max_rows rows from the result cache or from Trino"""
+        reader = self.cache_readers.get(cursor_id)
+        if reader is not None:
+            return reader.take(max_rows)
+        
+        fill = self.cache_fills.get(cursor_id)
+        try:
+            rows = await cursor.fetchmany(max_rows)
+        except Exception:
+            self.cache_fills.pop(cursor_id, None)
+            raise
+        
+        if fill is not None:
+            self._record_fill(cursor_id, fill, rows, max_rows)
+        return rows
+    
+    async def get_metadata(self, connection_id: str, kind: str, catalog: Optional[str] = None,
+                           schema: Optional[str] = None, table: Optional[str] = None,
+                           column: Optional[str] = None) -> Dict:
+        """List schemas, tables or columns of a catalog, as ConnectionManager.get_metadata"""
+        client_session, catalog, patterns, key = self._metadata_request(connection_id, kind, catalog,
+                                                                        (schema, table, column))
+        columns = METADATA_QUERIES[kind][1]
+        rows = self.metadata_cache.get(key)
+        cached = rows is not None
+        
+        if rows is None:
+            cursor = AsyncTrinoCursor(self.session, client_session)
+            try:
+                await cursor.execute(metadata_query(kind, catalog, patterns))
+                rows = [dict(zip(columns, row)) for row in await cursor.fetchall()]
+            except Exception as e:
+                logger.error(f"Error listing {kind} of catalog {catalog}: {str(e)}")
+                raise TrinoODBCError(f"Error listing {kind}: {str(e)}")
+            finally:
+                await cursor.close()
+            
+            self.metadata_cache.put(key, rows)
+        
+        return {
+            "success": True,
+            "columns": list(columns),
+            "rows": rows,
+            "cached": cached
+        }
+    
+    async def execute_many(self, cursor_id: str, query: str, rows: List,
+                           max_statement_bytes: Optional[int] = None,
+                           concurrency: Optional[int] = None) -> Dict:
+        """Execute a statement once per row of parameters, as ConnectionManager.execute_many"""
+        max_statement_bytes = max_statement_bytes or self.executemany_max_statement_bytes
+        concurrency = max(1, min(concurrency or self.executemany_concurrency, self.executemany_concurrency))
+        
+        batches = batch_insert_values(query, rows, max_statement_bytes)
+        if batches is None:
+            batches = [(bind_parameters(query, list(row)), 1) for row in rows]
+        
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        async def run_batch(client_session, statement, row_count):
+            async with semaphore:
+                cursor = AsyncTrinoCursor(self.session, client_session)
+                try:
+                    start = time.perf_counter()
+                    await cursor.execute(statement)
+                    await cursor.fetchall()
+                    EXECUTE_LATENCY.observe(time.perf_counter() - start)
+                    return {
+                        "rows": row_count,
+                        "rowcount": cursor.rowcount if cursor.rowcount >= 0 else row_count
+                    }
+                except Exception as e:
+                    return {
+                        "rows": row_count,
+                        "rowcount": -1,
+                        "error": str(e)
+                    }
+                finally:
+                    await cursor.close()
+        
+        cursor, cursor_lock = await self._acquire_cursor(cursor_id)
+        try:
+            client_session = self.connections[self._cursor_connection_id(cursor_id)]
+            results = await asyncio.gather(*(run_batch(client_session, statement, row_count)
+                                             for statement, row_count in batches))
+        finally:
+            cursor_lock.release()
+        
+        return self._execute_many_response(cursor_id, rows, list(results))
+    
+    async def reap_idle(self) -> Dict[str, int]:
+        """Close cursors and connections that clients have stopped using, as ConnectionManager.reap_idle"""
+        idle_cursors, idle_connections = self._idle_handles()
+        reaped_cursors = 0
+        for cursor_id in idle_cursors:
+            reaped_cursors += await self.close_cursor(cursor_id)
+        reaped_connections = 0
+        for connection_id in idle_connections:
+            reaped_connections += await self.close_connection(connection_id)
+        return self._record_reaped(reaped_cursors, reaped_connections)
+    
+    async def run_reaper(self, interval: float = DEFAULT_REAP_INTERVAL) -> None:
+        """Periodically reap idle cursors and connections"""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.reap_idle()
+            except Exception as e:
+                logger.error(f"Error reaping idle handles: {str(e)}")
+
+def async_json_response(data: Any, status: int = 200) -> Any:
+    """Encode a JSON response the way the Flask routes do"""
+    return web.json_response(data, status=status, dumps=lambda obj: json.dumps(obj, default=str))
+
+def async_result_response(result: Dict, mimetype: str) -> Any:
+    """Encode a successful result as JSON or MessagePack, as result_response"""
+    if mimetype == MSGPACK_MIMETYPE:
+        return web.Response(body=msgpack_packer().pack(result), content_type=MSGPACK_MIMETYPE)
+    return async_json_response(result)
+
+def async_error_response(message: str, e: Exception) -> Any:
+    """Log a failed request and answer it with the usual error body"""
+    logger.error(f"{message}: {str(e)}")
+    return async_json_response({
+        "success": False,
+        "error": str(e)
+    }, status=400)
+
+def async_compress_response(request: Any, response: Any) -> Any:
+    """Compress a result response with the best encoding the client accepts"""
+    response.headers['Vary'] = 'Accept-Encoding'
+    encoding = response_compression.negotiate(request.headers.get('Accept-Encoding'))
+    if encoding is not None and len(response.body) >= response_compression.min_bytes:
+        response.body = response_compression.compress(response.body, encoding)
+        response.headers['Content-Encoding'] = encoding
+    return response
+
+def create_async_app(manager: "AsyncConnectionManager") -> Any:
+    """Build the aiohttp application serving the REST API from an AsyncConnectionManager"""
+    
+    @web.middleware
+    async def record_request_metrics(request, handler):
+        start = time.perf_counter()
+        # Unmatched routes and other failures raise instead of returning; count them too
+        status = 500
+        try:
+            response = await handler(request)
+            status = response.status
+            return response
+        except web.HTTPException as e:
+            status = e.status
+            raise
+        finally:
+            resource = request.match_info.route.resource
+            route = resource.canonical.replace("{", "<").replace("}", ">") if resource else "<unmatched>"
+            REQUEST_LATENCY.observe(time.perf_counter() - start, route=route, method=request.method)
+            REQUESTS.inc(route=route, method=request.method, status=status)
+    
+    async def prometheus_metrics(request):
+        return web.Response(body=metrics.render().encode("utf-8"),
+                            headers={"Content-Type": "text/plain; version=0.0.4; charset=utf-8"})
+    
+    async def status(request):
+        return async_json_response({
+            "status": "ok",
+            "version": VERSION,
+            "name": DRIVER_NAME,
+            "pool": None,
+            "handles": manager.stats(),
+            "result_cache": manager.result_cache.stats() if manager.result_cache else None,
+            "metadata_cache": manager.metadata_cache.stats(),
+            "prepared_statements": None
+        })
+    
+    async def create_connection(request):
+        try:
+            connection_id = manager.create_connection(await request.json())
+            return async_json_response({
+                "success": True,
+                "connection_id": connection_id
+            })
+        except Exception as e:
+            return async_error_response("Error creating connection", e)
+    
+    async def close_connection(request):
+        connection_id = request.match_info['connection_id']
+        try:
+            success = await manager.close_connection(connection_id)
+            return async_json_response({"success": success})
+        except Exception as e:
+            return async_error_response(f"Error closing connection {connection_id}", e)
+    
+    async def create_cursor(request):
+        connection_id = request.match_info['connection_id']
+        try:
+            cursor_id = manager.create_cursor(connection_id)
+            return async_json_response({
+                "success": True,
+                "cursor_id": cursor_id
+            })
+        except Exception as e:
+            return async_error_response(f"Error creating cursor for connection {connection_id}", e)
+    
+    async def run_query(request):
+        connection_id = request.match_info['connection_id']
+        try:
+            data = await request.json()
+            query = data.get('query')
+            if not query:
+                return async_json_response({"success": False, "error": "Query is required"}, status=400)
+            
+            result_format = data.get('format', RESULT_FORMAT_ROWS)
+            max_bytes = int(data['max_bytes']) if data.get('max_bytes') else None
+            max_rows = int(data.get('max_rows', DEFAULT_MAX_PAGE_ROWS if max_bytes else 1000))
+            mimetype = result_mimetype(request.headers.get('Accept'))
+            result = await manager.run_query(connection_id, query, data.get('parameters'), max_rows, result_format,
+                                             bool(data.get('prefetch', False)), bool(data.get('cache', True)),
+                                             max_bytes, mimetype=mimetype)
+            response = async_result_response(result, mimetype)
+            BYTES_SERVED.inc(len(response.body), format="msgpack" if mimetype == MSGPACK_MIMETYPE else result_format)
+            if max_bytes and result["cursor_id"]:
+                manager.record_page_bytes(result["cursor_id"], result_row_count(result), len(response.body))
+            return async_compress_response(request, response)
+        except Exception as e:
+            return async_error_response(f"Error running query on connection {connection_id}", e)
+    
+    async def close_cursor(request):
+        cursor_id = request.match_info['cursor_id']
+        try:
+            success = await manager.close_cursor(cursor_id)
+            return async_json_response({"success": success})
+        except Exception as e:
+            return async_error_response(f"Error closing cursor {cursor_id}", e)
+    
+    async def execute_query(request):
+        cursor_id = request.match_info['cursor_id']
+        try:
+            data = await request.json()
+            query = data.get('query')
+            if not query:
+                return async_json_response({"success": False, "error": "Query is required"}, status=400)
+            
+            execute = manager.execute_async if data.get('async', False) else manager.execute_query
+            result = await execute(cursor_id, query, data.get('parameters'),
+                                   bool(data.get('prefetch', False)), bool(data.get('cache', True)))
+            return async_result_response(result, result_mimetype(request.headers.get('Accept')))
+        except Exception as e:
+            return async_error_response(f"Error executing query on cursor {cursor_id}", e)
+    
+    async def execute_many(request):
+        cursor_id = request.match_info['cursor_id']
+        try:
+            if request.content_type == ARROW_STREAM_MIMETYPE:
+                options = request.query
+                rows = arrow_stream_rows(await request.read())
+            else:
+                options = await request.json()
+                if options.get('columns') is not None:
+                    rows = list(zip(*options['columns']))
+                else:
+                    rows = options.get('parameters') or []
+            
+            query = options.get('query')
+            if not query:
+                return async_json_response({"success": False, "error": "Query is required"}, status=400)
+            
+            max_statement_bytes = options.get('max_statement_bytes')
+            concurrency = options.get('concurrency')
+            result = await manager.execute_many(
+                cursor_id, query, rows,
+                int(max_statement_bytes) if max_statement_bytes else None,
+                int(concurrency) if concurrency else None
+            )
+            return async_json_response(result, status=200 if result["success"] else 400)
+        except Exception as e:
+            return async_error_response(f"Error executing batch on cursor {cursor_id}", e)
+    
+    async def cancel_query(request):
+        cursor_id = request.match_info['cursor_id']
+        try:
+            return async_json_response(await manager.cancel_query(cursor_id))
+        except Exception as e:
+            return async_error_response(f"Error cancelling query on cursor {cursor_id}", e)
+    
+    async def get_query_status(request):
+        cursor_id = request.match_info['cursor_id']
+        try:
+            wait = float(request.query.get('wait', 0))
+            return async_json_response(await manager.get_query_status(cursor_id, wait))
+        except Exception as e:
+            return async_error_response(f"Error getting query status for cursor {cursor_id}", e)
+    
+    async def fetch_results(request):
+        cursor_id = request.match_info['cursor_id']
+        try:
+            max_bytes = int(request.query['max_bytes']) if request.query.get('max_bytes') else None
+            max_rows = int(request.query.get('max_rows', DEFAULT_MAX_PAGE_ROWS if max_bytes else 1000))
+            
+            accepted = result_mimetype(request.headers.get('Accept'),
+                                       (JSON_MIMETYPE, ARROW_STREAM_MIMETYPE, MSGPACK_MIMETYPE))
+            if accepted == ARROW_STREAM_MIMETYPE:
+                payload, has_more, page_rows = await manager.fetch_results_arrow(cursor_id, max_rows, max_bytes)
+                response = web.Response(body=payload, content_type=ARROW_STREAM_MIMETYPE,
+                                        headers={'X-Trino-Has-More': 'true' if has_more else 'false',
+                                                 'X-Trino-Page-Rows': str(page_rows)})
+                return async_compress_response(request, response)
+            
+            result_format = request.query.get('format', RESULT_FORMAT_ROWS)
+            result = await manager.fetch_results(cursor_id, max_rows, result_format, max_bytes,
+                                                 mimetype=accepted)
+            response = async_result_response(result, accepted)
+            BYTES_SERVED.inc(len(response.body), format="msgpack" if accepted == MSGPACK_MIMETYPE else result_format)
+            if max_bytes:
+                manager.record_page_bytes(cursor_id, result_row_count(result), len(response.body))
+            return async_compress_response(request, response)
+        except Exception as e:
+            return async_error_response(f"Error fetching results from cursor {cursor_id}", e)
+    
+    async def stream_results(request):
+        cursor_id = request.match_info['cursor_id']
+        if cursor_id not in manager.cursors:
+            return async_error_response(f"Error streaming results from cursor {cursor_id}",
+                                        TrinoODBCError(f"Cursor {cursor_id} does not exist"))
+        
+        page_size = int(request.query.get('page_size', 1000))
+        try:
+            framing = StreamFraming(result_mimetype(request.headers.get('Accept'), (NDJSON_MIMETYPE, MSGPACK_MIMETYPE)))
+        except TrinoODBCError as e:
+            return async_error_response(f"Error streaming results from cursor {cursor_id}", e)
+        
+        response = web.StreamResponse(headers={"Content-Type": framing.mimetype, "Vary": "Accept-Encoding"})
+        compressor = None
+        encoding = response_compression.negotiate(request.headers.get('Accept-Encoding'))
+        if encoding is not None:
+            compressor = StreamCompressor(response_compression.compressor(encoding), encoding)
+            response.headers['Content-Encoding'] = encoding
+        
+        await response.prepare(request)
+        async for chunk in manager.stream_results(cursor_id, page_size, framing):
+            await response.write(compressor.compress(chunk) if compressor else chunk)
+        if compressor:
+            await response.write(compressor.finish())
+        await response.write_eof()
+        return response
+    
+    async def get_connection_info(request):
+        connection_id = request.match_info['connection_id']
+        try:
+            return async_json_response({
+                "success": True,
+                "info": manager.get_connection_info(connection_id)
+            })
+        except Exception as e:
+            return async_error_response(f"Error getting info for connection {connection_id}", e)
+    
+    async def get_metadata(request):
+        connection_id = request.match_info['connection_id']
+        kind = request.match_info['kind']
+        try:
+            result = await manager.get_metadata(
+                connection_id, kind,
+                catalog=request.query.get('catalog'),
+                schema=request.query.get('schema'),
+                table=request.query.get('table'),
+                column=request.query.get('column')
+            )
+            return async_json_response(result)
+        except Exception as e:
+            return async_error_response(f"Error getting {kind} metadata for connection {connection_id}", e)
+    
+    async def invalidate_metadata(request):
+        connection_id = request.match_info['connection_id']
+        try:
+            dropped = manager.invalidate_metadata(connection_id, request.query.get('catalog'))
+            return async_json_response({
+                "success": True,
+                "invalidated": dropped
+            })
+        except Exception as e:
+            return async_error_response(f"Error invalidating metadata for connection {connection_id}", e)
+    
+    async def prepare_statement(request):
+        # Parameters are inlined into the query text in asyncio mode, so
+        # there is nothing to prepare ahead of executions
+        connection_id = request.match_info['connection_id']
+        try:
+            query = (await request.json()).get('query')
+            if not query:
+                return async_json_response({"success": False, "error": "Query is required"}, status=400)
+            manager.get_connection_info(connection_id)
+            return async_json_response({
+                "success": True,
+                "statement": None
+            })
+        except Exception as e:
+            return async_error_response(f"Error preparing statement on connection {connection_id}", e)
+    
+    async def on_startup(application):
+        await manager.start()
+        application['reaper'] = asyncio.ensure_future(manager.run_reaper())
+    
+    async def on_cleanup(application):
+        application['reaper'].cancel()
+        await manager.stop()
+    
+    application = web.Application(middlewares=[record_request_metrics])
+    application.on_startup.append(on_startup)
+    application.on_cleanup.append(on_cleanup)
+    application.add_routes([
+        web.get('/metrics', prometheus_metrics),
+        web.get('/status', status),
+        web.post('/connections', create_connection),
+        web.delete('/connections/{connection_id}', close_connection),
+        web.post('/connections/{connection_id}/cursors', create_cursor),
+        web.post('/connections/{connection_id}/query', run_query),
+        web.delete('/cursors/{cursor_id}', close_cursor),
+        web.post('/cursors/{cursor_id}/execute', execute_query),
+        web.post('/cursors/{cursor_id}/executemany', execute_many),
+        web.post('/cursors/{cursor_id}/cancel', cancel_query),
+        web.get('/cursors/{cursor_id}/status', get_query_status),
+        web.get('/cursors/{cursor_id}/fetch', fetch_results),
+        web.get('/cursors/{cursor_id}/stream', stream_results),
+        web.get('/connections/{connection_id}/info', get_connection_info),
+        web.post('/connections/{connection_id}/prepare', prepare_statement),
+        web.delete('/connections/{connection_id}/metadata/cache', invalidate_metadata),
+        web.get('/connections/{connection_id}/metadata/{kind}', get_metadata)
+    ])
+    return application
+
+def start_background_tasks() -> None:
+    """Start the pool evictor and idle reaper threads of this process"""
+    connection_pool.start_evictor()
+    connection_manager.start_reaper()
+
+def start_forwarding_listener() -> None:
+    """
+    Accept requests forwarded by other workers on a loopback port
+    
+    The port becomes this worker's connection ID prefix, so any worker can
+    tell which worker owns a connection or cursor and where to reach it.
+    """
+    from werkzeug.serving import make_server, WSGIRequestHandler
+    
+    class QuietRequestHandler(WSGIRequestHandler):
+        def log_request(self, *args, **kwargs):
+            pass
+    
+    global worker_port
+    server = make_server("127.0.0.1", 0, app, threaded=True, request_handler=QuietRequestHandler)
+    worker_port = server.server_port
+    connection_manager.id_prefix = f"w{worker_port}-"
+    threading.Thread(target=server.serve_forever, name="worker-forwarding", daemon=True).start()
+    logger.info(f"Worker {os.getpid()} accepts forwarded requests on port {worker_port}")
+
+def run_gunicorn(host: str, port: int, workers: int, threads: int) -> None:
+    """
+    Serve the app with gunicorn's threaded workers
+    
+    Connections and cursors live in the memory of the worker that created
+    them. With more than one worker, requests that reach another worker are
+    forwarded to the owner over loopback.
+    """
+    def post_fork(server, worker):
+        if workers > 1:
+            start_forwarding_listener()
+        start_background_tasks()
+    
+    class DriverApplication(GunicornApplication):
+        def load_config(self):
+            self.cfg.set("bind", f"{host}:{port}")
+            self.cfg.set("workers", workers)
+            self.cfg.set("threads", threads)
+            self.cfg.set("worker_class", "gthread")
+            self.cfg.set("post_fork", post_fork)
+        
+        def load(self):
+            return app
+    
+    DriverApplication().run()
+
+def run_asyncio(host: str, port: int, manager: "AsyncConnectionManager") -> None:
+    """
+    Serve the REST API from a single asyncio event loop
+    
+    Requests waiting on Trino hold no thread, so one process can keep many
+    slow queries in flight. Connection pooling, prefetch threads and
+    multi-worker forwarding do not apply in this mode.
+    """
+    web.run_app(create_async_app(manager), host=host, port=port, print=None)
+
 def main():
     """Main entry point for the ODBC driver service"""
     parser = argparse.ArgumentParser(description=f"{DRIVER_NAME} v{VERSION}")
@@ -420,14 +4623,108 @@ def main():
     parser.add_argument('--host', type=str, default='0.0.0.0',
                         help='Host to bind the service to (default: 0.0.0.0)')
     parser.add_argument('--debug', action='store_true',
-                        help='Run in debug mode')
+                        help='Run in debug mode on the development server')
+    parser.add_argument('--server', choices=[SERVER_GUNICORN, SERVER_ASYNCIO, SERVER_DEV], default=SERVER_GUNICORN,
+                        help=f'HTTP server to run: {SERVER_GUNICORN} for production, {SERVER_ASYNCIO} for a single '
+                             f'aiohttp event loop with non-blocking Trino I/O or {SERVER_DEV} for the Flask '
+                             f'development server (default: {SERVER_GUNICORN})')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                        help=f'gunicorn worker processes (default: {DEFAULT_WORKERS})')
+    parser.add_argument('--threads', type=int, default=DEFAULT_THREADS,
+                        help=f'Request threads per gunicorn worker (default: {DEFAULT_THREADS})')
+    parser.add_argument('--pool-min-size', type=int, default=DEFAULT_POOL_MIN_SIZE,
+                        help=f'Idle Trino connections kept per pool key (default: {DEFAULT_POOL_MIN_SIZE})')
+    parser.add_argument('--pool-max-size', type=int, default=DEFAULT_POOL_MAX_SIZE,
+                        help=f'Maximum Trino connections per pool key (default: {DEFAULT_POOL_MAX_SIZE})')
+    parser.add_argument('--pool-idle-timeout', type=float, default=DEFAULT_POOL_IDLE_TIMEOUT,
+                        help=f'Seconds before an idle pooled connection is closed (default: {DEFAULT_POOL_IDLE_TIMEOUT})')
+    parser.add_argument('--pool-health-check-interval', type=float, default=DEFAULT_POOL_HEALTH_CHECK_INTERVAL,
+                        help=f'Idle seconds after which a pooled connection is health-checked before reuse '
+                             f'(default: {DEFAULT_POOL_HEALTH_CHECK_INTERVAL})')
+    
+    parser.add_argument('--prefetch-depth', type=int, default=DEFAULT_PREFETCH_DEPTH,
+                        help=f'Result pages buffered ahead per prefetching cursor (default: {DEFAULT_PREFETCH_DEPTH})')
+    parser.add_argument('--prefetch-max-bytes', type=int, default=DEFAULT_PREFETCH_MAX_BYTES,
+                        help=f'Approximate memory cap for the pages buffered by one prefetching cursor '
+                             f'(default: {DEFAULT_PREFETCH_MAX_BYTES})')
+    
+    parser.add_argument('--async-workers', type=int, default=DEFAULT_ASYNC_WORKERS,
+                        help=f'Worker threads running asynchronously submitted queries (default: {DEFAULT_ASYNC_WORKERS})')
+    parser.add_argument('--cursor-idle-ttl', type=float, default=DEFAULT_CURSOR_IDLE_TTL,
+                        help=f'Seconds before an unused cursor is closed, 0 to disable (default: {DEFAULT_CURSOR_IDLE_TTL})')
+    parser.add_argument('--connection-idle-ttl', type=float, default=DEFAULT_CONNECTION_IDLE_TTL,
+                        help=f'Seconds before an unused connection is closed, 0 to disable '
+                             f'(default: {DEFAULT_CONNECTION_IDLE_TTL})')
+    
+    parser.add_argument('--result-cache-max-bytes', type=int, default=DEFAULT_RESULT_CACHE_MAX_BYTES,
+                        help=f'Approximate memory cap for cached SELECT results, 0 to disable caching '
+                             f'(default: {DEFAULT_RESULT_CACHE_MAX_BYTES})')
+    parser.add_argument('--result-cache-ttl', type=float, default=DEFAULT_RESULT_CACHE_TTL,
+                        help=f'Seconds a cached result may be served (default: {DEFAULT_RESULT_CACHE_TTL})')
+    parser.add_argument('--executemany-max-statement-bytes', type=int, default=DEFAULT_EXECUTEMANY_MAX_STATEMENT_BYTES,
+                        help=f'Size limit for the multi-row INSERT statements generated by executemany '
+                             f'(default: {DEFAULT_EXECUTEMANY_MAX_STATEMENT_BYTES})')
+    parser.add_argument('--executemany-concurrency', type=int, default=DEFAULT_EXECUTEMANY_CONCURRENCY,
+                        help=f'Statements run at once by one executemany request '
+                             f'(default: {DEFAULT_EXECUTEMANY_CONCURRENCY})')
+    parser.add_argument('--compression-min-bytes', type=int, default=DEFAULT_COMPRESSION_MIN_BYTES,
+                        help=f'Smallest query and fetch response body that is compressed when the client accepts '
+                             f'gzip or zstd (default: {DEFAULT_COMPRESSION_MIN_BYTES})')
+    parser.add_argument('--gzip-level', type=int, default=DEFAULT_GZIP_LEVEL, choices=range(0, 10), metavar='0-9',
+                        help=f'gzip compression level (default: {DEFAULT_GZIP_LEVEL})')
+    parser.add_argument('--zstd-level', type=int, default=DEFAULT_ZSTD_LEVEL, choices=range(1, 23), metavar='1-22',
+                        help=f'zstd compression level (default: {DEFAULT_ZSTD_LEVEL})')
+    parser.add_argument('--metadata-cache-ttl', type=float, default=DEFAULT_METADATA_CACHE_TTL,
+                        help=f'Seconds catalog metadata is cached, 0 to disable (default: {DEFAULT_METADATA_CACHE_TTL})')
+    parser.add_argument('--prepared-statement-cache-size', type=int, default=DEFAULT_PREPARED_STATEMENT_CACHE_SIZE,
+                        help=f'Statements kept prepared per Trino connection, 0 to prepare only those '
+                             f'registered with /prepare (default: {DEFAULT_PREPARED_STATEMENT_CACHE_SIZE})')
     
     args = parser.parse_args()
     
-    logger.info(f"Starting {DRIVER_NAME} v{VERSION} on {args.host}:{args.port}")
+    global connection_manager
+    server = SERVER_DEV if args.debug else args.server
+    if server == SERVER_ASYNCIO and aiohttp is None:
+        logger.warning("aiohttp is not installed; falling back to gunicorn")
+        server = SERVER_GUNICORN
+    if server == SERVER_GUNICORN and GunicornApplication is None:
+        logger.warning("gunicorn is not installed; falling back to the development server")
+        server = SERVER_DEV
+    if server == SERVER_ASYNCIO:
+        connection_manager = AsyncConnectionManager()
+    
+    connection_pool.min_size = args.pool_min_size
+    connection_pool.max_size = args.pool_max_size
+    connection_pool.idle_timeout = args.pool_idle_timeout
+    connection_pool.health_check_interval = args.pool_health_check_interval
+    
+    connection_manager.cursor_idle_ttl = args.cursor_idle_ttl
+    connection_manager.connection_idle_ttl = args.connection_idle_ttl
+    if server != SERVER_ASYNCIO:
+        connection_manager.prefetch_depth = args.prefetch_depth
+        connection_manager.prefetch_max_bytes = args.prefetch_max_bytes
+        connection_manager.async_workers = args.async_workers
+        connection_manager.prepared_statement_cache_size = args.prepared_statement_cache_size
+    connection_manager.metadata_cache.ttl = args.metadata_cache_ttl
+    connection_manager.executemany_max_statement_bytes = args.executemany_max_statement_bytes
+    connection_manager.executemany_concurrency = args.executemany_concurrency
+    response_compression.min_bytes = args.compression_min_bytes
+    response_compression.gzip_level = args.gzip_level
+    response_compression.zstd_level = args.zstd_level
+    if args.result_cache_max_bytes > 0:
+        connection_manager.result_cache = ResultCache(args.result_cache_max_bytes, args.result_cache_ttl)
     
-    # Run the Flask app
-    app.run(host=args.host, port=args.port, debug=args.debug)
+    if server == SERVER_ASYNCIO:
+        logger.info(f"Starting {DRIVER_NAME} v{VERSION} on {args.host}:{args.port} (asyncio)")
+        run_asyncio(args.host, args.port, connection_manager)
+    elif server == SERVER_GUNICORN:
+        logger.info(f"Starting {DRIVER_NAME} v{VERSION} on {args.host}:{args.port} "
+                    f"with {args.workers} workers of {args.threads} threads")
+        run_gunicorn(args.host, args.port, args.workers, args.threads)
+    else:
+        logger.info(f"Starting {DRIVER_NAME} v{VERSION} on {args.host}:{args.port} (development server)")
+        start_background_tasks()
+        app.run(host=args.host, port=args.port, debug=args.debug, threaded=True)
 
 if __name__ == "__main__":
     main()